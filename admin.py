@@ -8,21 +8,29 @@ This module provides admin-only endpoints for:
 - Resetting user passwords
 """
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 
-from database import get_db, User
-from auth_utils import hash_password, validate_password_strength
-from auth import get_current_user
+from database import get_async_db, User
+from auth_utils import (
+    hash_password_async,
+    validate_password_strength,
+    get_password_executor_stats,
+    get_token_cache_stats
+)
+from auth import get_current_user, commit_user
+from user_cache import CurrentUser, get_user_cache, get_user_counter
+from agents.llm_cache import get_llm_cache
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
 
 # Dependency to check if user is admin
-async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_admin_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     """
     Dependency to verify current user has admin privileges.
     
@@ -30,7 +38,7 @@ async def get_admin_user(current_user: User = Depends(get_current_user)) -> User
         current_user: Currently authenticated user
         
     Returns:
-        User: Admin user
+        CurrentUser: Admin user
         
     Raises:
         HTTPException: If user is not an admin
@@ -73,26 +81,65 @@ class AdminResponse(BaseModel):
     message: str
     user: Optional[dict] = None
     users: Optional[List[dict]] = None
+    next_after_id: Optional[int] = None
+    total: Optional[int] = None
+
+
+# Columns returned by list_users (never password_hash)
+USER_LIST_COLUMNS = (User.id, User.username, User.email, User.is_admin, User.created_at, User.updated_at)
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
 
 
 @router.get("/users", response_model=AdminResponse)
 async def list_users(
-    admin_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    after_id: Optional[int] = Query(None, description="Return users with id greater than this"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum users per page"),
+    username_prefix: Optional[str] = Query(None, min_length=1, max_length=50, description="Only usernames starting with this"),
+    include_total: bool = Query(False, description="Include the total number of users"),
+    admin_user: CurrentUser = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    List all users in the system.
+    List users in the system, one page at a time.
     
-    Admin-only endpoint that returns all users without password information.
+    Admin-only endpoint that returns users without password information,
+    ordered by id. Pass next_after_id from a response as after_id to get
+    the next page; it is None on the last page.
     
     Args:
+        after_id: Keyset cursor (last id of the previous page)
+        limit: Page size
+        username_prefix: Username prefix filter (range scan on the username index)
+        include_total: Also return the (cached) total number of users
         admin_user: Current admin user
         db: Database session
         
     Returns:
-        AdminResponse: List of all users
+        AdminResponse: Page of users, next cursor and optional total
     """
-    users = db.query(User).all()
+    query = select(*USER_LIST_COLUMNS).order_by(User.id).limit(limit + 1)
+    if after_id is not None:
+        query = query.where(User.id > after_id)
+    if username_prefix:
+        # Range instead of LIKE so the username index is used
+        query = query.where(
+            User.username >= username_prefix,
+            User.username < _prefix_upper_bound(username_prefix)
+        )
+    
+    users = (await db.execute(query)).all()
+    next_after_id = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_after_id = users[-1].id
+    
+    total = None
+    if include_total:
+        total = await get_user_counter().aget(lambda: db.scalar(select(func.count(User.id))))
     
     user_list = [
         {
@@ -109,15 +156,17 @@ async def list_users(
     return AdminResponse(
         success=True,
         message=f"Found {len(users)} users",
-        users=user_list
+        users=user_list,
+        next_after_id=next_after_id,
+        total=total
     )
 
 
 @router.post("/users", response_model=AdminResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     request: CreateUserRequest,
-    admin_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    admin_user: CurrentUser = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new user as admin.
@@ -143,25 +192,8 @@ async def create_user(
             detail=error
         )
     
-    # Check if username already exists
-    existing_user = db.query(User).filter(User.username == request.username).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already exists"
-        )
-    
-    # Check if email already exists (if provided)
-    if request.email:
-        existing_email = db.query(User).filter(User.email == request.email).first()
-        if existing_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-    
-    # Create new user
-    hashed_pw = hash_password(request.password)
+    # Create new user (duplicates are rejected by the unique indexes)
+    hashed_pw = await hash_password_async(request.password)
     new_user = User(
         username=request.username,
         email=request.email,
@@ -170,8 +202,8 @@ async def create_user(
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await commit_user(db, new_user)
+    get_user_counter().adjust(1)
     
     return AdminResponse(
         success=True,
@@ -188,8 +220,8 @@ async def create_user(
 @router.delete("/users/{user_id}", response_model=AdminResponse)
 async def delete_user(
     user_id: int,
-    admin_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    admin_user: CurrentUser = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a user from the system.
@@ -208,7 +240,7 @@ async def delete_user(
         HTTPException: If user not found or trying to delete self
     """
     # Check if user exists
-    user_to_delete = db.query(User).filter(User.id == user_id).first()
+    user_to_delete = await db.get(User, user_id)
     if not user_to_delete:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -224,8 +256,10 @@ async def delete_user(
     
     # Delete user
     username = user_to_delete.username
-    db.delete(user_to_delete)
-    db.commit()
+    await db.delete(user_to_delete)
+    await db.commit()
+    get_user_cache().invalidate(user_id)
+    get_user_counter().adjust(-1)
     
     return AdminResponse(
         success=True,
@@ -237,8 +271,8 @@ async def delete_user(
 async def reset_user_password(
     user_id: int,
     request: ResetPasswordRequest,
-    admin_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    admin_user: CurrentUser = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Reset a user's password as admin.
@@ -266,7 +300,7 @@ async def reset_user_password(
         )
     
     # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -274,11 +308,32 @@ async def reset_user_password(
         )
     
     # Reset password
-    user.password_hash = hash_password(request.new_password)
-    db.commit()
+    user.password_hash = await hash_password_async(request.new_password)
+    await db.commit()
+    get_user_cache().invalidate(user_id)
     
     return AdminResponse(
         success=True,
         message=f"Password reset successfully for user '{user.username}'"
     )
 
+
+@router.get("/metrics")
+async def get_metrics(admin_user: CurrentUser = Depends(get_admin_user)):
+    """
+    Report in-process cache and worker metrics.
+    
+    Admin-only endpoint for monitoring hit rates and queue depths.
+    
+    Args:
+        admin_user: Current admin user
+        
+    Returns:
+        dict: Metrics grouped by component
+    """
+    return {
+        "llm_cache": get_llm_cache().stats(),
+        "password_pool": get_password_executor_stats(),
+        "user_cache": get_user_cache().stats(),
+        "token_cache": get_token_cache_stats()
+    }
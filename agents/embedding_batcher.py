@@ -0,0 +1,192 @@
+# agents/embedding_batcher.py
+"""
+Batched, concurrent document embedding for the POC Agent's vector stores.
+
+Replaces the sequential embedding done inside FAISS.from_documents:
+- Chunks are grouped into requests of at most EMBEDDING_BATCH_MAX_TOKENS
+  tokens (counted with tiktoken) and EMBEDDING_BATCH_MAX_INPUTS inputs
+- At most EMBEDDING_MAX_CONCURRENCY requests are in flight per process,
+  shared by every ingestion worker
+- Rate limits (429) and transient API errors are retried with jittered
+  exponential backoff, honouring Retry-After when the server sends it
+- An optional progress callback reports embedded chunks as batches finish
+
+Point EMBEDDINGS_BASE_URL at any OpenAI-compatible server (e.g. a local
+fake) to exercise the pipeline without calling OpenAI.
+"""
+
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import openai
+import tiktoken
+
+# Batching and retry configuration
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "50000"))
+EMBEDDING_BATCH_MAX_INPUTS = int(os.getenv("EMBEDDING_BATCH_MAX_INPUTS", "512"))
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "6"))
+EMBEDDING_BACKOFF_BASE_SECONDS = float(os.getenv("EMBEDDING_BACKOFF_BASE_SECONDS", "1"))
+EMBEDDING_BACKOFF_MAX_SECONDS = float(os.getenv("EMBEDDING_BACKOFF_MAX_SECONDS", "60"))
+
+# Errors worth retrying: rate limits, timeouts, dropped connections, 5xx
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError
+)
+
+# Bounds in-flight embedding requests across all threads of the process
+_request_slots = threading.BoundedSemaphore(EMBEDDING_MAX_CONCURRENCY)
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of an embedding input.
+
+    Falls back to a ~4 characters per token estimate when the tiktoken
+    encoding cannot be loaded (e.g. offline environments).
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        int: Token count
+    """
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    print(f"Warning: tiktoken encoding unavailable, estimating tokens: {e}")
+                    _encoding = False
+    if _encoding is False:
+        return len(text) // 4 + 1
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def batch_texts(
+    texts: List[str],
+    max_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+    max_inputs: int = EMBEDDING_BATCH_MAX_INPUTS
+) -> List[Tuple[int, List[str]]]:
+    """
+    Split texts into request-sized batches, preserving order.
+
+    A single text larger than max_tokens gets a batch of its own.
+
+    Args:
+        texts (list): Texts to embed
+        max_tokens (int): Token budget per request
+        max_inputs (int): Maximum inputs per request
+
+    Returns:
+        list: (index of the first text, texts) tuples
+
+    Example:
+        >>> batch_texts(["a", "b", "c"], max_inputs=2)
+        [(0, ['a', 'b']), (2, ['c'])]
+    """
+    batches = []
+    start, current, current_tokens = 0, [], 0
+    for index, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_inputs):
+            batches.append((start, current))
+            start, current, current_tokens = index, [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        batches.append((start, current))
+    return batches
+
+
+def embed_texts(
+    embeddings,
+    texts: List[str],
+    progress_callback: Optional[Callable[[int, int], None]] = None
+) -> List[List[float]]:
+    """
+    Embed texts in concurrent, token-bounded batches with retries.
+
+    Blocking; call from a worker thread.
+
+    Args:
+        embeddings: LangChain Embeddings client (embed_documents)
+        texts (list): Texts to embed
+        progress_callback (callable, optional): Called with (embedded, total)
+            after each batch completes
+
+    Returns:
+        list: One vector per text, in input order
+
+    Raises:
+        openai.OpenAIError: If a batch still fails after EMBEDDING_MAX_RETRIES retries
+
+    Example:
+        >>> texts = [doc.page_content for doc in docs]
+        >>> vectors = embed_texts(agent.batch_embeddings, texts)
+        >>> store = FAISS.from_embeddings(list(zip(texts, vectors)), agent.embeddings)
+    """
+    if not texts:
+        return []
+
+    batches = batch_texts(texts)
+    vectors: List[Optional[List[float]]] = [None] * len(texts)
+    progress = {"embedded": 0}
+    progress_lock = threading.Lock()
+
+    def run_batch(batch: Tuple[int, List[str]]):
+        start, chunk = batch
+        result = _embed_with_retry(embeddings, chunk)
+        vectors[start:start + len(result)] = result
+        with progress_lock:
+            progress["embedded"] += len(chunk)
+            embedded = progress["embedded"]
+        if progress_callback:
+            progress_callback(embedded, len(texts))
+
+    workers = min(EMBEDDING_MAX_CONCURRENCY, len(batches))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed") as executor:
+        # list() re-raises the first batch failure
+        list(executor.map(run_batch, batches))
+
+    return vectors
+
+
+def _embed_with_retry(embeddings, texts: List[str]) -> List[List[float]]:
+    """Embed one batch, backing off on rate limits and transient errors."""
+    for attempt in range(EMBEDDING_MAX_RETRIES + 1):
+        try:
+            with _request_slots:
+                return embeddings.embed_documents(texts)
+        except RETRYABLE_ERRORS as e:
+            if attempt == EMBEDDING_MAX_RETRIES:
+                raise
+            delay = _backoff_delay(attempt, e)
+            print(f"Warning: Embedding batch failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _backoff_delay(attempt: int, error: Exception) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    cap = min(EMBEDDING_BACKOFF_MAX_SECONDS, EMBEDDING_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    delay = random.uniform(0, cap)
+
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        delay = max(delay, float(retry_after))
+    except (TypeError, ValueError):
+        pass
+    return min(delay, EMBEDDING_BACKOFF_MAX_SECONDS)
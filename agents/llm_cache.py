@@ -0,0 +1,455 @@
+# agents/llm_cache.py
+"""
+Content-addressed cache for LLM responses.
+
+Responses are keyed by model + prompt template + rendered inputs, so an
+identical call (same requirements, same conversation) costs no tokens:
+- In-memory LRU tier for hot entries
+- SQLite tier on disk shared across workers and restarts; async callers
+  reach it through a worker thread, never on the event loop
+- Hits only record their access time in memory; it is written in batches
+- TTL expiry, size/count-based eviction (tracked with running totals, not
+  a table scan per write) and hit/miss counters
+- Per-call bypass
+
+Configured via LLM_CACHE_* environment variables.
+"""
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import tempfile
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Any, Callable, Awaitable
+
+# Cache configuration
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "boot_lang_llm_cache", "llm_cache.db")
+)
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+# Disk hits whose access time is buffered before it is written
+LLM_CACHE_ACCESS_BATCH = int(os.getenv("LLM_CACHE_ACCESS_BATCH", "64"))
+
+
+class LLMCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of LLM response text.
+
+    Example:
+        cache = LLMCache(path=":memory:")
+        text = cache.get_or_compute(
+            "gpt-3.5-turbo", template, inputs,
+            compute=lambda: (prompt | llm).invoke(inputs).content
+        )
+        print(cache.stats()["hits"])
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = LLM_CACHE_PATH,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        enabled: bool = LLM_CACHE_ENABLED,
+        access_batch: int = LLM_CACHE_ACCESS_BATCH
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str, optional): SQLite file for the disk tier; None disables it
+            ttl_seconds (int): Entry lifetime in seconds (0 = never expires)
+            memory_entries (int): Size of the in-memory LRU tier
+            max_entries (int): Maximum entries kept in the disk tier
+            max_bytes (int): Maximum total response bytes kept in the disk tier
+            enabled (bool): When False every call goes straight to the LLM
+            access_batch (int): Disk hits buffered before their access times
+                are written (also written on the next set)
+        """
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.access_batch = access_batch
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0, "evictions": 0}
+
+        # key -> last access time of disk hits not yet written
+        self._accessed: Dict[str, float] = {}
+        # Running disk tier totals for this process's writes; recounted
+        # before evicting, since other workers share the file
+        self._disk_count = 0
+        self._disk_bytes = 0
+
+        self._conn = None
+        if enabled and path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " expires_at REAL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+            self._conn.commit()
+            self._recount_disk_locked()
+
+    @staticmethod
+    def make_key(model: str, template: str, inputs: Dict[str, Any]) -> str:
+        """
+        Build the content-addressed cache key.
+
+        Args:
+            model (str): Model identifier (name and sampling settings)
+            template (str): Prompt template text
+            inputs (dict): Rendered template inputs
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        payload = json.dumps(
+            {"model": model, "template": template, "inputs": inputs},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Key from make_key
+
+        Returns:
+            Optional[str]: Cached response text, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        value = self._get_memory(key)
+        if value is None:
+            value = self._get_disk(key)
+        return value
+
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        Async version of get; the disk tier is read on a worker thread.
+
+        Args:
+            key (str): Key from make_key
+
+        Returns:
+            Optional[str]: Cached response text, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        value = self._get_memory(key)
+        if value is None:
+            if self._conn is None:
+                value = self._get_disk(key)
+            else:
+                value = await asyncio.to_thread(self._get_disk, key)
+        return value
+
+    def set(self, key: str, value: str):
+        """
+        Store a response in both tiers.
+
+        Args:
+            key (str): Key from make_key
+            value (str): Response text
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds > 0 else None
+        with self._lock:
+            self._remember(key, expires_at, value)
+
+            if self._conn is not None:
+                size = len(value.encode("utf-8"))
+                old = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, size, expires_at, last_access)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, expires_at, now)
+                )
+                self._accessed.pop(key, None)
+                if old is None:
+                    self._disk_count += 1
+                    self._disk_bytes += size
+                else:
+                    self._disk_bytes += size - old[0]
+                self._write_accessed_locked()
+                if self._disk_count > self.max_entries or self._disk_bytes > self.max_bytes:
+                    self._evict_disk_locked(now)
+                self._conn.commit()
+
+    async def aset(self, key: str, value: str):
+        """
+        Async version of set; the disk tier is written on a worker thread.
+
+        Args:
+            key (str): Key from make_key
+            value (str): Response text
+        """
+        if self.enabled and self._conn is not None:
+            await asyncio.to_thread(self.set, key, value)
+        else:
+            self.set(key, value)
+
+    def get_or_compute(
+        self,
+        model: str,
+        template: str,
+        inputs: Dict[str, Any],
+        compute: Callable[[], str],
+        bypass: bool = False
+    ) -> str:
+        """
+        Return the cached response for a call, or compute and cache it.
+
+        Args:
+            model (str): Model identifier
+            template (str): Prompt template text
+            inputs (dict): Rendered template inputs
+            compute (callable): Makes the LLM call and returns its text
+            bypass (bool): Skip the lookup and do not store the result
+
+        Returns:
+            str: Response text
+        """
+        if bypass or not self.enabled:
+            self._count_bypass(bypass)
+            return compute()
+
+        key = self.make_key(model, template, inputs)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        value = compute()
+        self.set(key, value)
+        return value
+
+    async def aget_or_compute(
+        self,
+        model: str,
+        template: str,
+        inputs: Dict[str, Any],
+        compute: Callable[[], Awaitable[str]],
+        bypass: bool = False
+    ) -> str:
+        """
+        Async version of get_or_compute; compute is awaited on a miss.
+
+        Args:
+            model (str): Model identifier
+            template (str): Prompt template text
+            inputs (dict): Rendered template inputs
+            compute (callable): Coroutine function returning the response text
+            bypass (bool): Skip the lookup and do not store the result
+
+        Returns:
+            str: Response text
+        """
+        if bypass or not self.enabled:
+            self._count_bypass(bypass)
+            return await compute()
+
+        key = self.make_key(model, template, inputs)
+        cached = await self.aget(key)
+        if cached is not None:
+            return cached
+
+        value = await compute()
+        await self.aset(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report hit/miss counters and tier sizes.
+
+        Returns:
+            dict: Counters, hit rate and entry counts
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+            stats["enabled"] = self.enabled
+            if self._conn is not None:
+                stats["disk_entries"] = self._disk_count
+                stats["disk_bytes"] = self._disk_bytes
+            return stats
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+                self._disk_count = 0
+                self._disk_bytes = 0
+
+    def flush(self):
+        """Write buffered disk-hit access times."""
+        with self._lock:
+            if self._conn is not None and self._accessed:
+                self._write_accessed_locked()
+                self._conn.commit()
+
+    def _count_bypass(self, bypass: bool):
+        if bypass:
+            with self._lock:
+                self._counters["bypassed"] += 1
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        """Look up the memory tier; counts a hit, not a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters["hits"] += 1
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+            if self._conn is None:
+                self._counters["misses"] += 1
+            return None
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        """Look up the disk tier after a memory miss; counts the hit or miss."""
+        if self._conn is None:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, size FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value, expires_at, size = row
+                if expires_at is None or expires_at > now:
+                    self._accessed[key] = now
+                    if len(self._accessed) >= self.access_batch:
+                        self._write_accessed_locked()
+                        self._conn.commit()
+                    self._remember(key, expires_at, value)
+                    self._counters["hits"] += 1
+                    self._counters["disk_hits"] += 1
+                    return value
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._accessed.pop(key, None)
+                self._disk_count -= 1
+                self._disk_bytes -= size
+
+            self._counters["misses"] += 1
+            return None
+
+    def _write_accessed_locked(self):
+        """Write buffered access times (caller commits). Caller must hold self._lock."""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def _recount_disk_locked(self):
+        """Reset the running totals from the table. Caller must hold self._lock."""
+        self._disk_count, self._disk_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+
+    def _remember(self, key: str, expires_at: Optional[float], value: str):
+        """Insert into the memory tier. Caller must hold self._lock."""
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk_locked(self, now: float):
+        """
+        Drop expired entries, then least recently used ones over the limits.
+
+        Only runs once the running totals pass a limit, so the full recount
+        here is paid per eviction, not per write.
+        """
+        cursor = self._conn.execute(
+            "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+        evicted = cursor.rowcount
+
+        self._recount_disk_locked()
+        count, total = self._disk_count, self._disk_bytes
+        if count > self.max_entries or total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM llm_cache ORDER BY last_access ASC"
+            ).fetchall()
+            to_delete = []
+            for key, size in rows:
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                to_delete.append((key,))
+                count -= 1
+                total -= size
+            self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", to_delete)
+            evicted += len(to_delete)
+            self._disk_count, self._disk_bytes = count, total
+
+        self._counters["evictions"] += max(evicted, 0)
+
+
+_default_cache: Optional[LLMCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """
+    Return the process-wide LLM cache, creating it on first use.
+
+    Returns:
+        LLMCache: Shared cache instance
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = LLMCache()
+    return _default_cache
+
+
+def shutdown_llm_cache():
+    """Write buffered access times of the process-wide cache if it was created."""
+    if _default_cache is not None:
+        _default_cache.flush()
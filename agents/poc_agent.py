@@ -12,26 +12,63 @@ Uses LangChain for conversation management and OpenAI for LLM capabilities.
 """
 
 import os
+import copy
+import asyncio
+import hashlib
 import json
 import base64
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator, Callable
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain.prompts import PromptTemplate, ChatPromptTemplate, MessagesPlaceholder
-from langchain.chains import ConversationChain, RetrievalQA, LLMChain
-from langchain.memory import ConversationBufferMemory
+from langchain.prompts import PromptTemplate, ChatPromptTemplate
+from langchain.chains import ConversationChain
 from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain_community.vectorstores import FAISS
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 from langchain.output_parsers import PydanticOutputParser
 
+from agents.llm_cache import LLMCache, get_llm_cache
+from agents.embedding_batcher import embed_texts
+from agents.poc_memory import TokenBudgetMemory
+
 # Load environment variables
 load_dotenv()
 
+# Shared pool for background checks started from sync callers
+_background_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("POC_BACKGROUND_WORKERS", "2")),
+    thread_name_prefix="poc-agent-bg"
+)
+
+# Bounded pool for concurrent POC document generation
+_generation_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("POC_GENERATION_WORKERS", "4")),
+    thread_name_prefix="poc-agent-gen"
+)
+POC_GENERATION_TIMEOUT = float(os.getenv("POC_GENERATION_TIMEOUT_SECONDS", "120"))
+
+# HTTP limits on every LLM request, so a slow call is aborted rather than
+# holding a generation worker after the deadline; with the defaults a call
+# gives up within (1 + retries) * timeout = POC_GENERATION_TIMEOUT
+POC_LLM_TIMEOUT = float(os.getenv("POC_LLM_TIMEOUT_SECONDS", "60"))
+POC_LLM_MAX_RETRIES = int(os.getenv("POC_LLM_MAX_RETRIES", "1"))
+
+# Documentation files written for every POC, in order
+POC_DOCUMENT_FILES = [
+    "poc_desc.md",
+    "requirements.md",
+    "phase_1_frontend.md",
+    "phase_2_backend.md",
+    "phase_3_database.md"
+]
+
 
 # ===== Pydantic Models for Requirements (Phase 4) =====
 
@@ -101,29 +138,39 @@ class POCAgent:
         self.llm = ChatOpenAI(
             model="gpt-3.5-turbo",
             temperature=0.7,
-            api_key=api_key
+            api_key=api_key,
+            timeout=POC_LLM_TIMEOUT,
+            max_retries=POC_LLM_MAX_RETRIES
         )
         
         # Load prompt templates from JSON
         self.prompts = self._load_prompts()
         
-        # Agent state
-        self.conversation_stage = "greeting"
-        self.requirements = {}
-        
-        # Initialize conversation memory
-        self.memory = ConversationBufferMemory(return_messages=True)
+        # Per-conversation state (stage, requirements, memory, chain)
+        self._init_conversation_state()
         
-        # Initialize conversation chain (will be set up per session)
-        self.conversation_chain = None
-        self.conversation_id = None
+        # Initialize embeddings for RAG (EMBEDDINGS_BASE_URL: any OpenAI-compatible server)
+        embeddings_kwargs: Dict[str, Any] = {"api_key": api_key}
+        embeddings_base_url = os.getenv("EMBEDDINGS_BASE_URL")
+        if embeddings_base_url:
+            embeddings_kwargs["base_url"] = embeddings_base_url
+            # Compatible servers expect text inputs, not tiktoken token ids
+            embeddings_kwargs["check_embedding_ctx_length"] = False
+        self.embeddings = OpenAIEmbeddings(**embeddings_kwargs)
         
-        # Initialize embeddings for RAG
-        self.embeddings = OpenAIEmbeddings(api_key=api_key)
+        # Document ingestion client; embedding_batcher owns retries and backoff
+        self.batch_embeddings = OpenAIEmbeddings(max_retries=0, **embeddings_kwargs)
         
         # Vector store cache (per user)
         self.vector_stores: Dict[str, FAISS] = {}
         
+        # Serializes index updates per user (load, add, save_local)
+        self._vector_store_locks: Dict[str, threading.Lock] = {}
+        self._vector_store_locks_guard = threading.Lock()
+        
+        # Response cache for deterministic agent calls (shared across sessions)
+        self.llm_cache: LLMCache = get_llm_cache()
+        
         # Text splitter for document chunking
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
@@ -131,6 +178,57 @@ class POCAgent:
             length_function=len
         )
         
+    def _init_conversation_state(self):
+        """
+        Reset the lightweight, per-conversation part of the agent.
+        
+        Everything set here belongs to a single conversation; the LLM,
+        embeddings, prompts and vector store cache are shared clients.
+        """
+        # Agent state
+        self.conversation_stage = "greeting"
+        self.requirements = {}
+        
+        # Initialize conversation memory: recent turns verbatim, older
+        # turns rolled into a running summary (token-budgeted)
+        self.memory = TokenBudgetMemory(llm=self.llm, return_messages=True)
+        
+        # Conversation message number up to which requirements were extracted
+        self.extraction_watermark = 0
+        
+        # Initialize conversation chain (will be set up per session)
+        self.conversation_chain = None
+        self.conversation_id = None
+        
+        # Background contradiction detection (see schedule_contradiction_check)
+        self.contradiction_analysis = None
+        self._contradiction_hash = None
+        self._contradiction_task = None
+    
+    def new_session(self, conversation_id: Optional[str] = None) -> "POCAgent":
+        """
+        Create a conversation-scoped agent that shares this agent's clients.
+        
+        The returned agent reuses the LLM, embeddings, prompts, text splitter
+        and vector store cache, but has its own memory, stage, requirements
+        and conversation chain, so concurrent conversations never mix.
+        
+        Args:
+            conversation_id (str, optional): Conversation identifier to assign
+            
+        Returns:
+            POCAgent: Agent holding fresh conversation state
+            
+        Example:
+            >>> base = POCAgent()
+            >>> session_agent = base.new_session("conv_1_20250101_120000")
+            >>> session_agent.process_request("I want a task tracker", "1")
+        """
+        session_agent = copy.copy(self)
+        session_agent._init_conversation_state()
+        session_agent.conversation_id = conversation_id
+        return session_agent
+    
     def _load_prompts(self) -> Dict[str, Any]:
         """
         Load prompt templates from JSON configuration file.
@@ -164,12 +262,61 @@ class POCAgent:
                 e.pos
             )
     
-    def generate_friendly_name(self, description: str) -> str:
+    def _cached_llm_call(
+        self,
+        prompt: PromptTemplate,
+        inputs: Dict[str, Any],
+        use_cache: bool = True
+    ) -> str:
+        """
+        Run prompt | llm and return the response text through the LLM cache.
+        
+        Args:
+            prompt (PromptTemplate): Prompt to render
+            inputs (dict): Template inputs
+            use_cache (bool): False bypasses the cache for this call
+            
+        Returns:
+            str: Response text
+        """
+        return self.llm_cache.get_or_compute(
+            self._llm_cache_model_id(),
+            prompt.template,
+            inputs,
+            lambda: (prompt | self.llm).invoke(inputs).content,
+            bypass=not use_cache
+        )
+    
+    async def _acached_llm_call(
+        self,
+        prompt: PromptTemplate,
+        inputs: Dict[str, Any],
+        use_cache: bool = True
+    ) -> str:
+        """Async version of _cached_llm_call."""
+        async def compute():
+            result = await (prompt | self.llm).ainvoke(inputs)
+            return result.content
+        
+        return await self.llm_cache.aget_or_compute(
+            self._llm_cache_model_id(),
+            prompt.template,
+            inputs,
+            compute,
+            bypass=not use_cache
+        )
+    
+    def _llm_cache_model_id(self) -> str:
+        """Model identifier used in cache keys (name and temperature)."""
+        return f"{self.llm.model_name}@{self.llm.temperature}"
+    
+    def generate_friendly_name(self, description: str, use_cache: bool = True) -> str:
         """
         Generate a friendly, filesystem-safe POC name from user description.
         
         Args:
             description (str): User's description of what they want to build
+            use_cache (bool): False bypasses the LLM response cache
             
         Returns:
             str: Friendly name (e.g., "customer_feedback_analyzer")
@@ -199,15 +346,14 @@ Name:"""
         )
         
         # Generate name using LLM
-        chain = prompt | self.llm
-        result = chain.invoke({
+        result = self._cached_llm_call(prompt, {
             "description": description,
             "instructions": instructions,
             "max_length": max_length
-        })
+        }, use_cache=use_cache)
         
         # Clean up result
-        name = result.content.strip().lower()
+        name = result.strip().lower()
         # Remove any quotes or extra characters
         name = name.replace('"', '').replace("'", '').replace(' ', '_')
         # Ensure valid filesystem name
@@ -291,11 +437,11 @@ Name:"""
             verbose=False
         )
         
-        # Inject system prompt into first message
+        # Pin the system prompt outside the buffer so pruning never drops it
+        self.memory.system_message = system_prompt
         if not self.memory.chat_memory.messages:
-            # Add system context as first interaction
             self.memory.chat_memory.add_ai_message(
-                f"[SYSTEM CONTEXT: {system_prompt}] Hello! I'm here to help you build a POC. What would you like to create?"
+                "Hello! I'm here to help you build a POC. What would you like to create?"
             )
     
     def process_request(
@@ -332,30 +478,15 @@ Name:"""
             >>> print(result["response"])
             "Great! Let me ask you some questions about that..."
         """
-        # Generate or restore conversation ID
-        if conversation_history:
-            self.conversation_id = conversation_history.get("conversation_id")
-            self._restore_state(conversation_history)
-        elif self.conversation_id is None:
-            # Only create new ID if we don't have one yet
-            self.conversation_id = f"conv_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
-        # Set up conversation chain if not already done
-        if self.conversation_chain is None:
-            self._setup_conversation_chain()
+        self._begin_turn(user_id, conversation_history)
         
         # Phase 3: Retrieve document context if available
         context = ""
         if document_ids or user_id:
             # Retrieve relevant context from user's uploaded documents
-            retrieved_context = self.retrieve_context(prompt, user_id)
-            if retrieved_context:
-                context = f"\n\n[CONTEXT FROM UPLOADED DOCUMENTS]\n{retrieved_context}\n[END CONTEXT]\n"
+            context = self.retrieve_context(prompt, user_id)
         
-        # Combine user prompt with retrieved context
-        full_prompt = prompt
-        if context:
-            full_prompt = f"{context}\nUser Question: {prompt}"
+        full_prompt = self._build_full_prompt(prompt, context)
         
         # Process through conversation chain
         try:
@@ -364,36 +495,281 @@ Name:"""
             # Update agent state based on conversation
             self._update_conversation_stage(prompt, response)
             
-            # Phase 5: Check for contradictions after updating requirements
-            if self.requirements:
-                contradiction_check = self.detect_contradictions(self.requirements)
-                if contradiction_check.get("has_contradictions"):
-                    # Store for frontend to display
-                    self.requirements["_contradictions"] = contradiction_check
+            # Phase 5: Check for contradictions in the background (off the hot path)
+            self.schedule_contradiction_check()
             
-            # Determine next action
-            next_action = self._determine_next_action()
+            return self._turn_result(response)
             
-            return {
-                "response": response,
-                "conversation_id": self.conversation_id,
-                "agent_state": {
-                    "stage": self.conversation_stage,
-                    "requirements": self.requirements
-                },
-                "next_action": next_action
-            }
+        except Exception as e:
+            return self._error_result(e)
+    
+    async def aprocess_request(
+        self,
+        prompt: str,
+        user_id: str,
+        document_ids: Optional[List[str]] = None,
+        conversation_history: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Async version of process_request.
+        
+        Uses the LangChain async APIs (apredict/ainvoke) and an async FAISS
+        lookup so a chat turn costs an event-loop task instead of a thread.
+        
+        Args:
+            prompt (str): User's message/question
+            user_id (str): User identifier for session tracking
+            document_ids (list, optional): IDs of uploaded documents to use as context
+            conversation_history (dict, optional): Previous conversation state to restore
+            
+        Returns:
+            dict: Same structure as process_request
+        
+        Example:
+            >>> result = await agent.aprocess_request(
+            ...     "I want to build a customer feedback tool",
+            ...     user_id="user123"
+            ... )
+        """
+        self._begin_turn(user_id, conversation_history)
+        
+        context = ""
+        if document_ids or user_id:
+            context = await self.aretrieve_context(prompt, user_id)
+        
+        full_prompt = self._build_full_prompt(prompt, context)
+        
+        try:
+            response = await self.conversation_chain.apredict(input=full_prompt)
+            
+            self._update_conversation_stage(prompt, response)
+            
+            self.schedule_contradiction_check()
+            
+            return self._turn_result(response)
             
         except Exception as e:
-            return {
-                "response": f"I encountered an error: {str(e)}. Could you rephrase that?",
-                "conversation_id": self.conversation_id,
-                "agent_state": {
-                    "stage": self.conversation_stage,
-                    "requirements": self.requirements
-                },
-                "next_action": "retry"
-            }
+            return self._error_result(e)
+    
+    async def astream_request(
+        self,
+        prompt: str,
+        user_id: str,
+        document_ids: Optional[List[str]] = None,
+        conversation_history: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming version of aprocess_request.
+        
+        Yields the model's tokens as they arrive, then a final event with the
+        same payload aprocess_request returns (agent_state, next_action).
+        
+        Args:
+            prompt (str): User's message/question
+            user_id (str): User identifier for session tracking
+            document_ids (list, optional): IDs of uploaded documents to use as context
+            conversation_history (dict, optional): Previous conversation state to restore
+            
+        Yields:
+            dict: Events of the form
+                {"event": "start", "data": {"conversation_id": str}}
+                {"event": "token", "data": {"token": str}}
+                {"event": "done", "data": <process_request result>}
+        
+        Example:
+            >>> async for event in agent.astream_request("Hi", user_id="user123"):
+            ...     print(event["event"], event["data"])
+        """
+        # Setup and retrieval run inside the try so the client always gets a done event
+        try:
+            self._begin_turn(user_id, conversation_history)
+            yield {"event": "start", "data": {"conversation_id": self.conversation_id}}
+            
+            context = ""
+            if document_ids or user_id:
+                context = await self.aretrieve_context(prompt, user_id)
+            
+            full_prompt = self._build_full_prompt(prompt, context)
+            
+            # Render the chain's prompt (history + input) exactly as predict would
+            inputs = self.conversation_chain.prep_inputs({"input": full_prompt})
+            chain_prompt = self.conversation_chain.prompt
+            prompt_value = chain_prompt.format_prompt(
+                **{key: inputs[key] for key in chain_prompt.input_variables}
+            )
+            
+            tokens = []
+            async for chunk in self.llm.astream(prompt_value):
+                if chunk.content:
+                    tokens.append(chunk.content)
+                    yield {"event": "token", "data": {"token": chunk.content}}
+            
+            response = "".join(tokens)
+            await self.memory.asave_context({"input": full_prompt}, {"response": response})
+            
+            self._update_conversation_stage(prompt, response)
+            
+            self.schedule_contradiction_check()
+            
+            yield {"event": "done", "data": self._turn_result(response)}
+            
+        except Exception as e:
+            yield {"event": "done", "data": self._error_result(e)}
+    
+    def _begin_turn(self, user_id: str, conversation_history: Optional[Dict[str, Any]]):
+        """Restore or assign the conversation ID and make sure the chain exists."""
+        # Generate or restore conversation ID
+        if conversation_history:
+            self.conversation_id = conversation_history.get("conversation_id") or self.conversation_id
+            self._restore_state(conversation_history)
+        if self.conversation_id is None:
+            # Only create new ID if we don't have one yet
+            self.conversation_id = f"conv_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        
+        # Set up conversation chain if not already done
+        if self.conversation_chain is None:
+            self._setup_conversation_chain()
+    
+    def _build_full_prompt(self, prompt: str, retrieved_context: str) -> str:
+        """Combine user prompt with retrieved document context."""
+        if not retrieved_context:
+            return prompt
+        context = f"\n\n[CONTEXT FROM UPLOADED DOCUMENTS]\n{retrieved_context}\n[END CONTEXT]\n"
+        return f"{context}\nUser Question: {prompt}"
+    
+    def schedule_contradiction_check(self) -> bool:
+        """
+        Run contradiction detection for the current requirements in the background.
+        
+        The check is skipped when the requirements are empty or unchanged since
+        the last check. Inside an event loop it runs as an asyncio task,
+        otherwise on a small shared thread pool. The result is exposed through
+        get_contradiction_status() and the next turn's agent_state.
+        
+        Returns:
+            bool: True if a new check was scheduled
+        """
+        if not self.requirements:
+            return False
+        
+        requirements_hash = self._requirements_hash(self.requirements)
+        if requirements_hash == self._contradiction_hash:
+            return False
+        
+        self._contradiction_hash = requirements_hash
+        snapshot = {k: v for k, v in self.requirements.items() if k != "_contradictions"}
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Sync caller: no event loop, use the shared thread pool
+            self._contradiction_task = _background_executor.submit(
+                self._run_contradiction_check_sync, requirements_hash, snapshot
+            )
+        else:
+            self._contradiction_task = asyncio.create_task(
+                self._run_contradiction_check(requirements_hash, snapshot)
+            )
+        return True
+    
+    async def _run_contradiction_check(self, requirements_hash: str, requirements: Dict[str, Any]):
+        """Background task body for the async path."""
+        analysis = await self.adetect_contradictions(requirements)
+        self._record_contradiction_check(requirements_hash, analysis)
+    
+    def _run_contradiction_check_sync(self, requirements_hash: str, requirements: Dict[str, Any]):
+        """Background task body for the thread pool path."""
+        analysis = self.detect_contradictions(requirements)
+        self._record_contradiction_check(requirements_hash, analysis)
+    
+    def _record_contradiction_check(self, requirements_hash: str, analysis: Dict[str, Any]):
+        """Store a finished analysis unless the requirements changed meanwhile."""
+        if requirements_hash != self._contradiction_hash:
+            return
+        self.contradiction_analysis = analysis
+        if analysis.get("has_contradictions"):
+            # Store for frontend to display
+            self.requirements["_contradictions"] = analysis
+        else:
+            self.requirements.pop("_contradictions", None)
+    
+    def get_contradiction_status(self) -> Dict[str, Any]:
+        """
+        Report the state of background contradiction detection.
+        
+        Returns:
+            dict: Status with structure:
+                {
+                    "status": str,  # idle, pending, ready
+                    "requirements_hash": str or None,
+                    "analysis": dict or None  # detect_contradictions result
+                }
+        """
+        task = self._contradiction_task
+        if task is not None and not task.done():
+            status = "pending"
+        elif self.contradiction_analysis is not None:
+            status = "ready"
+        else:
+            status = "idle"
+        
+        return {
+            "status": status,
+            "requirements_hash": self._contradiction_hash,
+            "analysis": self.contradiction_analysis
+        }
+    
+    @staticmethod
+    def saved_contradiction_status(saved_state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Contradiction status of a saved conversation (see save_conversation).
+        
+        Args:
+            saved_state (dict): Saved conversation state
+            
+        Returns:
+            dict: Same structure as get_contradiction_status
+        """
+        saved = saved_state.get("contradictions") or {}
+        return {
+            "status": "ready" if saved.get("analysis") is not None else "idle",
+            "requirements_hash": saved.get("requirements_hash"),
+            "analysis": saved.get("analysis")
+        }
+    
+    @staticmethod
+    def _requirements_hash(requirements: Dict[str, Any]) -> str:
+        """Stable hash of requirements, ignoring stored contradiction results."""
+        payload = {k: v for k, v in requirements.items() if k != "_contradictions"}
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+    
+    def _turn_result(self, response: str) -> Dict[str, Any]:
+        """Build the response payload for a completed turn."""
+        return {
+            "response": response,
+            "conversation_id": self.conversation_id,
+            "agent_state": {
+                "stage": self.conversation_stage,
+                "requirements": self.requirements,
+                "contradictions": self.get_contradiction_status()
+            },
+            "next_action": self._determine_next_action()
+        }
+    
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        """Build the response payload for a failed turn."""
+        return {
+            "response": f"I encountered an error: {str(error)}. Could you rephrase that?",
+            "conversation_id": self.conversation_id,
+            "agent_state": {
+                "stage": self.conversation_stage,
+                "requirements": self.requirements,
+                "contradictions": self.get_contradiction_status()
+            },
+            "next_action": "retry"
+        }
     
     def _restore_state(self, conversation_history: Dict[str, Any]):
         """
@@ -407,9 +783,17 @@ Name:"""
         self.conversation_stage = conversation_history.get("stage", "greeting")
         self.requirements = conversation_history.get("requirements", {})
         
+        # Restore the last finished contradiction check (not re-run if unchanged)
+        contradictions = conversation_history.get("contradictions") or {}
+        self.contradiction_analysis = contradictions.get("analysis")
+        self._contradiction_hash = contradictions.get("requirements_hash")
+        
         # Restore memory if available
         if "memory" in conversation_history:
-            # Reconstruct memory from stored messages
+            # Reconstruct memory from stored summary and messages
+            self.memory.moving_summary_buffer = conversation_history["memory"].get("summary", "")
+            self.memory.pruned_message_count = conversation_history["memory"].get("pruned_messages", 0)
+            self.extraction_watermark = conversation_history.get("extraction_watermark", 0)
             messages = conversation_history["memory"].get("messages", [])
             for msg in messages:
                 if msg["type"] == "human":
@@ -457,7 +841,9 @@ Name:"""
         Save current conversation state for persistence.
         
         Returns:
-            dict: Conversation state including memory, stage, requirements
+            dict: Conversation state including memory (running summary and
+                recent messages), stage, requirements and the last finished
+                contradiction analysis
             
         Example:
             >>> agent = POCAgent()
@@ -478,11 +864,22 @@ Name:"""
             "stage": self.conversation_stage,
             "requirements": self.requirements,
             "memory": {
+                "summary": self.memory.moving_summary_buffer,
+                "pruned_messages": self.memory.pruned_message_count,
                 "messages": messages
             },
+            "extraction_watermark": self.extraction_watermark,
+            "contradictions": self._finished_contradiction_check(),
             "updated_at": datetime.now().isoformat()
         }
     
+    def _finished_contradiction_check(self) -> Optional[Dict[str, Any]]:
+        """Last finished contradiction check; None while one is pending."""
+        status = self.get_contradiction_status()
+        if status["status"] != "ready":
+            return None
+        return {"requirements_hash": status["requirements_hash"], "analysis": status["analysis"]}
+    
     def load_conversation(self, saved_state: Dict[str, Any]):
         """
         Load a previously saved conversation state.
@@ -552,13 +949,24 @@ Name:"""
         except Exception as e:
             raise Exception(f"Error loading document: {str(e)}")
     
-    def create_vector_store(self, documents: List[Document], user_id: str) -> FAISS:
+    def create_vector_store(
+        self,
+        documents: List[Document],
+        user_id: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> FAISS:
         """
         Create or update FAISS vector store for a user with document embeddings.
         
+        Blocking (embedding calls and disk I/O); run it off the event loop.
+        Chunks are embedded in concurrent batches (see embedding_batcher)
+        before the user's lock is taken. Updates for the same user are
+        serialized so concurrent ingestions never lose each other's documents.
+        
         Args:
             documents (list): List of Document objects to embed
             user_id (str): User identifier for vector store isolation
+            progress_callback (callable, optional): Called with (embedded, total) chunks
             
         Returns:
             FAISS: Vector store with embedded documents
@@ -575,10 +983,34 @@ Name:"""
         # Check if vector store already exists for this user
         vector_store_path = os.path.join(vector_store_dir, "faiss_index")
         
+        texts = [doc.page_content for doc in documents]
+        vectors = embed_texts(self.batch_embeddings, texts, progress_callback)
+        text_embeddings = list(zip(texts, vectors))
+        metadatas = [doc.metadata for doc in documents]
+        
+        with self._get_vector_store_lock(user_id):
+            return self._update_vector_store(text_embeddings, metadatas, user_id, vector_store_path)
+    
+    def _get_vector_store_lock(self, user_id: str) -> threading.Lock:
+        """Return the lock guarding a user's vector store, creating it on first use."""
+        with self._vector_store_locks_guard:
+            lock = self._vector_store_locks.get(user_id)
+            if lock is None:
+                lock = self._vector_store_locks[user_id] = threading.Lock()
+            return lock
+    
+    def _update_vector_store(
+        self,
+        text_embeddings: List[tuple],
+        metadatas: List[dict],
+        user_id: str,
+        vector_store_path: str
+    ) -> FAISS:
+        """Add embedded chunks to the user's vector store and save it (caller holds the user's lock)."""
         if user_id in self.vector_stores:
             # Add to existing vector store
-            print(f"Adding {len(documents)} documents to existing vector store...")
-            self.vector_stores[user_id].add_documents(documents)
+            print(f"Adding {len(text_embeddings)} documents to existing vector store...")
+            self.vector_stores[user_id].add_embeddings(text_embeddings, metadatas=metadatas)
             vector_store = self.vector_stores[user_id]
             
         elif os.path.exists(vector_store_path):
@@ -589,13 +1021,13 @@ Name:"""
                 self.embeddings,
                 allow_dangerous_deserialization=True
             )
-            vector_store.add_documents(documents)
+            vector_store.add_embeddings(text_embeddings, metadatas=metadatas)
             self.vector_stores[user_id] = vector_store
             
         else:
             # Create new vector store
-            print(f"Creating new vector store with {len(documents)} documents...")
-            vector_store = FAISS.from_documents(documents, self.embeddings)
+            print(f"Creating new vector store with {len(text_embeddings)} documents...")
+            vector_store = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas)
             self.vector_stores[user_id] = vector_store
         
         # Save vector store to disk
@@ -621,11 +1053,59 @@ Name:"""
             >>> context = agent.retrieve_context("What are the UI requirements?", "user123")
             >>> print(context)
         """
+        vector_store = self._get_user_vector_store(user_id)
+        if vector_store is None:
+            return ""
+        
+        # Retrieve relevant documents
+        try:
+            retriever = vector_store.as_retriever(
+                search_kwargs={"k": k}
+            )
+            relevant_docs = retriever.get_relevant_documents(query)
+            return self._format_context(relevant_docs)
+            
+        except Exception as e:
+            print(f"Warning: Error retrieving context: {e}")
+            return ""
+    
+    async def aretrieve_context(self, query: str, user_id: str, k: int = 3) -> str:
+        """
+        Async version of retrieve_context.
+        
+        Loads the FAISS index off the event loop and embeds the query with
+        the async embeddings client.
+        
+        Args:
+            query (str): Query text to search for relevant context
+            user_id (str): User identifier to access their vector store
+            k (int): Number of relevant chunks to retrieve (default: 3)
+            
+        Returns:
+            str: Concatenated relevant context from documents, or empty string if no documents
+        """
+        if user_id in self.vector_stores:
+            vector_store = self.vector_stores[user_id]
+        else:
+            vector_store = await asyncio.to_thread(self._get_user_vector_store, user_id)
+        if vector_store is None:
+            return ""
+        
+        try:
+            relevant_docs = await vector_store.asimilarity_search(query, k=k)
+            return self._format_context(relevant_docs)
+            
+        except Exception as e:
+            print(f"Warning: Error retrieving context: {e}")
+            return ""
+    
+    def _get_user_vector_store(self, user_id: str) -> Optional[FAISS]:
+        """Return the user's vector store, loading it from disk if needed."""
         # Check if user has any documents
         vector_store_path = os.path.join("vector_stores", user_id, "faiss_index")
         
         if user_id not in self.vector_stores and not os.path.exists(vector_store_path):
-            return ""
+            return None
         
         # Load vector store if not in memory
         if user_id not in self.vector_stores:
@@ -637,35 +1117,28 @@ Name:"""
                 )
             except Exception as e:
                 print(f"Warning: Could not load vector store for {user_id}: {e}")
-                return ""
+                return None
         
-        # Retrieve relevant documents
-        try:
-            retriever = self.vector_stores[user_id].as_retriever(
-                search_kwargs={"k": k}
-            )
-            relevant_docs = retriever.get_relevant_documents(query)
-            
-            if not relevant_docs:
-                return ""
-            
-            # Concatenate context from relevant chunks
-            context_parts = []
-            for i, doc in enumerate(relevant_docs, 1):
-                context_parts.append(f"[Document Excerpt {i}]\n{doc.page_content}")
-            
-            context = "\n\n".join(context_parts)
-            print(f"✓ Retrieved {len(relevant_docs)} relevant document chunks")
-            
-            return context
-            
-        except Exception as e:
-            print(f"Warning: Error retrieving context: {e}")
+        return self.vector_stores[user_id]
+    
+    def _format_context(self, relevant_docs: List[Document]) -> str:
+        """Concatenate retrieved chunks into a context block."""
+        if not relevant_docs:
             return ""
+        
+        # Concatenate context from relevant chunks
+        context_parts = []
+        for i, doc in enumerate(relevant_docs, 1):
+            context_parts.append(f"[Document Excerpt {i}]\n{doc.page_content}")
+        
+        context = "\n\n".join(context_parts)
+        print(f"✓ Retrieved {len(relevant_docs)} relevant document chunks")
+        
+        return context
     
     # ===== Requirements Gathering Methods (Phase 4) =====
     
-    def gather_requirements(self, conversation_so_far: str) -> Dict[str, Any]:
+    def gather_requirements(self, conversation_so_far: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Extract structured requirements from conversation history.
         
@@ -674,6 +1147,7 @@ Name:"""
         
         Args:
             conversation_so_far (str): The conversation history to analyze
+            use_cache (bool): False bypasses the LLM response cache
             
         Returns:
             dict: Structured requirements extracted from conversation
@@ -703,15 +1177,13 @@ For frontend, backend, and database fields, extract into nested dictionaries wit
 Output the requirements in the specified JSON format:"""
         )
         
-        # Create chain for extraction
-        extraction_chain = extraction_prompt | self.llm | parser
-        
         try:
             # Extract requirements
-            requirements = extraction_chain.invoke({
+            response_text = self._cached_llm_call(extraction_prompt, {
                 "conversation": conversation_so_far,
                 "format_instructions": parser.get_format_instructions()
-            })
+            }, use_cache=use_cache)
+            requirements = parser.parse(response_text)
             
             # Convert to dict
             requirements_dict = requirements.dict()
@@ -787,42 +1259,109 @@ Output the requirements in the specified JSON format:"""
             "suggestions": suggestions
         }
     
-    def update_requirements_from_conversation(self):
+    def update_requirements_from_conversation(self, use_cache: bool = True):
         """
         Update agent's requirements state by extracting from conversation memory.
         
-        This method analyzes the current conversation and extracts
-        structured requirements, updating the agent's internal state.
+        Only messages added since the last extraction are sent to the LLM,
+        together with the current requirements, and the returned patch is
+        merged in. Cost is proportional to the new turns, not the whole
+        conversation.
+        
+        Args:
+            use_cache (bool): False bypasses the LLM response cache
         """
-        if not self.memory or not self.memory.chat_memory.messages:
+        patch = self.extract_requirements_patch(use_cache=use_cache)
+        if not patch:
             return
         
-        # Build conversation string from memory
+        # Merge patch into existing requirements
+        self.requirements.update(patch)
+        
+        print(f"✓ Updated requirements: {list(self.requirements.keys())}")
+    
+    def extract_requirements_patch(self, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Extract requirement changes from messages since the last extraction.
+        
+        Advances the per-session extraction watermark on success. If some
+        unextracted messages were already folded into the memory summary,
+        the summary is included so nothing is lost.
+        
+        Args:
+            use_cache (bool): False bypasses the LLM response cache
+            
+        Returns:
+            dict: Requirement fields that are new or changed (empty if none)
+            
+        Example:
+            >>> agent.process_request("Users are small sales teams", "user123")
+            >>> agent.extract_requirements_patch()
+            {"users": "Small sales teams"}
+        """
+        if not self.memory:
+            return {}
+        
+        total_messages = self.memory.total_message_count
+        if total_messages <= self.extraction_watermark:
+            return {}
+        
+        # Messages after the watermark that are still verbatim in memory
+        first_index = self.memory.pruned_message_count
+        new_messages = self.memory.chat_memory.messages[max(0, self.extraction_watermark - first_index):]
+        
         conversation_text = []
-        for msg in self.memory.chat_memory.messages:
+        if self.extraction_watermark < first_index and self.memory.moving_summary_buffer:
+            conversation_text.append(f"Summary of earlier conversation: {self.memory.moving_summary_buffer}")
+        for msg in new_messages:
             role = "Agent" if msg.type == "ai" else "User"
             conversation_text.append(f"{role}: {msg.content}")
         
-        conversation_str = "\n".join(conversation_text)
+        parser = PydanticOutputParser(pydantic_object=RequirementsSchema)
+        patch_prompt = PromptTemplate(
+            input_variables=["current_requirements", "new_messages", "format_instructions"],
+            template="""You are maintaining the requirements of a POC application as a conversation continues.
+
+Current requirements (JSON):
+{current_requirements}
+
+New messages since the last update:
+{new_messages}
+
+Return ONLY the fields that the new messages add or change. Set every other field to null.
+For frontend, backend, and database fields, return the complete updated nested dictionary.
+
+{format_instructions}
+
+Output the requirement changes in the specified JSON format:"""
+        )
         
-        # Extract requirements
-        extracted = self.gather_requirements(conversation_str)
+        current = {k: v for k, v in self.requirements.items() if not k.startswith("_")}
         
-        # Merge with existing requirements (keep non-null values)
-        for key, value in extracted.items():
-            if value is not None:
-                self.requirements[key] = value
+        try:
+            response_text = self._cached_llm_call(patch_prompt, {
+                "current_requirements": json.dumps(current, indent=2, sort_keys=True),
+                "new_messages": "\n".join(conversation_text),
+                "format_instructions": parser.get_format_instructions()
+            }, use_cache=use_cache)
+            extracted = parser.parse(response_text).dict()
+            
+        except Exception as e:
+            print(f"Warning: Could not extract requirement changes: {e}")
+            return {}
         
-        print(f"✓ Updated requirements: {list(self.requirements.keys())}")
+        self.extraction_watermark = total_messages
+        return {key: value for key, value in extracted.items() if value is not None}
     
     # ===== Contradiction Detection & Simplicity (Phase 5) =====
     
-    def detect_contradictions(self, requirements: Dict[str, Any]) -> Dict[str, Any]:
+    def detect_contradictions(self, requirements: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
         """
-        Detect contradictions in requirements using LLMChain.
+        Detect contradictions in requirements using the LLM.
         
         Args:
             requirements (dict): Requirements to check for contradictions
+            use_cache (bool): False bypasses the LLM response cache
             
         Returns:
             dict: Contradiction analysis with structure:
@@ -832,9 +1371,41 @@ Output the requirements in the specified JSON format:"""
                     "clarifying_questions": list
                 }
         """
+        contradiction_prompt, inputs = self._contradiction_prompt(requirements)
+        
+        try:
+            response_text = self._cached_llm_call(contradiction_prompt, inputs, use_cache=use_cache)
+            return self._parse_contradiction_response(response_text)
+            
+        except Exception as e:
+            print(f"Warning: Contradiction detection failed: {e}")
+            return {"has_contradictions": False, "contradictions": [], "clarifying_questions": []}
+    
+    async def adetect_contradictions(self, requirements: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Async version of detect_contradictions.
+        
+        Args:
+            requirements (dict): Requirements to check for contradictions
+            use_cache (bool): False bypasses the LLM response cache
+            
+        Returns:
+            dict: Same structure as detect_contradictions
+        """
+        contradiction_prompt, inputs = self._contradiction_prompt(requirements)
+        
+        try:
+            response_text = await self._acached_llm_call(contradiction_prompt, inputs, use_cache=use_cache)
+            return self._parse_contradiction_response(response_text)
+            
+        except Exception as e:
+            print(f"Warning: Contradiction detection failed: {e}")
+            return {"has_contradictions": False, "contradictions": [], "clarifying_questions": []}
+    
+    def _contradiction_prompt(self, requirements: Dict[str, Any]):
+        """Build the contradiction prompt and its inputs."""
         # Get contradiction detection patterns from prompts
         patterns = self.prompts.get("contradiction_detection", {}).get("patterns", [])
-        resolution_prompts = self.prompts.get("contradiction_detection", {}).get("resolution_prompts", [])
         
         # Create prompt for contradiction detection
         contradiction_prompt = PromptTemplate(
@@ -856,37 +1427,27 @@ Identify any contradictions, conflicts, or inconsistencies. Return your analysis
 """
         )
         
-        # Create LLMChain
-        contradiction_chain = LLMChain(llm=self.llm, prompt=contradiction_prompt)
-        
-        try:
-            result = contradiction_chain.invoke({
-                "requirements": json.dumps(requirements, indent=2),
-                "patterns": "\n".join(f"- {p}" for p in patterns)
-            })
-            
-            # Parse JSON response
-            response_text = result["text"]
-            # Extract JSON from response
-            import re
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                analysis = json.loads(json_match.group())
-            else:
-                analysis = {"has_contradictions": False, "contradictions": [], "clarifying_questions": []}
-            
-            return analysis
-            
-        except Exception as e:
-            print(f"Warning: Contradiction detection failed: {e}")
-            return {"has_contradictions": False, "contradictions": [], "clarifying_questions": []}
+        inputs = {
+            "requirements": json.dumps(requirements, indent=2),
+            "patterns": "\n".join(f"- {p}" for p in patterns)
+        }
+        return contradiction_prompt, inputs
+    
+    def _parse_contradiction_response(self, response_text: str) -> Dict[str, Any]:
+        """Extract the JSON contradiction analysis from an LLM response."""
+        import re
+        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group())
+        return {"has_contradictions": False, "contradictions": [], "clarifying_questions": []}
     
-    def suggest_simplification(self, requirements: Dict[str, Any]) -> Dict[str, Any]:
+    def suggest_simplification(self, requirements: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
         """
         Suggest simplifications using simplicity enforcement guidelines.
         
         Args:
             requirements (dict): Requirements to analyze for simplification
+            use_cache (bool): False bypasses the LLM response cache
             
         Returns:
             dict: Simplification suggestions with structure:
@@ -918,17 +1479,13 @@ Provide simplification suggestions as JSON:
 """
         )
         
-        # Create LLMChain
-        simplification_chain = LLMChain(llm=self.llm, prompt=simplification_prompt)
-        
         try:
-            result = simplification_chain.invoke({
+            response_text = self._cached_llm_call(simplification_prompt, {
                 "requirements": json.dumps(requirements, indent=2),
                 "guidelines": "\n".join(f"- {g}" for g in guidelines)
-            })
+            }, use_cache=use_cache)
             
             # Parse JSON response
-            response_text = result["text"]
             import re
             json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
             if json_match:
@@ -944,13 +1501,39 @@ Provide simplification suggestions as JSON:
     
     # ===== POC Generation (Phase 6) =====
     
-    def generate_poc(self, requirements: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    def generate_poc(
+        self,
+        requirements: Dict[str, Any],
+        user_id: str,
+        timeout: Optional[float] = None,
+        progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        use_cache: bool = True,
+        poc_id: Optional[str] = None,
+        directory: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Generate complete POC structure with all documentation files.
         
+        The friendly name is generated first; the description and the three
+        phase documents are then requested concurrently on a bounded thread
+        pool, and each file is written as soon as its call finishes. A call
+        that fails or exceeds the timeout is reported in "failed" instead of
+        aborting the whole generation.
+        
         Args:
             requirements (dict): Complete requirements for POC
             user_id (str): User ID for directory organization
+            timeout (float, optional): Seconds to wait for the document calls
+                (default: POC_GENERATION_TIMEOUT_SECONDS)
+            progress_callback (callable, optional): Called as
+                progress_callback(event, payload) with events "started"
+                (poc_id, poc_name, directory, files), "file_written" (file)
+                and "file_failed" (file, error)
+            use_cache (bool): False bypasses the LLM response cache
+            poc_id (str, optional): Friendly name of an existing POC to
+                regenerate; no new name is generated
+            directory (str, optional): Directory of that POC (default:
+                pocs/<user_id>/<poc_id>)
             
         Returns:
             dict: POC generation result with structure:
@@ -958,64 +1541,136 @@ Provide simplification suggestions as JSON:
                     "poc_id": str,
                     "poc_name": str,
                     "directory": str,
-                    "files": list
+                    "files": list,  # files actually written
+                    "failed": list,  # [{"file": str, "error": str}]
+                    "timings": dict  # seconds per generated file
                 }
         """
-        # Generate friendly POC name
-        description = requirements.get("goal", "New POC Application")
-        friendly_name = self.generate_friendly_name(description)
+        if timeout is None:
+            timeout = POC_GENERATION_TIMEOUT
+        
+        def notify(event: str, payload: Dict[str, Any]):
+            if progress_callback is not None:
+                progress_callback(event, payload)
+        
+        # Generate friendly POC name (updates keep the existing one)
+        friendly_name = poc_id
+        if friendly_name is None:
+            description = requirements.get("goal", "New POC Application")
+            friendly_name = self.generate_friendly_name(description, use_cache=use_cache)
+        poc_name = requirements.get("goal", "POC")
         
         # Create directory structure
-        poc_dir = os.path.join("pocs", user_id, friendly_name)
+        poc_dir = directory or os.path.join("pocs", user_id, friendly_name)
         os.makedirs(poc_dir, exist_ok=True)
         os.makedirs(os.path.join(poc_dir, "wireframes"), exist_ok=True)
         os.makedirs(os.path.join(poc_dir, "generated"), exist_ok=True)
         
         print(f"✓ Created directory: {poc_dir}")
+        notify("started", {
+            "poc_id": friendly_name,
+            "poc_name": poc_name,
+            "directory": poc_dir,
+            "files": list(POC_DOCUMENT_FILES)
+        })
         
-        # Generate POC description
-        poc_desc = self._generate_poc_description(requirements, friendly_name)
-        with open(os.path.join(poc_dir, "poc_desc.md"), "w") as f:
-            f.write(poc_desc)
-        
-        # Generate requirements document
-        requirements_doc = self._generate_requirements_doc(requirements)
-        with open(os.path.join(poc_dir, "requirements.md"), "w") as f:
-            f.write(requirements_doc)
-        
-        # Generate phase documents
-        phase1 = self._generate_phase_document("phase_1_frontend", requirements, friendly_name)
-        with open(os.path.join(poc_dir, "phase_1_frontend.md"), "w") as f:
-            f.write(phase1)
-        
-        phase2 = self._generate_phase_document("phase_2_backend", requirements, friendly_name)
-        with open(os.path.join(poc_dir, "phase_2_backend.md"), "w") as f:
-            f.write(phase2)
-        
-        phase3 = self._generate_phase_document("phase_3_database", requirements, friendly_name)
-        with open(os.path.join(poc_dir, "phase_3_database.md"), "w") as f:
-            f.write(phase3)
-        
-        files_created = [
-            "poc_desc.md",
-            "requirements.md",
-            "phase_1_frontend.md",
-            "phase_2_backend.md",
-            "phase_3_database.md",
-            "wireframes/",
-            "generated/"
-        ]
+        written = set()
+        
+        def write_file(filename: str, content: str):
+            with open(os.path.join(poc_dir, filename), "w") as f:
+                f.write(content)
+            written.add(filename)
+            notify("file_written", {"file": filename})
+        
+        # Requirements document is built locally (no LLM call)
+        write_file("requirements.md", self._generate_requirements_doc(requirements))
+        
+        # Independent LLM calls, keyed by output file
+        generation_tasks = {
+            "poc_desc.md": (self._generate_poc_description, (requirements, friendly_name, use_cache)),
+            "phase_1_frontend.md": (self._generate_phase_document, ("phase_1_frontend", requirements, friendly_name, use_cache)),
+            "phase_2_backend.md": (self._generate_phase_document, ("phase_2_backend", requirements, friendly_name, use_cache)),
+            "phase_3_database.md": (self._generate_phase_document, ("phase_3_database", requirements, friendly_name, use_cache)),
+        }
+        failed, timings = self._run_generation_tasks(generation_tasks, timeout, write_file)
+        for failure in failed:
+            notify("file_failed", failure)
+        
+        files_created = [f for f in POC_DOCUMENT_FILES if f in written]
+        files_created.extend(["wireframes/", "generated/"])
         
         print(f"✓ Generated {len(files_created)} files")
+        if failed:
+            print(f"Warning: {len(failed)} POC documents failed: {[f['file'] for f in failed]}")
         
         return {
             "poc_id": friendly_name,
-            "poc_name": requirements.get("goal", "POC"),
+            "poc_name": poc_name,
             "directory": poc_dir,
-            "files": files_created
+            "files": files_created,
+            "failed": failed,
+            "timings": timings
+        }
+    
+    def _run_generation_tasks(
+        self,
+        tasks: Dict[str, Any],
+        timeout: float,
+        on_result: Callable[[str, str], None]
+    ):
+        """
+        Run document generation calls concurrently with a shared deadline.
+        
+        Args:
+            tasks (dict): filename -> (callable, args)
+            timeout (float): Seconds to wait for all calls
+            on_result (callable): Called as on_result(filename, content) in the
+                caller's thread as each call completes
+            
+        Returns:
+            tuple: (failed list, timings by filename)
+        """
+        def timed_call(func, args):
+            started = time.monotonic()
+            result = func(*args)
+            return result, time.monotonic() - started
+        
+        futures = {
+            _generation_executor.submit(timed_call, func, args): filename
+            for filename, (func, args) in tasks.items()
         }
+        
+        failed, timings = [], {}
+        finished = set()
+        
+        def collect(future):
+            filename = futures[future]
+            finished.add(future)
+            try:
+                content, elapsed = future.result()
+                timings[filename] = round(elapsed, 2)
+                on_result(filename, content)
+            except Exception as e:
+                failed.append({"file": filename, "error": str(e)})
+        
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                collect(future)
+        except FuturesTimeoutError:
+            for future, filename in futures.items():
+                if future in finished:
+                    continue
+                if future.done():
+                    # Finished between the deadline and this handler
+                    collect(future)
+                    continue
+                # Running calls end within the client's HTTP timeout; their results are discarded
+                future.cancel()
+                failed.append({"file": filename, "error": f"Timed out after {timeout}s"})
+        
+        return failed, timings
     
-    def _generate_poc_description(self, requirements: Dict[str, Any], poc_name: str) -> str:
+    def _generate_poc_description(self, requirements: Dict[str, Any], poc_name: str, use_cache: bool = True) -> str:
         """Generate poc_desc.md with business goal and features."""
         prompt = PromptTemplate(
             input_variables=["requirements", "poc_name"],
@@ -1046,13 +1701,10 @@ Create a document with these sections:
 """
         )
         
-        chain = prompt | self.llm
-        result = chain.invoke({
+        return self._cached_llm_call(prompt, {
             "requirements": json.dumps(requirements, indent=2),
             "poc_name": poc_name
-        })
-        
-        return result.content
+        }, use_cache=use_cache)
     
     def _generate_requirements_doc(self, requirements: Dict[str, Any]) -> str:
         """Generate requirements.md with captured requirements."""
@@ -1090,7 +1742,13 @@ Create a document with these sections:
         
         return doc
     
-    def _generate_phase_document(self, phase: str, requirements: Dict[str, Any], poc_name: str) -> str:
+    def _generate_phase_document(
+        self,
+        phase: str,
+        requirements: Dict[str, Any],
+        poc_name: str,
+        use_cache: bool = True
+    ) -> str:
         """Generate phase implementation document using template from prompts."""
         template = self.get_phase_template(phase)
         
@@ -1116,14 +1774,11 @@ Make it actionable and ready for Cursor AI to execute.
 """
         )
         
-        chain = prompt | self.llm
-        result = chain.invoke({
+        return self._cached_llm_call(prompt, {
             "template": template,
             "requirements": json.dumps(requirements, indent=2),
             "poc_name": poc_name
-        })
-        
-        return result.content
+        }, use_cache=use_cache)
     
     # ===== Image Analysis with GPT-4 Vision (Phase 7) =====
     
@@ -1158,7 +1813,9 @@ Make it actionable and ready for Cursor AI to execute.
         vision_llm = ChatOpenAI(
             model="gpt-4o",  # Updated model with vision capabilities
             temperature=0.3,
-            api_key=os.getenv("OPENAI_API_KEY")
+            api_key=os.getenv("OPENAI_API_KEY"),
+            timeout=POC_LLM_TIMEOUT,
+            max_retries=POC_LLM_MAX_RETRIES
         )
         
         # Create analysis prompt
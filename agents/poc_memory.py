@@ -0,0 +1,119 @@
+# agents/poc_memory.py
+"""
+Token-budgeted conversation memory for the POC Agent.
+
+Keeps the most recent turns verbatim and rolls older turns into a running
+summary, so prompt size stays bounded as conversations grow:
+- At most POC_MEMORY_MAX_TURNS turns are kept verbatim
+- Verbatim messages never exceed POC_MEMORY_MAX_TOKENS (counted with tiktoken)
+- Pruned messages are folded into moving_summary_buffer by the LLM
+- The system prompt is pinned ahead of the summary and never pruned
+"""
+
+import os
+from typing import Any, Dict, List
+
+from langchain.memory import ConversationSummaryBufferMemory
+from langchain.schema import BaseMessage, SystemMessage, get_buffer_string
+
+from agents.embedding_batcher import count_tokens
+
+# Memory budget configuration
+POC_MEMORY_MAX_TOKENS = int(os.getenv("POC_MEMORY_MAX_TOKENS", "2000"))
+POC_MEMORY_MAX_TURNS = int(os.getenv("POC_MEMORY_MAX_TURNS", "6"))
+
+# Per-message overhead used by OpenAI chat models
+_TOKENS_PER_MESSAGE = 4
+
+
+def count_message_tokens(messages: List[BaseMessage]) -> int:
+    """
+    Count the tokens a list of chat messages will use with tiktoken.
+
+    Uses embedding_batcher.count_tokens (cl100k_base, the gpt-3.5/gpt-4
+    encoding), which estimates when the encoding cannot be loaded offline.
+
+    Args:
+        messages (list): Messages to measure
+
+    Returns:
+        int: Approximate prompt tokens for the messages
+
+    Example:
+        >>> count_message_tokens(memory.chat_memory.messages)
+        412
+    """
+    return sum(count_tokens(str(message.content)) + _TOKENS_PER_MESSAGE for message in messages)
+
+
+class TokenBudgetMemory(ConversationSummaryBufferMemory):
+    """
+    Summary-buffer memory bounded by a turn count and a tiktoken budget.
+
+    Example:
+        >>> memory = TokenBudgetMemory(llm=llm, return_messages=True)
+        >>> memory.save_context({"input": "Hi"}, {"response": "Hello!"})
+        >>> memory.moving_summary_buffer  # summary of pruned turns
+    """
+
+    max_token_limit: int = POC_MEMORY_MAX_TOKENS
+    max_turns: int = POC_MEMORY_MAX_TURNS
+    # Messages folded into the summary so far; buffer[i] is message number
+    # pruned_message_count + i of the whole conversation
+    pruned_message_count: int = 0
+    # System prompt sent first on every turn; not part of the prunable buffer
+    system_message: str = ""
+
+    @property
+    def total_message_count(self) -> int:
+        """Number of messages in the whole conversation (summarized + verbatim)."""
+        return self.pruned_message_count + len(self.chat_memory.messages)
+
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the history: pinned system message, summary, recent messages."""
+        return self._with_system_message(super().load_memory_variables(inputs))
+
+    async def aload_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Async version of load_memory_variables."""
+        return self._with_system_message(await super().aload_memory_variables(inputs))
+
+    def _with_system_message(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.system_message:
+            return variables
+        pinned = [SystemMessage(content=self.system_message)]
+        history = variables[self.memory_key]
+        if self.return_messages:
+            variables[self.memory_key] = pinned + history
+        else:
+            variables[self.memory_key] = "\n".join(filter(None, [get_buffer_string(pinned), history]))
+        return variables
+
+    def _messages_to_prune(self) -> List[BaseMessage]:
+        """Pop the oldest messages until both budgets are met."""
+        buffer = self.chat_memory.messages
+        max_messages = self.max_turns * 2
+
+        pruned = []
+        while buffer and (
+            len(buffer) > max_messages
+            or count_message_tokens(buffer) > self.max_token_limit
+        ):
+            pruned.append(buffer.pop(0))
+        self.pruned_message_count += len(pruned)
+        return pruned
+
+    def prune(self) -> None:
+        """Fold messages beyond the budget into the running summary."""
+        pruned = self._messages_to_prune()
+        if pruned:
+            self.moving_summary_buffer = self.predict_new_summary(
+                pruned, self.moving_summary_buffer
+            )
+
+    async def aprune(self) -> None:
+        """Async version of prune."""
+        pruned = self._messages_to_prune()
+        if pruned:
+            self.moving_summary_buffer = await self.apredict_new_summary(
+                pruned, self.moving_summary_buffer
+            )
@@ -0,0 +1,427 @@
+# agents/poc_sessions.py
+"""
+POC Agent Session Manager
+
+Keeps one lightweight conversation state per (user_id, conversation_id)
+so concurrent chats never share a memory buffer:
+- A single base POCAgent owns the heavy LLM/embeddings clients
+- Each session gets its own agent (memory, stage, requirements) and lock
+- Hot sessions live in a bounded LRU; idle sessions are evicted, except
+  while pinned (handed out by get_session and not yet done with its turn)
+- With a conversation store, state is saved after each turn and lazily
+  reloaded by conversation_id when a session is not in memory
+- Each saved turn carries a turn number; before a turn, a session whose
+  store copy is newer (the conversation moved to another worker and back)
+  reloads it, so no sticky sessions are needed behind a load balancer
+
+Limits are configurable via POC_SESSION_MAX and POC_SESSION_IDLE_SECONDS.
+"""
+
+import os
+import copy
+import time
+import asyncio
+import uuid
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any, AsyncIterator, Tuple
+
+from agents.poc_agent import POCAgent
+
+# Session limits
+DEFAULT_MAX_SESSIONS = int(os.getenv("POC_SESSION_MAX", "500"))
+DEFAULT_IDLE_SECONDS = int(os.getenv("POC_SESSION_IDLE_SECONDS", "1800"))
+
+
+class AgentSession:
+    """
+    Conversation state for a single (user_id, conversation_id) pair.
+
+    Attributes:
+        user_id: Owner of the conversation
+        conversation_id: Conversation identifier
+        agent: Conversation-scoped POCAgent (shares clients with the base agent)
+        lock: Serializes turns within this conversation (asyncio.Lock)
+        last_used: Monotonic timestamp of the last access
+        store: Optional conversation store; state is saved to it after each turn
+        turn: Number of turns saved for this conversation
+        in_use: Callers holding the session for a turn; pinned sessions are never evicted
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        conversation_id: str,
+        agent: POCAgent,
+        store: Optional[Any] = None,
+        on_release: Optional[Callable[["AgentSession"], None]] = None
+    ):
+        self.user_id = user_id
+        self.conversation_id = conversation_id
+        self.agent = agent
+        self.store = store
+        self.in_use = 0
+        self._on_release = on_release
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self.turn = 0
+        # Background contradiction check whose result still has to be saved
+        self._pending_check = None
+        # True until the first turn; only then is client-sent history restored
+        self._fresh = True
+
+    def touch(self):
+        """Mark the session as recently used."""
+        self.last_used = time.monotonic()
+
+    def release(self):
+        """Drop the pin taken by POCSessionManager.get_session (called when a turn ends)."""
+        if self._on_release is not None:
+            self._on_release(self)
+        else:
+            self.in_use = max(0, self.in_use - 1)
+
+    def load_state(self, saved_state: Dict[str, Any]):
+        """
+        Replace the session's conversation state with a saved one.
+
+        Args:
+            saved_state (dict): State from the conversation store
+        """
+        # A fresh agent, since restoring appends to the existing memory
+        self.agent = self.agent.new_session(self.conversation_id)
+        self.agent.load_conversation(saved_state)
+        self.agent.conversation_id = self.conversation_id
+        self.turn = saved_state.get("turn", 0)
+        self._fresh = False
+
+    def persist(self):
+        """Hand the current agent state to the store (write-behind, non-blocking)."""
+        if self.store is not None:
+            self.turn += 1
+            # Snapshot: background contradiction checks keep mutating the live state
+            state = copy.deepcopy(self.agent.save_conversation())
+            state["turn"] = self.turn
+            self.store.save(self.user_id, self.conversation_id, state)
+            self._persist_when_check_finishes()
+
+    def _persist_when_check_finishes(self):
+        """Save again once a pending contradiction check has a result."""
+        task = self.agent._contradiction_task
+        if task is None or task.done() or task is self._pending_check:
+            return
+        self._pending_check = task
+        task.add_done_callback(lambda _: self.persist())
+
+    async def _refresh_from_store(self):
+        """Reload the state if another worker saved a newer turn. Caller holds self.lock."""
+        if self.store is None or self._fresh:
+            return
+        if await asyncio.to_thread(self.store.turn, self.user_id, self.conversation_id) <= self.turn:
+            return
+        saved_state = await asyncio.to_thread(self.store.load, self.user_id, self.conversation_id)
+        if saved_state:
+            self.load_state(saved_state)
+
+    async def aprocess_request(
+        self,
+        prompt: str,
+        document_ids: Optional[List[int]] = None,
+        conversation_history: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run one chat turn against this session's agent.
+
+        Turns for the same conversation are serialized by the session lock;
+        different conversations run concurrently on the event loop. A newer
+        state saved by another worker is reloaded first. Releases the pin
+        taken by get_session.
+
+        Args:
+            prompt (str): User's message
+            document_ids (list, optional): Uploaded document IDs for context
+            conversation_history (dict, optional): Client-held state, restored
+                only when the session is first created
+
+        Returns:
+            dict: Result of POCAgent.aprocess_request
+        """
+        try:
+            async with self.lock:
+                await self._refresh_from_store()
+                history = conversation_history if self._fresh else None
+                result = await self.agent.aprocess_request(
+                    prompt=prompt,
+                    user_id=self.user_id,
+                    document_ids=document_ids,
+                    conversation_history=history
+                )
+                self._fresh = False
+                self.touch()
+                self.persist()
+                return result
+        finally:
+            self.release()
+
+
+    async def astream_request(
+        self,
+        prompt: str,
+        document_ids: Optional[List[int]] = None,
+        conversation_history: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream one chat turn against this session's agent.
+
+        The session lock is held for the whole stream and released if the
+        client disconnects part way through, as is the get_session pin.
+
+        Args:
+            prompt (str): User's message
+            document_ids (list, optional): Uploaded document IDs for context
+            conversation_history (dict, optional): Client-held state, restored
+                only when the session is first created
+
+        Yields:
+            dict: Events from POCAgent.astream_request
+        """
+        try:
+            async with self.lock:
+                await self._refresh_from_store()
+                history = conversation_history if self._fresh else None
+                self._fresh = False
+                async for event in self.agent.astream_request(
+                    prompt=prompt,
+                    user_id=self.user_id,
+                    document_ids=document_ids,
+                    conversation_history=history
+                ):
+                    yield event
+                self.touch()
+                self.persist()
+        finally:
+            self.release()
+
+
+class POCSessionManager:
+    """
+    Bounded LRU of AgentSessions keyed by (user_id, conversation_id).
+
+    The base POCAgent (LLM, embeddings, vector store cache) is created once
+    and shared; sessions only carry conversation state.
+    """
+
+    def __init__(
+        self,
+        base_agent: Optional[POCAgent] = None,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        idle_seconds: int = DEFAULT_IDLE_SECONDS,
+        store: Optional[Any] = None
+    ):
+        """
+        Initialize the session manager.
+
+        Args:
+            base_agent (POCAgent, optional): Agent whose clients are shared.
+                Created lazily on first use if not provided.
+            max_sessions (int): Maximum number of sessions kept in memory
+            idle_seconds (int): Sessions idle longer than this are evicted
+            store (optional): Conversation store with load(user_id, conversation_id)
+                and save(user_id, conversation_id, state), e.g. ConversationStore
+        """
+        self._base_agent = base_agent
+        self.store = store
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._sessions: "OrderedDict[Tuple[str, str], AgentSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def base_agent(self) -> POCAgent:
+        """Shared POCAgent holding the heavy LLM/embeddings clients."""
+        if self._base_agent is None:
+            with self._lock:
+                if self._base_agent is None:
+                    self._base_agent = POCAgent()
+        return self._base_agent
+
+    @staticmethod
+    def new_conversation_id(user_id: str) -> str:
+        """
+        Generate a new, unique conversation identifier.
+
+        Args:
+            user_id (str): Owner of the conversation
+
+        Returns:
+            str: Conversation ID (e.g., "conv_1_20250101_120000_1a2b3c4d")
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f"conv_{user_id}_{timestamp}_{uuid.uuid4().hex[:8]}"
+
+    async def aget_session(self, user_id: str, conversation_id: Optional[str] = None) -> AgentSession:
+        """
+        Return the session for a conversation, rehydrating it from the store.
+
+        When the session is not in memory, its saved state is loaded from the
+        conversation store off the event loop.
+
+        Args:
+            user_id (str): Owner of the conversation
+            conversation_id (str, optional): Existing conversation ID; a new
+                one is generated when omitted
+
+        Returns:
+            AgentSession: Session for (user_id, conversation_id)
+        """
+        saved_state = None
+        if conversation_id and self.store is not None and self.get_existing(user_id, conversation_id) is None:
+            saved_state = await asyncio.to_thread(self.store.load, user_id, conversation_id)
+        return self.get_session(user_id, conversation_id, saved_state=saved_state)
+
+    def get_session(
+        self,
+        user_id: str,
+        conversation_id: Optional[str] = None,
+        saved_state: Optional[Dict[str, Any]] = None
+    ) -> AgentSession:
+        """
+        Return the session for a conversation, creating it if needed.
+
+        The session is pinned (not evicted) until the caller's turn ends
+        (aprocess_request/astream_request); callers that do not run a turn
+        must call session.release().
+
+        Args:
+            user_id (str): Owner of the conversation
+            conversation_id (str, optional): Existing conversation ID; a new
+                one is generated when omitted
+            saved_state (dict, optional): Server-side state to load into a newly
+                created session (see POCAgent.save_conversation)
+
+        Returns:
+            AgentSession: Session for (user_id, conversation_id)
+
+        Example:
+            >>> manager = POCSessionManager()
+            >>> session = manager.get_session("1")
+            >>> result = await session.aprocess_request("I want a task tracker")
+        """
+        # Build the base agent outside the map lock (it may take a while)
+        base_agent = self.base_agent
+
+        if not conversation_id:
+            conversation_id = self.new_conversation_id(user_id)
+        key = (user_id, conversation_id)
+
+        with self._lock:
+            self._evict_locked()
+
+            session = self._sessions.get(key)
+            if session is None:
+                session = AgentSession(
+                    user_id,
+                    conversation_id,
+                    base_agent.new_session(conversation_id),
+                    store=self.store,
+                    on_release=self._release
+                )
+                if saved_state:
+                    # Server-side state wins over client-sent history
+                    session.load_state(saved_state)
+                self._sessions[key] = session
+            else:
+                self._sessions.move_to_end(key)
+            session.touch()
+            session.in_use += 1
+
+            # Enforce the size bound after inserting
+            self._evict_locked()
+            return session
+
+    def get_existing(self, user_id: str, conversation_id: str) -> Optional[AgentSession]:
+        """
+        Return a session only if it is already in memory.
+
+        Args:
+            user_id (str): Owner of the conversation
+            conversation_id (str): Conversation ID
+
+        Returns:
+            Optional[AgentSession]: Session, or None if not loaded
+        """
+        with self._lock:
+            return self._sessions.get((user_id, conversation_id))
+
+    def drop_session(self, user_id: str, conversation_id: str) -> bool:
+        """
+        Remove a session from memory.
+
+        Args:
+            user_id (str): Owner of the conversation
+            conversation_id (str): Conversation ID
+
+        Returns:
+            bool: True if a session was removed
+        """
+        with self._lock:
+            return self._sessions.pop((user_id, conversation_id), None) is not None
+
+    def evict_idle(self) -> int:
+        """
+        Evict idle sessions and trim the LRU to its size bound.
+
+        Returns:
+            int: Number of sessions evicted
+        """
+        with self._lock:
+            return self._evict_locked()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report session store usage.
+
+        Returns:
+            dict: Active session count and configured limits
+        """
+        with self._lock:
+            return {
+                "active_sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_seconds": self.idle_seconds
+            }
+
+    def _release(self, session: AgentSession):
+        """Unpin a session once its turn has ended."""
+        with self._lock:
+            session.in_use = max(0, session.in_use - 1)
+            session.touch()
+
+    def _evict_locked(self) -> int:
+        """Evict idle and over-capacity sessions. Caller must hold self._lock."""
+        now = time.monotonic()
+        evicted = 0
+
+        # Sessions are kept in LRU order, so idle ones are at the front
+        for key in list(self._sessions.keys()):
+            session = self._sessions[key]
+            if now - session.last_used < self.idle_seconds:
+                break
+            # Pinned this long with no turn running: the caller never started
+            # its turn (e.g. a stream abandoned before it began), so the pin is stale
+            if session.in_use and session.lock.locked():
+                continue
+            del self._sessions[key]
+            evicted += 1
+
+        # Trim least recently used sessions beyond the size bound
+        for key in list(self._sessions.keys()):
+            if len(self._sessions) <= self.max_sessions:
+                break
+            if self._sessions[key].in_use:
+                continue
+            del self._sessions[key]
+            evicted += 1
+
+        return evicted
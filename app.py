@@ -11,7 +11,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import database initialization
-from database import init_db
+from database import async_engine
+from migrations import check_schema_version
+from poc_jobs import resume_pending_jobs
+from document_ingest import UploadSizeLimitMiddleware, resume_pending_ingestions, upload_body_limit
+from conversation_store import shutdown_conversation_store
+from agents.llm_cache import shutdown_llm_cache
 
 # Import routers
 from auth import router as auth_router
@@ -25,9 +30,21 @@ app = FastAPI(title="Boot_Lang Platform")
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on application startup."""
-    init_db()
-    print("✓ Application started, database initialized")
+    """Verify the database schema version on application startup."""
+    version = check_schema_version()
+    resume_pending_jobs()
+    resume_pending_ingestions()
+    print(f"✓ Application started, database schema version {version}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered conversation state and cache access times, close async DB connections."""
+    shutdown_conversation_store()
+    shutdown_llm_cache()
+    await async_engine.dispose()
+
+# Cap upload bodies while they stream in (added first so CORS wraps its 413s)
+app.add_middleware(UploadSizeLimitMiddleware, limits={"/api/poc/upload": upload_body_limit()})
 
 # CORS - pre-configured for deployment
 app.add_middleware(
@@ -41,6 +58,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read pagination cursors and cache validators
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Include routers
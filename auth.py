@@ -5,27 +5,38 @@ This module provides:
 - User registration with password validation
 - User login with JWT token generation
 - Current user information endpoint
+- Cached current-user lookup and an optional claims-only dependency for
+  read-only routes (AUTH_TRUST_JWT_CLAIMS)
 """
 
-from fastapi import APIRouter, HTTPException, Depends, status
+import os
+
+from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import select, update, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Tuple
 from datetime import datetime
 
-from database import get_db, User
+from database import get_async_db, AsyncSessionLocal, User
 from auth_utils import (
-    hash_password, 
-    verify_password, 
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
     create_access_token, 
     decode_access_token,
     validate_password_strength
 )
+from user_cache import CurrentUser, get_user_cache, get_user_counter
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 security = HTTPBearer()
 
+# When true, get_read_only_user builds the user from JWT claims alone
+AUTH_TRUST_JWT_CLAIMS = os.getenv("AUTH_TRUST_JWT_CLAIMS", "false").lower() == "true"
+
 
 # Pydantic models for request/response
 class RegisterRequest(BaseModel):
@@ -58,52 +69,165 @@ class UserInfo(BaseModel):
     created_at: datetime
 
 
+def _get_token_payload(credentials: HTTPAuthorizationCredentials) -> dict:
+    """Decode the bearer token and check it names a user."""
+    payload = decode_access_token(credentials.credentials)
+    
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+    
+    if payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token payload"
+        )
+    
+    return payload
+
+
 # Dependency to get current user from JWT token
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
     """
     Dependency to extract and validate current user from JWT token.
     
+    Users are served from a short-TTL cache; endpoints that change or
+    delete a user invalidate its entry.
+    
     Args:
         credentials: HTTP Bearer token from Authorization header
-        db: Database session
+        db: Async database session
         
     Returns:
-        User: Current authenticated user
+        CurrentUser: Immutable snapshot of the authenticated user
         
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token"
-        )
+    payload = _get_token_payload(credentials)
+    user_id = int(payload["sub"])
     
-    user_id = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload"
-        )
+    cache = get_user_cache()
+    current_user = cache.get(user_id)
+    if current_user is not None:
+        return current_user
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
+    current_user = CurrentUser.from_orm_user(user)
+    cache.set(current_user)
+    return current_user
+
+
+async def get_read_only_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
+    """
+    Dependency for read-only routes that only need the user's identity.
+    
+    With AUTH_TRUST_JWT_CLAIMS=true the user is built from the token claims
+    without any lookup (a deleted user keeps read access until the token
+    expires); otherwise this is get_current_user.
+    
+    Args:
+        credentials: HTTP Bearer token from Authorization header
+        db: Async database session
+        
+    Returns:
+        CurrentUser: Authenticated user (email and timestamps are None when
+            built from claims)
+    """
+    if AUTH_TRUST_JWT_CLAIMS:
+        return CurrentUser.from_token_payload(_get_token_payload(credentials))
+    return await get_current_user(credentials, db)
+
+
+async def find_user_conflict(
+    db: AsyncSession,
+    username: Optional[str] = None,
+    email: Optional[str] = None,
+    exclude_user_id: Optional[int] = None
+) -> Optional[str]:
+    """
+    Find which unique user field is already taken, with a single query.
+    
+    Args:
+        db: Async database session
+        username: Username to check
+        email: Email to check
+        exclude_user_id: User to ignore (the one being updated)
+        
+    Returns:
+        Optional[str]: Error message for the taken field, or None
+    """
+    conditions = []
+    if username:
+        conditions.append(User.username == username)
+    if email:
+        conditions.append(User.email == email)
+    if not conditions:
+        return None
+    
+    query = select(User.username, User.email).where(or_(*conditions)).limit(2)
+    if exclude_user_id is not None:
+        query = query.where(User.id != exclude_user_id)
+    rows = (await db.execute(query)).all()
+    
+    if username and any(row.username == username for row in rows):
+        return "Username already exists"
+    if email and any(row.email == email for row in rows):
+        return "Email already registered"
+    return None
+
+
+async def commit_user(db: AsyncSession, user: User, exclude_user_id: Optional[int] = None) -> User:
+    """
+    Commit a new or changed user, relying on the unique indexes.
+    
+    Uniqueness of username and email is enforced by the database instead of
+    check-then-insert, so concurrent signups cannot both succeed; the
+    conflicting field is looked up only when the commit fails.
+    
+    Args:
+        db: Async database session (user already added or modified)
+        user: User to commit
+        exclude_user_id: ID of the user being updated, if any
+        
+    Returns:
+        User: Refreshed user
+        
+    Raises:
+        HTTPException: 400 if the username or email is already taken
+    """
+    username, email = user.username, user.email
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        detail = await find_user_conflict(db, username, email, exclude_user_id)
+        if detail is None:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
+    await db.refresh(user)
     return user
 
 
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user account.
     
@@ -115,7 +239,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         AuthResponse: Success message and JWT token
         
     Raises:
-        HTTPException: If username exists or validation fails
+        HTTPException: If username/email exists or validation fails
     """
     # Validate password strength
     is_valid, error = validate_password_strength(request.password)
@@ -125,25 +249,8 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
             detail=error
         )
     
-    # Check if username already exists
-    existing_user = db.query(User).filter(User.username == request.username).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already exists"
-        )
-    
-    # Check if email already exists (if provided)
-    if request.email:
-        existing_email = db.query(User).filter(User.email == request.email).first()
-        if existing_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-    
-    # Create new user
-    hashed_pw = hash_password(request.password)
+    # Create new user (duplicates are rejected by the unique indexes)
+    hashed_pw = await hash_password_async(request.password)
     new_user = User(
         username=request.username,
         email=request.email,
@@ -152,8 +259,8 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await commit_user(db, new_user)
+    get_user_counter().adjust(1)
     
     # Generate JWT token
     token = create_access_token(
@@ -177,13 +284,47 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     )
 
 
+async def rehash_password(user_id: int, old_hash: str, password: str):
+    """
+    Rehash a password with the configured bcrypt cost.
+    
+    Runs after a successful login whose stored hash uses another cost.
+    The update is skipped if the password changed in the meantime.
+    
+    Args:
+        user_id: User whose password to rehash
+        old_hash: Hash that was verified at login
+        password: Plain text password from the login request
+    """
+    new_hash = await hash_password_async(password)
+    
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(User)
+                .where(User.id == user_id, User.password_hash == old_hash)
+                .values(password_hash=new_hash)
+            )
+            await db.commit()
+    except Exception as e:
+        print(f"Warning: Password rehash failed for user {user_id}: {e}")
+
+
 @router.post("/login", response_model=AuthResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(
+    request: LoginRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Authenticate user and return JWT token.
     
+    If the stored hash uses a different bcrypt cost than BCRYPT_ROUNDS, the
+    password is rehashed in the background after the response is sent.
+    
     Args:
         request: Login request with username and password
+        background_tasks: Used to schedule the rehash
         db: Database session
         
     Returns:
@@ -193,7 +334,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
         HTTPException: If credentials are invalid
     """
     # Find user by username
-    user = db.query(User).filter(User.username == request.username).first()
+    user = await db.scalar(select(User).where(User.username == request.username))
     
     if not user:
         raise HTTPException(
@@ -202,12 +343,16 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
         )
     
     # Verify password
-    if not verify_password(request.password, user.password_hash):
+    if not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
         )
     
+    # Move the hash to the configured cost without forcing a reset
+    if password_needs_rehash(user.password_hash):
+        background_tasks.add_task(rehash_password, user.id, user.password_hash, request.password)
+    
     # Generate JWT token
     token = create_access_token(
         data={
@@ -231,7 +376,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserInfo)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: CurrentUser = Depends(get_current_user)):
     """
     Get current authenticated user's information.
     
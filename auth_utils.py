@@ -2,14 +2,22 @@
 Authentication utilities for JWT token management and password hashing.
 
 This module provides functions for:
-- Password hashing and verification using bcrypt
-- JWT token creation and validation
+- Password hashing and verification using bcrypt (cost set by BCRYPT_ROUNDS)
+- Detecting hashes whose cost differs from the configured one
+- Async password wrappers that run bcrypt on a dedicated, size-limited pool
+- JWT token creation and validation, with an LRU of verified tokens
 - Token payload extraction
 """
 
 import bcrypt
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 from jose import JWTError, jwt
 import os
 
@@ -19,13 +27,35 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_HOURS = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
 
+# Verified-token cache: token digest -> payload, kept until the token's exp
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+_token_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+_token_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
 
-def hash_password(password: str) -> str:
+# bcrypt work factor (log2 rounds); existing hashes with another cost are
+# rehashed on the next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Password hashing pool
+# bcrypt releases the GIL, so a small thread pool keeps ~250ms hashes off the
+# event loop without letting a login burst take every CPU
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+_password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_password_stats = {"queued": 0, "running": 0, "completed": 0, "max_queue_depth": 0}
+_password_stats_lock = threading.Lock()
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
     """
     Hash a password using bcrypt.
     
     Args:
         password: Plain text password to hash
+        rounds: bcrypt cost (defaults to BCRYPT_ROUNDS)
         
     Returns:
         str: Bcrypt hashed password (UTF-8 decoded string)
@@ -35,7 +65,7 @@ def hash_password(password: str) -> str:
         # Returns: "$2b$12$..."
     """
     # Generate salt and hash password
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
     password_bytes = password.encode('utf-8')
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
@@ -62,6 +92,115 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    """
+    Read the cost factor from a bcrypt hash.
+    
+    Args:
+        hashed_password: Bcrypt hash (e.g. "$2b$12$...")
+        
+    Returns:
+        Optional[int]: Cost factor, or None if the hash is not bcrypt
+    """
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a stored hash uses a different cost than BCRYPT_ROUNDS.
+    
+    Args:
+        hashed_password: Stored bcrypt hash
+        
+    Returns:
+        bool: True if the password should be rehashed
+        
+    Example:
+        if password_needs_rehash(user.password_hash):
+            user.password_hash = hash_password(plain_password)
+    """
+    return get_hash_rounds(hashed_password) != BCRYPT_ROUNDS
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the password pool without blocking the event loop.
+    
+    Args:
+        password: Plain text password to hash
+        
+    Returns:
+        str: Bcrypt hashed password
+        
+    Example:
+        hashed = await hash_password_async("mypassword123")
+    """
+    return await _run_password_work(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the password pool without blocking the event loop.
+    
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Bcrypt hashed password to compare against
+        
+    Returns:
+        bool: True if password matches, False otherwise
+        
+    Example:
+        if await verify_password_async("mypassword123", stored_hash):
+            print("Password correct!")
+    """
+    return await _run_password_work(verify_password, plain_password, hashed_password)
+
+
+def get_password_executor_stats() -> Dict[str, int]:
+    """
+    Report password pool usage.
+    
+    Returns:
+        dict: Pool size, queued and running jobs, completed jobs and the
+            highest queue depth seen
+    """
+    with _password_stats_lock:
+        return {"workers": PASSWORD_HASH_WORKERS, **_password_stats}
+
+
+async def _run_password_work(func: Callable, *args):
+    """Run a bcrypt call on the password pool, tracking queue depth."""
+    with _password_stats_lock:
+        _password_stats["queued"] += 1
+        _password_stats["max_queue_depth"] = max(
+            _password_stats["max_queue_depth"], _password_stats["queued"]
+        )
+    
+    def task():
+        with _password_stats_lock:
+            _password_stats["queued"] -= 1
+            _password_stats["running"] += 1
+        try:
+            return func(*args)
+        finally:
+            with _password_stats_lock:
+                _password_stats["running"] -= 1
+                _password_stats["completed"] += 1
+    
+    def on_done(future):
+        # A job cancelled before it started never ran task()
+        if future.cancelled():
+            with _password_stats_lock:
+                _password_stats["queued"] -= 1
+    
+    future = _password_executor.submit(task)
+    future.add_done_callback(on_done)
+    return await asyncio.wrap_future(future)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -98,6 +237,9 @@ def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Decode and validate a JWT access token.
     
+    Valid tokens are cached by SHA-256 digest until their expiry, so a
+    client reusing the same token skips signature verification.
+    
     Args:
         token: JWT token string to decode
         
@@ -110,11 +252,51 @@ def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
             user_id = payload.get("sub")
             username = payload.get("username")
     """
+    key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    now = time.time()
+    
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry is not None:
+            expires_at, payload = entry
+            if expires_at > now:
+                _token_cache.move_to_end(key)
+                _token_cache_stats["hits"] += 1
+                return dict(payload)
+            del _token_cache[key]
+        _token_cache_stats["misses"] += 1
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
+    
+    # Only tokens that expire are cached (create_access_token always sets exp)
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)) and TOKEN_CACHE_MAX_ENTRIES > 0:
+        with _token_cache_lock:
+            _token_cache[key] = (expires_at, dict(payload))
+            _token_cache.move_to_end(key)
+            while len(_token_cache) > TOKEN_CACHE_MAX_ENTRIES:
+                _token_cache.popitem(last=False)
+                _token_cache_stats["evictions"] += 1
+    
+    return payload
+
+
+def get_token_cache_stats() -> Dict[str, Any]:
+    """
+    Report verified-token cache usage.
+    
+    Returns:
+        dict: Hit/miss/eviction counters, hit rate and entry count
+    """
+    with _token_cache_lock:
+        stats = dict(_token_cache_stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["entries"] = len(_token_cache)
+        return stats
 
 
 def validate_password_strength(password: str) -> tuple[bool, Optional[str]]:
@@ -0,0 +1,51 @@
+"""
+Measure bcrypt hashing time on this host.
+
+Run this script to pick a BCRYPT_ROUNDS value: it reports milliseconds per
+hash for a range of cost levels.
+
+Usage:
+    python3 calibrate_bcrypt.py [min_rounds] [max_rounds] [samples]
+"""
+
+import sys
+import time
+
+import bcrypt
+
+from auth_utils import BCRYPT_ROUNDS
+
+
+def calibrate(min_rounds: int = 10, max_rounds: int = 14, samples: int = 3):
+    """
+    Print ms/hash for each cost level.
+    
+    Args:
+        min_rounds: Lowest cost to measure
+        max_rounds: Highest cost to measure
+        samples: Hashes per cost level (the median is reported)
+    """
+    print("Calibrating bcrypt...")
+    print(f"   Configured BCRYPT_ROUNDS: {BCRYPT_ROUNDS}\n")
+    print(f"   {'rounds':>6}  {'ms/hash':>10}")
+    
+    password = b"calibration-password"
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings = []
+        for _ in range(samples):
+            salt = bcrypt.gensalt(rounds=rounds)
+            start = time.perf_counter()
+            bcrypt.hashpw(password, salt)
+            timings.append((time.perf_counter() - start) * 1000)
+        
+        median = sorted(timings)[len(timings) // 2]
+        marker = "  <- configured" if rounds == BCRYPT_ROUNDS else ""
+        print(f"   {rounds:>6}  {median:>10.1f}{marker}")
+    
+    print("\nSet BCRYPT_ROUNDS to the highest cost your login latency budget allows.")
+    print("Existing users are rehashed to the new cost on their next login.\n")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    calibrate(*args)
@@ -0,0 +1,86 @@
+"""
+Shared test fixtures: a throwaway migrated SQLite database and a stand-in agent.
+"""
+
+import asyncio
+import sys
+import time
+import types
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import worker_claims
+from database import create_db_engine
+from migrations import run_migrations
+
+
+class FakeAgent:
+    """Stands in for POCAgent: records messages and indexing calls, no LLM."""
+
+    def __init__(self):
+        self.conversation_id = None
+        self.messages = []
+        self.requirements = {}
+        self.indexed = []
+        self._contradiction_task = None
+
+    def new_session(self, conversation_id=None):
+        agent = FakeAgent()
+        agent.conversation_id = conversation_id
+        return agent
+
+    def load_conversation(self, state):
+        self.messages = [msg["content"] for msg in state["memory"]["messages"]]
+        self.requirements = state["requirements"]
+
+    def save_conversation(self):
+        return {"stage": "greeting", "requirements": self.requirements,
+                "memory": {"messages": [{"type": "human", "content": text} for text in self.messages]}}
+
+    async def aprocess_request(self, prompt, user_id, document_ids=None, conversation_history=None):
+        await asyncio.sleep(0)
+        self.messages.append(prompt)
+        return {"response": prompt, "conversation_id": self.conversation_id, "agent_state": {},
+                "next_action": "continue", "seen": list(self.messages)}
+
+    def load_document(self, file_path, file_type):
+        with open(file_path) as f:
+            return [types.SimpleNamespace(page_content=f.read(), metadata={})]
+
+    def create_vector_store(self, documents, user_id, progress_callback=None):
+        time.sleep(0.1)
+        self.indexed.append((user_id, len(documents)))
+
+
+@pytest.fixture
+def fake_agent():
+    return FakeAgent()
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    run_migrations(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def bind_session_local(session_factory, monkeypatch):
+    """Point a worker module's SessionLocal, and worker_claims', at the test database."""
+    def bind(module):
+        monkeypatch.setattr(module, "SessionLocal", session_factory)
+        monkeypatch.setattr(worker_claims, "SessionLocal", session_factory)
+        return session_factory
+
+    return bind
+
+
+@pytest.fixture
+def fake_poc_api(monkeypatch):
+    """Install a poc_api module whose get_poc_agent returns the given agent."""
+    def install(agent):
+        # Workers import get_poc_agent from poc_api lazily
+        monkeypatch.setitem(sys.modules, "poc_api", types.SimpleNamespace(get_poc_agent=lambda: agent))
+
+    return install
@@ -0,0 +1,284 @@
+"""
+Server-side persistence for POC Agent conversations.
+
+This module provides:
+- Lazy loading of saved agent state by conversation_id (POCConversation table)
+- A write-behind buffer so saving a turn never waits on the database
+- A background flusher thread that upserts buffered states in batches,
+  retrying row by row when a batch fails and dropping a state that keeps failing
+- A per-conversation turn counter, so a worker holding an older copy of a
+  conversation can reload it and never overwrites a newer turn
+"""
+
+import os
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from database import SessionLocal, POCConversation
+
+# Flush configuration
+POC_CONVERSATION_FLUSH_SECONDS = float(os.getenv("POC_CONVERSATION_FLUSH_SECONDS", "1.0"))
+# Flushes a single conversation may fail before its state is dropped
+POC_CONVERSATION_MAX_FLUSH_FAILURES = int(os.getenv("POC_CONVERSATION_MAX_FLUSH_FAILURES", "5"))
+
+
+class ConversationStore:
+    """
+    Write-behind store of POCAgent.save_conversation() states.
+
+    Example:
+        store = ConversationStore()
+        store.start()
+        store.save(1, "conv_1_...", agent.save_conversation())  # returns immediately
+        state = store.load(1, "conv_1_...")
+    """
+
+    def __init__(self, flush_interval: float = POC_CONVERSATION_FLUSH_SECONDS, session_factory=SessionLocal):
+        """
+        Initialize the store.
+
+        Args:
+            flush_interval (float): Seconds between background flushes
+            session_factory: Callable returning a database session
+        """
+        self.flush_interval = flush_interval
+        self._session_factory = session_factory
+        self._pending: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        self._failures: Dict[Tuple[int, str], int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background flusher thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="conversation-store", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher thread and write any buffered states."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+
+    def save(self, user_id: int, conversation_id: str, state: Dict[str, Any]):
+        """
+        Buffer a conversation state for the next flush.
+
+        Only the latest state per conversation is kept, so several turns
+        between flushes cost a single write.
+
+        Args:
+            user_id (int): Owner of the conversation
+            conversation_id (str): Conversation identifier
+            state (dict): Output of POCAgent.save_conversation()
+        """
+        with self._lock:
+            self._pending[(int(user_id), conversation_id)] = state
+
+    def load(self, user_id: int, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the latest saved state of a conversation.
+
+        Buffered (not yet flushed) states take precedence over the database.
+
+        Args:
+            user_id (int): Owner of the conversation
+            conversation_id (str): Conversation identifier
+
+        Returns:
+            Optional[dict]: Saved agent state, or None if unknown
+        """
+        key = (int(user_id), conversation_id)
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+
+        db = self._session_factory()
+        try:
+            row = db.query(POCConversation.langchain_memory).filter(
+                POCConversation.conversation_id == conversation_id,
+                POCConversation.user_id == int(user_id)
+            ).first()
+            return row[0] if row else None
+        finally:
+            db.close()
+
+    def turn(self, user_id: int, conversation_id: str) -> int:
+        """
+        Return the latest saved turn number of a conversation.
+
+        A single-column lookup, cheap enough to run before every turn.
+
+        Args:
+            user_id (int): Owner of the conversation
+            conversation_id (str): Conversation identifier
+
+        Returns:
+            int: Saved turn number (0 if unknown)
+        """
+        key = (int(user_id), conversation_id)
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key].get("turn", 0)
+
+        db = self._session_factory()
+        try:
+            row = db.query(POCConversation.turn).filter(
+                POCConversation.conversation_id == conversation_id,
+                POCConversation.user_id == int(user_id)
+            ).first()
+            return (row[0] or 0) if row else 0
+        finally:
+            db.close()
+
+    def owner(self, conversation_id: str) -> Optional[int]:
+        """
+        Return the user a conversation ID is saved under.
+
+        The database row wins; a buffered state only counts when the ID has
+        not been written yet.
+
+        Args:
+            conversation_id (str): Conversation identifier
+
+        Returns:
+            Optional[int]: Owning user ID, or None if the ID is unused
+        """
+        db = self._session_factory()
+        try:
+            row = db.query(POCConversation.user_id).filter(
+                POCConversation.conversation_id == conversation_id
+            ).first()
+        finally:
+            db.close()
+        if row:
+            return row[0]
+
+        with self._lock:
+            for user_id, pending_id in self._pending:
+                if pending_id == conversation_id:
+                    return user_id
+        return None
+
+    def flush(self) -> int:
+        """
+        Write all buffered states to the database.
+
+        States are written in one transaction; if that fails, each is
+        retried in its own transaction so one bad state cannot hold back
+        the rest. A state that fails POC_CONVERSATION_MAX_FLUSH_FAILURES
+        flushes in a row is dropped with a warning.
+
+        Returns:
+            int: Number of conversations written
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            try:
+                written = self._write(pending)
+            except Exception as e:
+                print(f"Warning: Conversation flush failed, retrying row by row: {e}")
+                written = 0
+                for key, state in pending.items():
+                    try:
+                        written += self._write({key: state})
+                    except Exception as row_error:
+                        self._requeue(key, state, row_error)
+                        continue
+                    self._failures.pop(key, None)
+            else:
+                for key in pending:
+                    self._failures.pop(key, None)
+            return written
+
+    def _write(self, states: Dict[Tuple[int, str], Dict[str, Any]]) -> int:
+        """Upsert states in one transaction; returns rows written, raises on failure."""
+        db = self._session_factory()
+        try:
+            existing = {
+                row.conversation_id: row
+                for row in db.query(POCConversation).filter(
+                    POCConversation.conversation_id.in_([conv_id for _, conv_id in states])
+                ).all()
+            }
+            written = 0
+            for (user_id, conversation_id), state in states.items():
+                row = existing.get(conversation_id)
+                if row is None:
+                    row = POCConversation(conversation_id=conversation_id, user_id=user_id)
+                    db.add(row)
+                elif row.user_id != user_id:
+                    print(f"Warning: Conversation {conversation_id} belongs to user {row.user_id};"
+                          f" not saving user {user_id}'s state")
+                    continue
+                elif (row.turn or 0) > state.get("turn", 0):
+                    # Another worker already saved a newer turn
+                    continue
+                row.conversation_history = state.get("memory", {}).get("messages", [])
+                row.langchain_memory = state
+                row.turn = state.get("turn", 0)
+                written += 1
+            db.commit()
+            return written
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _requeue(self, key: Tuple[int, str], state: Dict[str, Any], error: Exception):
+        """Put a state that failed to flush back, or drop it after too many failures."""
+        failures = self._failures.get(key, 0) + 1
+        if failures >= POC_CONVERSATION_MAX_FLUSH_FAILURES:
+            self._failures.pop(key, None)
+            print(f"Warning: Dropping conversation {key[1]} after {failures} failed flushes: {error}")
+            return
+        self._failures[key] = failures
+        with self._lock:
+            # A newer state that arrived meanwhile replaces the failed one
+            self._pending.setdefault(key, state)
+        print(f"Warning: Conversation {key[1]} flush failed ({failures}/{POC_CONVERSATION_MAX_FLUSH_FAILURES}): {error}")
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+_store: Optional[ConversationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_conversation_store() -> ConversationStore:
+    """
+    Return the process-wide conversation store, starting it on first use.
+
+    Returns:
+        ConversationStore: Shared, running store
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ConversationStore()
+                _store.start()
+    return _store
+
+
+def shutdown_conversation_store():
+    """Flush and stop the process-wide store if it was started."""
+    if _store is not None:
+        _store.stop()
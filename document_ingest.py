@@ -0,0 +1,237 @@
+"""
+Background ingestion of uploaded documents.
+
+This module provides:
+- UploadSizeLimitMiddleware, which rejects oversized upload requests with
+  413 from their Content-Length, or as soon as the streamed body passes
+  the limit, before Starlette spools the multipart body to a temp file
+- Chunked, size-limited copying of an upload to disk, with file writes
+  running in a worker thread so the event loop never blocks on I/O
+- A bounded worker pool that parses, embeds and indexes documents
+  (POCAgent.load_document + create_vector_store) off the request
+- Document.status moving from pending to processing (claimed atomically
+  by one worker process, see worker_claims) to indexed, or failed with
+  Document.error
+"""
+
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+from sqlalchemy import or_
+
+from database import SessionLocal, Document
+from worker_claims import Heartbeat, claim_row, stale_filter
+
+# Upload and worker configuration
+DOCUMENT_MAX_UPLOAD_BYTES = int(os.getenv("DOCUMENT_MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+DOCUMENT_UPLOAD_CHUNK_SIZE = int(os.getenv("DOCUMENT_UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+DOCUMENT_INGEST_WORKERS = int(os.getenv("DOCUMENT_INGEST_WORKERS", "2"))
+_ingest_executor = ThreadPoolExecutor(max_workers=DOCUMENT_INGEST_WORKERS, thread_name_prefix="doc-ingest")
+
+# Characters of extracted text kept on the Document row
+CONTENT_TEXT_LIMIT = 10000
+
+# Allowance for multipart boundaries and part headers on top of the file size
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware capping the request body size of upload endpoints.
+
+    Requests declaring a larger Content-Length get 413 without their body
+    being read; otherwise received bytes are counted as the body streams in
+    and 413 is raised once the limit is passed (chunked uploads included).
+
+    Example:
+        app.add_middleware(UploadSizeLimitMiddleware, limits={"/api/poc/upload": upload_body_limit()})
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            limits (dict): Request path -> maximum body size in bytes
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        max_bytes = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+            response = JSONResponse(status_code=413, content={"detail": _too_large_detail(max_bytes)})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # HTTPException passes through FastAPI's body parsing unchanged
+                    raise HTTPException(status_code=413, detail=_too_large_detail(max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def upload_body_limit(max_bytes: int = DOCUMENT_MAX_UPLOAD_BYTES) -> int:
+    """
+    Request body limit for a file limit, allowing for multipart framing.
+
+    Args:
+        max_bytes: Maximum file size in bytes
+
+    Returns:
+        int: Maximum request body size in bytes
+    """
+    return max_bytes + MULTIPART_OVERHEAD_BYTES
+
+
+def _too_large_detail(max_bytes: int) -> str:
+    return f"File too large. Maximum size is {max_bytes} bytes"
+
+
+async def save_upload(file: UploadFile, file_path: str, max_bytes: int = DOCUMENT_MAX_UPLOAD_BYTES) -> int:
+    """
+    Copy an upload to disk chunk by chunk, enforcing a size limit.
+
+    The request body itself is capped by UploadSizeLimitMiddleware; this
+    enforces the exact file size.
+
+    Args:
+        file: Uploaded file
+        file_path: Destination path (its directory must exist)
+        max_bytes: Maximum accepted size in bytes
+
+    Returns:
+        int: Number of bytes written
+
+    Raises:
+        HTTPException: 413 if the upload exceeds max_bytes (the partial file is removed)
+
+    Example:
+        size = await save_upload(file, "uploads/1/20250101_120000_spec.pdf")
+    """
+    size = 0
+    out = await asyncio.to_thread(open, file_path, "wb")
+    try:
+        while True:
+            chunk = await file.read(DOCUMENT_UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=_too_large_detail(max_bytes))
+            await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(out.close)
+        await asyncio.to_thread(_remove_file, file_path)
+        raise
+    await asyncio.to_thread(out.close)
+    return size
+
+
+def enqueue_ingestion(document_id: int):
+    """
+    Hand a pending document to the ingestion worker pool.
+
+    Args:
+        document_id: ID of a Document row with status "pending"
+    """
+    _ingest_executor.submit(run_ingestion, document_id)
+
+
+def resume_pending_ingestions() -> int:
+    """
+    Re-submit pending documents and those whose ingesting worker died.
+
+    Call once on application startup. Every worker process does this;
+    run_ingestion's claim makes sure each document is indexed once.
+
+    Returns:
+        int: Number of documents re-submitted
+    """
+    db = SessionLocal()
+    try:
+        pending = db.query(Document.id).filter(
+            or_(Document.status == "pending", stale_filter(Document, "processing"))
+        ).all()
+    finally:
+        db.close()
+
+    for (document_id,) in pending:
+        enqueue_ingestion(document_id)
+
+    if pending:
+        print(f"✓ Resumed ingestion of {len(pending)} documents")
+    return len(pending)
+
+
+def run_ingestion(document_id: int):
+    """
+    Parse, embed and index a document (worker pool entry point).
+
+    Args:
+        document_id: ID of the Document to ingest
+    """
+    # Imported here to avoid a circular import with poc_api
+    from poc_api import get_poc_agent
+
+    db = SessionLocal()
+    try:
+        if not claim_row(db, Document, Document.id, document_id, ["pending"], "processing"):
+            return  # deleted, finished, or being ingested by another worker
+
+        document = db.query(Document).filter(Document.id == document_id).first()
+        try:
+            with Heartbeat(Document, Document.id, document_id):
+                agent = get_poc_agent()
+                docs = agent.load_document(document.file_path, document.file_type)
+                agent.create_vector_store(
+                    docs,
+                    str(document.user_id),
+                    progress_callback=lambda embedded, total: print(
+                        f"  Document {document_id}: embedded {embedded}/{total} chunks"
+                    )
+                )
+
+            content_text = "\n".join([doc.page_content for doc in docs])
+            document.content_text = content_text[:CONTENT_TEXT_LIMIT]
+            document.status = "indexed"
+            document.error = None
+            db.commit()
+            print(f"✓ Indexed document {document_id} ({len(docs)} chunks)")
+
+        except Exception as e:
+            db.rollback()
+            # Clean up file if processing fails
+            _remove_file(document.file_path)
+            document.status = "failed"
+            document.error = str(e)
+            db.commit()
+            print(f"Warning: Ingestion of document {document_id} failed: {e}")
+    finally:
+        db.close()
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
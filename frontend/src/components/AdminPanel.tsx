@@ -19,6 +19,9 @@ interface User {
   updated_at: string;
 }
 
+// Largest page /api/admin/users serves (le=500 in admin.py)
+const USERS_PAGE_SIZE = 500;
+
 const AdminPanel: React.FC = () => {
   const { isAdmin } = useAuth();
   const navigate = useNavigate();
@@ -56,12 +59,19 @@ const AdminPanel: React.FC = () => {
     setLoading(true);
     setError('');
     try {
-      const response = await axios.get(`${API_URL}/api/admin/users`, {
-        headers: getAuthHeader(),
-      });
-      if (response.data.success) {
-        setUsers(response.data.users);
-      }
+      // Follow next_after_id until the last page (null)
+      const allUsers: User[] = [];
+      let afterId: number | null = null;
+      do {
+        const response: any = await axios.get(`${API_URL}/api/admin/users`, {
+          headers: getAuthHeader(),
+          params: { limit: USERS_PAGE_SIZE, after_id: afterId ?? undefined },
+        });
+        if (!response.data.success) return;
+        allUsers.push(...response.data.users);
+        afterId = response.data.next_after_id ?? null;
+      } while (afterId !== null);
+      setUsers(allUsers);
     } catch (err: any) {
       setError(err.response?.data?.detail || 'Failed to load users');
     } finally {
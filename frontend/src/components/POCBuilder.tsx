@@ -23,6 +23,27 @@ interface Message {
   timestamp: Date;
 }
 
+// Largest page the list endpoints serve (MAX_PAGE_SIZE in pagination.py)
+const LIST_PAGE_SIZE = 200;
+
+/**
+ * Fetch every page of a cursor-paginated list endpoint.
+ * The next page's cursor arrives in the X-Next-Cursor response header.
+ */
+async function fetchAllPages<T>(url: string, token: string | null): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await axios.get<T[]>(url, {
+      headers: { Authorization: `Bearer ${token}` },
+      params: { limit: LIST_PAGE_SIZE, cursor }
+    });
+    items.push(...response.data);
+    cursor = response.headers['x-next-cursor'] || undefined;
+  } while (cursor);
+  return items;
+}
+
 const POCBuilder: React.FC = () => {
   const { token } = useAuth();
   const [activeTab, setActiveTab] = useState<'documents' | 'pocs'>('documents');
@@ -55,10 +76,7 @@ const POCBuilder: React.FC = () => {
 
   const loadDocuments = useCallback(async () => {
     try {
-      const response = await axios.get('http://localhost:8000/api/poc/documents', {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setDocuments(response.data);
+      setDocuments(await fetchAllPages<Document>('http://localhost:8000/api/poc/documents', token));
     } catch (error) {
       console.error('Failed to load documents:', error);
     }
@@ -66,10 +84,7 @@ const POCBuilder: React.FC = () => {
 
   const loadPOCs = useCallback(async () => {
     try {
-      const response = await axios.get('http://localhost:8000/api/poc/list', {
-        headers: { Authorization: `Bearer ${token}` }
-      });
-      setPocs(response.data);
+      setPocs(await fetchAllPages<POC>('http://localhost:8000/api/poc/list', token));
     } catch (error) {
       console.error('Failed to load POCs:', error);
     }
@@ -180,15 +195,32 @@ const POCBuilder: React.FC = () => {
         }
       );
 
+      // Generation runs as a background job; poll until it finishes
+      let job = response.data;
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, 2000));
+        const jobResponse = await axios.get(
+          `http://localhost:8000/api/poc/jobs/${job.job_id}`,
+          {
+            headers: { Authorization: `Bearer ${token}` }
+          }
+        );
+        job = jobResponse.data;
+      }
+
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'POC generation failed');
+      }
+
       const successMessage: Message = {
         role: 'agent',
-        content: `POC "${response.data.poc_name}" generated successfully! ID: ${response.data.poc_id}`,
+        content: `POC "${job.result.poc_name}" generated successfully! ID: ${job.result.poc_id}`,
         timestamp: new Date()
       };
       setMessages(prev => [...prev, successMessage]);
       loadPOCs();
     } catch (error: any) {
-      alert(error.response?.data?.detail || 'POC generation failed');
+      alert(error.response?.data?.detail || error.message || 'POC generation failed');
     } finally {
       setIsTyping(false);
     }
@@ -0,0 +1,383 @@
+"""
+Versioned schema migrations for Boot_Lang.
+
+Each migration runs exactly once per database; the applied version is
+recorded in the schema_version table. On application startup only the
+recorded version is checked (one query), so cold start no longer depends
+on the size of the schema or the data.
+
+Migrations are applied one per transaction while holding a database-wide
+lock (BEGIN IMMEDIATE on SQLite, an advisory lock on Postgres), so several
+workers starting at once (gunicorn -w 4) apply each migration exactly once.
+
+Usage:
+    python migrations.py          # apply pending migrations
+    python migrations.py status   # show current and latest version
+
+Adding a migration:
+    Append a (version, description, function) tuple to MIGRATIONS. The
+    function receives a Connection inside a transaction and must contain
+    the explicit DDL it introduces, never the current models (which keep
+    changing), so a version means the same schema on every database.
+    Check before adding a column or index: databases created before
+    versioned migrations may already have it.
+"""
+
+import os
+import sys
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Index, Integer, JSON, MetaData, String, Table, Text,
+    inspect, select, text
+)
+from sqlalchemy.engine import Connection, Engine
+
+from database import SQLITE_BUSY_TIMEOUT_MS, engine
+
+# Apply pending migrations on startup instead of refusing to start
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "true").lower() == "true"
+
+# How long a worker waits for another worker's migration to finish
+DB_MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("DB_MIGRATION_LOCK_TIMEOUT_MS", "600000"))
+
+# Postgres advisory lock key guarding migrations (any constant unique to this app)
+_PG_MIGRATION_LOCK_KEY = 7_263_001
+
+_version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+# Frozen table definitions used by migrations 1 and 2. Do not edit these
+# to follow model changes; add a migration instead.
+_frozen_metadata = MetaData()
+
+_baseline_tables = [
+    Table(
+        "users", _frozen_metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("username", String(50), unique=True, nullable=False, index=True),
+        Column("email", String(100), nullable=True),
+        Column("password_hash", String(255), nullable=False),
+        Column("is_admin", Boolean, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("updated_at", DateTime, nullable=False)
+    ),
+    Table(
+        "documents", _frozen_metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("user_id", Integer, nullable=False, index=True),
+        Column("filename", String(255), nullable=False),
+        Column("file_path", String(500), nullable=False),
+        Column("content_text", Text, nullable=True),
+        Column("file_type", String(10), nullable=False),
+        Column("created_at", DateTime, nullable=False)
+    ),
+    Table(
+        "pocs", _frozen_metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("user_id", Integer, nullable=False, index=True),
+        Column("poc_id", String(100), nullable=False, index=True),
+        Column("poc_name", String(255), nullable=False),
+        Column("description", Text, nullable=True),
+        Column("requirements", JSON, nullable=True),
+        Column("directory", String(500), nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Index("idx_user_poc", "user_id", "poc_id")
+    ),
+    Table(
+        "poc_conversations", _frozen_metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("poc_id", Integer, nullable=True, index=True),
+        Column("user_id", Integer, nullable=False, index=True),
+        Column("conversation_history", JSON, nullable=True),
+        Column("langchain_memory", JSON, nullable=True),
+        Column("created_at", DateTime, nullable=False)
+    ),
+    Table(
+        "poc_phases", _frozen_metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("poc_id", Integer, nullable=False, index=True),
+        Column("phase_number", Integer, nullable=False),
+        Column("phase_name", String(50), nullable=False),
+        Column("instructions_file", String(500), nullable=False),
+        Column("status", String(20), nullable=False),
+        Column("created_at", DateTime, nullable=False)
+    ),
+    Table(
+        "tenant_1_poc1_tasks", _frozen_metadata,
+        Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+        Column("user_id", Integer, ForeignKey("users.id"), nullable=False, index=True),
+        Column("title", String(200), nullable=False),
+        Column("description", Text, nullable=True),
+        Column("status", String(20), nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Column("updated_at", DateTime, nullable=False)
+    )
+]
+
+_poc_jobs_table = Table(
+    "poc_jobs", _frozen_metadata,
+    Column("id", Integer, primary_key=True, index=True, autoincrement=True),
+    Column("job_id", String(36), unique=True, nullable=False, index=True),
+    Column("user_id", Integer, nullable=False, index=True),
+    Column("job_type", String(20), nullable=False),
+    Column("poc_id", Integer, nullable=True, index=True),
+    Column("status", String(20), nullable=False, index=True),
+    Column("requirements", JSON, nullable=True),
+    Column("progress", JSON, nullable=True),
+    Column("result", JSON, nullable=True),
+    Column("error", Text, nullable=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False)
+)
+
+
+def _create_tables(conn: Connection):
+    """Create the original (pre-migration) tables that do not exist yet."""
+    _frozen_metadata.create_all(bind=conn, tables=_baseline_tables)
+
+
+def _add_missing_columns(conn: Connection):
+    """
+    Add the POC job table and the poc_conversations columns introduced
+    before versioned migrations.
+
+    Databases created before then were built with create_all(), which never
+    alters existing tables. The unique constraint on conversation_id is
+    enforced by its index.
+    """
+    _frozen_metadata.create_all(bind=conn, tables=[_poc_jobs_table])
+
+    existing_columns = {col["name"] for col in inspect(conn).get_columns("poc_conversations")}
+    for name, column_type in [
+        ("langchain_memory", "JSON"),
+        ("conversation_id", "VARCHAR(100)"),
+        ("updated_at", "DATETIME" if conn.dialect.name == "sqlite" else "TIMESTAMP")
+    ]:
+        if name not in existing_columns:
+            conn.execute(text(f"ALTER TABLE poc_conversations ADD COLUMN {name} {column_type}"))
+            print(f"✓ Added column poc_conversations.{name}")
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_poc_conversations_conversation_id"
+        " ON poc_conversations (conversation_id)"
+    ))
+
+
+def _add_hot_query_indexes(conn: Connection):
+    """Add indexes used by per-user list queries (users.email: see migration 4)."""
+    for name, table_name, columns in [
+        ("idx_documents_user_created", "documents", "user_id, created_at"),
+        ("idx_pocs_user_created", "pocs", "user_id, created_at"),
+        ("idx_tasks_user_status", "tenant_1_poc1_tasks", "user_id, status")
+    ]:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table_name} ({columns})"))
+        print(f"✓ Index {name} on {table_name}")
+
+
+def _add_unique_user_email(conn: Connection):
+    """
+    Replace the plain users.email index with a unique partial one.
+
+    Fails with the offending addresses if existing users share an email,
+    so duplicates can be resolved before retrying.
+    """
+    duplicates = conn.execute(text(
+        "SELECT email, COUNT(*) FROM users"
+        " WHERE email IS NOT NULL AND email != ''"
+        " GROUP BY email HAVING COUNT(*) > 1"
+    )).fetchall()
+    if duplicates:
+        emails = ", ".join(f"{email} ({count} users)" for email, count in duplicates)
+        raise RuntimeError(f"Cannot add unique index on users.email, duplicates found: {emails}")
+
+    conn.execute(text("DROP INDEX IF EXISTS idx_users_email"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_users_email ON users (email)"
+        " WHERE email IS NOT NULL AND email != ''"
+    ))
+    print("✓ Index uq_users_email on users")
+
+
+def _add_document_status(conn: Connection):
+    """Add documents.status/error; documents uploaded before were indexed synchronously."""
+    existing_columns = {col["name"] for col in inspect(conn).get_columns("documents")}
+    if "status" not in existing_columns:
+        conn.execute(text("ALTER TABLE documents ADD COLUMN status VARCHAR(20)"))
+    if "error" not in existing_columns:
+        conn.execute(text("ALTER TABLE documents ADD COLUMN error TEXT"))
+    conn.execute(text("UPDATE documents SET status = 'indexed' WHERE status IS NULL"))
+    print("✓ Columns documents.status, documents.error")
+
+
+def _add_job_claims(conn: Connection):
+    """Add poc_jobs.claimed_by/heartbeat_at so workers claim jobs atomically."""
+    existing_columns = {col["name"] for col in inspect(conn).get_columns("poc_jobs")}
+    if "claimed_by" not in existing_columns:
+        conn.execute(text("ALTER TABLE poc_jobs ADD COLUMN claimed_by VARCHAR(100)"))
+    if "heartbeat_at" not in existing_columns:
+        conn.execute(text(f"ALTER TABLE poc_jobs ADD COLUMN heartbeat_at {DateTime().compile(dialect=conn.dialect)}"))
+    print("✓ Columns poc_jobs.claimed_by, poc_jobs.heartbeat_at")
+
+
+def _add_document_claims(conn: Connection):
+    """Add documents.claimed_by/heartbeat_at so ingestion workers claim documents atomically."""
+    existing_columns = {col["name"] for col in inspect(conn).get_columns("documents")}
+    if "claimed_by" not in existing_columns:
+        conn.execute(text("ALTER TABLE documents ADD COLUMN claimed_by VARCHAR(100)"))
+    if "heartbeat_at" not in existing_columns:
+        conn.execute(text(f"ALTER TABLE documents ADD COLUMN heartbeat_at {DateTime().compile(dialect=conn.dialect)}"))
+    print("✓ Columns documents.claimed_by, documents.heartbeat_at")
+
+
+def _add_conversation_turn(conn: Connection):
+    """Add poc_conversations.turn so workers can tell a stale in-memory session."""
+    existing_columns = {col["name"] for col in inspect(conn).get_columns("poc_conversations")}
+    if "turn" not in existing_columns:
+        conn.execute(text("ALTER TABLE poc_conversations ADD COLUMN turn INTEGER NOT NULL DEFAULT 0"))
+    print("✓ Column poc_conversations.turn")
+
+
+# (version, description, migration); versions must increase by one
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Create tables", _create_tables),
+    (2, "Add columns missing from pre-migration tables", _add_missing_columns),
+    (3, "Add hot query indexes", _add_hot_query_indexes),
+    (4, "Add unique partial index on users.email", _add_unique_user_email),
+    (5, "Add document ingestion status", _add_document_status),
+    (6, "Add POC job claims", _add_job_claims),
+    (7, "Add document ingestion claims", _add_document_claims),
+    (8, "Add conversation turn counter", _add_conversation_turn),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(db_engine: Engine = engine) -> Optional[int]:
+    """
+    Read the version recorded in the schema_version table.
+
+    Args:
+        db_engine: Engine to inspect
+
+    Returns:
+        Optional[int]: Current version, 0 if no migration has run, or None
+            if the schema_version table does not exist
+    """
+    with db_engine.connect() as conn:
+        if not inspect(conn).has_table(schema_version.name):
+            return None
+        current = conn.execute(select(schema_version.c.version).order_by(schema_version.c.version.desc())).first()
+        return current[0] if current else 0
+
+
+def run_migrations(db_engine: Engine = engine) -> List[int]:
+    """
+    Apply all pending migrations, each in its own transaction.
+
+    Each transaction first takes the migration lock and re-reads the
+    recorded version, so concurrent callers wait for each other and skip
+    migrations that were applied meanwhile.
+
+    Args:
+        db_engine: Engine to migrate
+
+    Returns:
+        list: Versions applied by this call (empty if already up to date)
+
+    Example:
+        applied = run_migrations()
+        print(f"Applied {applied}")
+    """
+    applied = []
+    while True:
+        with db_engine.connect() as conn:
+            try:
+                _lock_for_migration(conn)
+                _version_metadata.create_all(bind=conn)
+                current = conn.execute(
+                    select(schema_version.c.version).order_by(schema_version.c.version.desc())
+                ).scalar() or 0
+                pending = [entry for entry in MIGRATIONS if entry[0] > current]
+                if not pending:
+                    conn.rollback()
+                    return applied
+
+                version, description, migration = pending[0]
+                migration(conn)
+                conn.execute(schema_version.insert().values(
+                    version=version,
+                    description=description,
+                    applied_at=datetime.utcnow()
+                ))
+                conn.commit()
+            finally:
+                _unlock_after_migration(conn)
+        applied.append(version)
+        print(f"✓ Migration {version}: {description}")
+
+
+def _lock_for_migration(conn: Connection):
+    """Begin a transaction holding the database-wide migration lock."""
+    if conn.dialect.name == "sqlite":
+        # Wait for another worker's migration instead of failing as "locked"
+        conn.exec_driver_sql(f"PRAGMA busy_timeout = {DB_MIGRATION_LOCK_TIMEOUT_MS}")
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    elif conn.dialect.name == "postgresql":
+        # Released automatically at commit or rollback
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_MIGRATION_LOCK_KEY})
+
+
+def _unlock_after_migration(conn: Connection):
+    """Restore per-connection settings changed by _lock_for_migration."""
+    if conn.dialect.name == "sqlite":
+        if conn.in_transaction():
+            conn.rollback()
+        conn.exec_driver_sql(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        conn.rollback()
+
+
+def check_schema_version(db_engine: Engine = engine, auto_migrate: bool = DB_AUTO_MIGRATE) -> int:
+    """
+    Verify the database is at LATEST_VERSION (application startup check).
+
+    Args:
+        db_engine: Engine to check
+        auto_migrate: Apply pending migrations instead of failing
+
+    Returns:
+        int: Schema version after the check
+
+    Raises:
+        RuntimeError: If migrations are pending and auto_migrate is False
+    """
+    current = get_schema_version(db_engine) or 0
+    if current == LATEST_VERSION:
+        return current
+    if current > LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema version {current} is newer than this code ({LATEST_VERSION})"
+        )
+    if not auto_migrate:
+        raise RuntimeError(
+            f"Database schema is at version {current}, expected {LATEST_VERSION}. "
+            "Run: python migrations.py"
+        )
+    run_migrations(db_engine)
+    return LATEST_VERSION
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "status":
+        print(f"Current schema version: {get_schema_version()}")
+        print(f"Latest schema version:  {LATEST_VERSION}")
+    else:
+        print("Applying migrations...")
+        applied = run_migrations()
+        print(f"✓ Database at schema version {LATEST_VERSION} ({len(applied)} migrations applied)")
@@ -0,0 +1,166 @@
+"""
+Helpers for paginated list endpoints.
+
+This module provides:
+- Opaque keyset cursors over (created_at, id), newest first
+- fields= projection parsing against a whitelist of columns
+- ETag computation and If-None-Match handling (304 Not Modified)
+
+List endpoints keep returning a plain JSON list; the cursor for the next
+page is sent in the X-Next-Cursor response header.
+"""
+
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, or_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Build an opaque cursor pointing after a row.
+
+    Args:
+        created_at: created_at of the last row on the page
+        row_id: id of the last row on the page
+
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = json.dumps([created_at.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Parse a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor from the X-Next-Cursor header
+
+    Returns:
+        tuple: (created_at, id) of the last row of the previous page
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    """
+    Parse a comma-separated fields= parameter.
+
+    Args:
+        fields: Raw parameter value (None means all allowed fields)
+        allowed: Fields that may be requested, in output order
+
+    Returns:
+        list: Requested fields in the order of allowed
+
+    Raises:
+        HTTPException: 400 if an unknown field is requested
+    """
+    if not fields:
+        return list(allowed)
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}"
+        )
+    return [name for name in allowed if name in requested]
+
+
+def keyset_page(query, model, limit: int, cursor: Optional[str] = None, since: Optional[datetime] = None):
+    """
+    Apply newest-first keyset pagination on (created_at, id) to a query.
+
+    One extra row is fetched to tell whether another page exists.
+
+    Args:
+        query: SQLAlchemy Query selecting model columns (must include id and created_at)
+        model: Mapped class with created_at and id columns
+        limit: Page size
+        cursor: Cursor of the previous page, if any
+        since: Only rows created at or after this time
+
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page
+    """
+    if since is not None:
+        query = query.filter(model.created_at >= since)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def compute_etag(payload: Any) -> str:
+    """
+    Compute a weak ETag for a JSON-serializable payload.
+
+    Args:
+        payload: Response body
+
+    Returns:
+        str: ETag header value (e.g. 'W/"1a2b..."')
+    """
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return f'W/"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def list_response(request: Request, response: Response, items: List[Dict[str, Any]], next_cursor: Optional[str]):
+    """
+    Finish a list endpoint: set ETag/X-Next-Cursor and honour If-None-Match.
+
+    Args:
+        request: Incoming request
+        response: Response whose headers are set
+        items: Page of serialized rows
+        next_cursor: Cursor for the next page, or None
+
+    Returns:
+        The items, or a 304 Response if the client's copy is current
+    """
+    etag = compute_etag({"items": items, "next": next_cursor})
+    headers = {"ETag": etag}
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return items
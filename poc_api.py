@@ -5,18 +5,28 @@ This module provides FastAPI endpoints for interacting with the POC Agent,
 including document uploads, chat conversations, and POC generation.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
 import os
-import shutil
+import asyncio
+import json
 from datetime import datetime
 
-from database import get_db, Document, POC, POCConversation, POCPhase
+from database import get_db, get_async_db, Document, POC, POCJob
 from agents.poc_agent import POCAgent
-from auth import get_current_user, User
+from agents.poc_sessions import AgentSession, POCSessionManager
+from auth import get_current_user, get_read_only_user
+from user_cache import CurrentUser
+from poc_jobs import enqueue_job, job_to_dict
+from document_ingest import save_upload, enqueue_ingestion
+from conversation_store import get_conversation_store
+from poc_archive import archive_key, get_cached_archive, build_cached_archive, stream_zip
+from poc_manifest import get_manifest
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, parse_fields, keyset_page, list_response
 
 router = APIRouter(prefix="/api/poc", tags=["poc"])
 
@@ -24,6 +34,7 @@ router = APIRouter(prefix="/api/poc", tags=["poc"])
 
 class ChatRequest(BaseModel):
     prompt: str
+    conversation_id: Optional[str] = None
     document_ids: Optional[List[int]] = None
     conversation_history: Optional[dict] = None
 
@@ -36,33 +47,45 @@ class ChatResponse(BaseModel):
 class GenerateRequest(BaseModel):
     requirements: dict
 
-class POCResponse(BaseModel):
-    poc_id: str
-    poc_name: str
-    directory: str
-    files: List[str]
+class JobResponse(BaseModel):
+    job_id: str
+    job_type: str
+    status: str
+    poc_id: Optional[str] = None
+    progress: dict = {}
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
 
-# Initialize POC Agent (lazy initialization)
-_poc_agent = None
+# Initialize POC session manager (lazy initialization)
+_session_manager = None
 
-def get_poc_agent():
-    """Lazy initialization of POC Agent"""
-    global _poc_agent
-    if _poc_agent is None:
-        _poc_agent = POCAgent()
-    return _poc_agent
+def get_session_manager() -> POCSessionManager:
+    """Lazy initialization of the per-conversation session manager"""
+    global _session_manager
+    if _session_manager is None:
+        _session_manager = POCSessionManager(store=get_conversation_store())
+    return _session_manager
 
+def get_poc_agent() -> POCAgent:
+    """Shared POC Agent (LLM/embeddings clients) for stateless operations"""
+    return get_session_manager().base_agent
 
-@router.post("/upload")
+
+@router.post("/upload", status_code=202)
 async def upload_document(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Upload a document (PDF, TXT, MD, PNG, JPG) for POC context.
     
-    The document will be stored and processed for RAG.
+    The file is streamed to disk (413 above DOCUMENT_MAX_UPLOAD_BYTES) and
+    returned with status "pending"; parsing, embedding and indexing run in
+    the background. Poll GET /documents/{doc_id} until status is "indexed"
+    (or "failed", with an error).
     """
     # Validate file type
     allowed_types = ["pdf", "txt", "md", "png", "jpg", "jpeg"]
@@ -76,73 +99,97 @@ async def upload_document(
     
     # Create upload directory
     upload_dir = f"uploads/{current_user.id}"
-    os.makedirs(upload_dir, exist_ok=True)
+    await asyncio.to_thread(os.makedirs, upload_dir, exist_ok=True)
     
     # Save file
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"{timestamp}_{file.filename}"
     file_path = os.path.join(upload_dir, filename)
     
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    # Load and process document
-    try:
-        agent = get_poc_agent()
-        docs = agent.load_document(file_path, file_ext)
-        agent.create_vector_store(docs, str(current_user.id))
-        
-        # Extract content for database
-        content_text = "\n".join([doc.page_content for doc in docs])
-        
-    except Exception as e:
-        # Clean up file if processing fails
-        os.remove(file_path)
-        raise HTTPException(status_code=500, detail=f"Document processing failed: {str(e)}")
+    await save_upload(file, file_path)
     
-    # Save to database
+    # Save to database; content_text is filled in by the ingestion worker
     db_document = Document(
         user_id=current_user.id,
         filename=file.filename,
         file_path=file_path,
-        content_text=content_text[:10000],  # Limit to 10k chars
-        file_type=file_ext
+        file_type=file_ext,
+        status="pending"
     )
     db.add(db_document)
-    db.commit()
-    db.refresh(db_document)
+    await db.commit()
+    
+    enqueue_ingestion(db_document.id)
     
     return {
         "id": db_document.id,
         "filename": db_document.filename,
         "file_type": db_document.file_type,
+        "status": db_document.status,
         "created_at": db_document.created_at
     }
 
 
+# Fields selectable with fields= on the list endpoints
+DOCUMENT_LIST_FIELDS = ("id", "filename", "file_type", "status", "created_at")
+POC_LIST_FIELDS = ("id", "poc_id", "poc_name", "description", "created_at")
+
+
 @router.get("/documents")
 def list_documents(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    since: Optional[datetime] = Query(None, description="Only documents uploaded at or after this time"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    current_user: CurrentUser = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
-    """List all documents uploaded by current user."""
-    documents = db.query(Document).filter(Document.user_id == current_user.id).all()
-    
-    return [
-        {
-            "id": doc.id,
-            "filename": doc.filename,
-            "file_type": doc.file_type,
-            "created_at": doc.created_at
-        }
-        for doc in documents
-    ]
+    """
+    List documents uploaded by current user, newest first.
+    
+    Paginated by cursor (next page cursor in the X-Next-Cursor header).
+    Returns 304 when If-None-Match matches the page's ETag.
+    """
+    selected = parse_fields(fields, DOCUMENT_LIST_FIELDS)
+    columns = {getattr(Document, name) for name in selected} | {Document.id, Document.created_at}
+    query = db.query(*columns).filter(Document.user_id == current_user.id)
+    documents, next_cursor = keyset_page(query, Document, limit, cursor, since)
+    
+    items = [{name: getattr(doc, name) for name in selected} for doc in documents]
+    return list_response(request, response, items, next_cursor)
+
+
+@router.get("/documents/{doc_id}")
+def get_document(
+    doc_id: int,
+    current_user: CurrentUser = Depends(get_read_only_user),
+    db: Session = Depends(get_db)
+):
+    """Get a document's ingestion status."""
+    document = db.query(Document).filter(
+        Document.id == doc_id,
+        Document.user_id == current_user.id
+    ).first()
+    
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    return {
+        "id": document.id,
+        "filename": document.filename,
+        "file_type": document.file_type,
+        "status": document.status,
+        "error": document.error,
+        "created_at": document.created_at
+    }
 
 
 @router.delete("/documents/{doc_id}")
 def delete_document(
     doc_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a document."""
@@ -165,21 +212,49 @@ def delete_document(
     return {"message": "Document deleted"}
 
 
+async def _get_chat_session(request: ChatRequest, current_user: CurrentUser) -> AgentSession:
+    """
+    Resolve the request's conversation ID and return its pinned session.
+    
+    A client-supplied ID already saved under another user is rejected with
+    409 instead of being chatted on and then silently never persisted.
+    """
+    conversation_id = request.conversation_id
+    if not conversation_id and request.conversation_history:
+        conversation_id = request.conversation_history.get("conversation_id")
+    
+    manager = get_session_manager()
+    try:
+        if conversation_id and manager.get_existing(str(current_user.id), conversation_id) is None:
+            owner = await asyncio.to_thread(get_conversation_store().owner, conversation_id)
+            if owner is not None and owner != current_user.id:
+                print(f"Warning: User {current_user.id} sent conversation ID {conversation_id} owned by user {owner}")
+                raise HTTPException(status_code=409, detail="Conversation ID belongs to another user")
+        return await manager.aget_session(str(current_user.id), conversation_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chat processing failed: {str(e)}")
+
+
 @router.post("/chat", response_model=ChatResponse)
-def chat_with_agent(
+async def chat_with_agent(
     request: ChatRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Chat with POC Agent.
     
     Processes user message and returns agent response with conversation tracking.
+    Each conversation runs against its own session, keyed by user and
+    conversation ID, so concurrent chats never share memory. Conversation
+    state is persisted server-side, so clients only need to send the
+    conversation_id (not the full history) on later turns.
     """
+    session = await _get_chat_session(request, current_user)
     try:
-        agent = get_poc_agent()
-        result = agent.process_request(
+        result = await session.aprocess_request(
             prompt=request.prompt,
-            user_id=str(current_user.id),
             document_ids=request.document_ids,
             conversation_history=request.conversation_history
         )
@@ -190,89 +265,138 @@ def chat_with_agent(
         raise HTTPException(status_code=500, detail=f"Chat processing failed: {str(e)}")
 
 
-@router.post("/generate", response_model=POCResponse)
+@router.post("/chat/stream")
+async def stream_chat_with_agent(
+    request: ChatRequest,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Chat with POC Agent, streaming the response as Server-Sent Events.
+    
+    Emits a `start` event with the conversation ID, one `token` event per
+    model token, and a final `done` event carrying the same payload as
+    /chat (response, conversation_id, agent_state, next_action).
+    """
+    session = await _get_chat_session(request, current_user)
+    
+    async def event_stream():
+        async for event in session.astream_request(
+            prompt=request.prompt,
+            document_ids=request.document_ids,
+            conversation_history=request.conversation_history
+        ):
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@router.get("/chat/{conversation_id}/contradictions")
+def get_contradictions(
+    conversation_id: str,
+    current_user: CurrentUser = Depends(get_read_only_user)
+):
+    """
+    Get the latest background contradiction analysis for a conversation.
+    
+    Contradiction detection runs off the chat hot path; poll this endpoint
+    (or read agent_state.contradictions on the next turn) for the result.
+    Conversations not loaded in this worker are answered from the store.
+    """
+    session = get_session_manager().get_existing(str(current_user.id), conversation_id)
+    if session is not None:
+        contradiction_status = session.agent.get_contradiction_status()
+    else:
+        saved_state = get_conversation_store().load(current_user.id, conversation_id)
+        if saved_state is None:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        contradiction_status = POCAgent.saved_contradiction_status(saved_state)
+    
+    return {
+        "conversation_id": conversation_id,
+        **contradiction_status
+    }
+
+
+@router.post("/generate", response_model=JobResponse, status_code=202)
 def generate_poc(
     request: GenerateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Generate POC structure with all documentation files.
+    Start a background job that generates the POC structure and documentation.
     
-    Creates directory structure and markdown files for implementation.
+    Returns immediately with the queued job; poll /api/poc/jobs/{job_id}
+    for per-file progress and the final result.
     """
-    try:
-        agent = get_poc_agent()
-        result = agent.generate_poc(
-            requirements=request.requirements,
-            user_id=str(current_user.id)
-        )
-        
-        # Save to database
-        db_poc = POC(
-            user_id=current_user.id,
-            poc_id=result["poc_id"],
-            poc_name=result["poc_name"],
-            description=request.requirements.get("goal", ""),
-            requirements=request.requirements,
-            directory=result["directory"]
-        )
-        db.add(db_poc)
-        db.commit()
-        db.refresh(db_poc)
-        
-        # Create phase records
-        phases = [
-            ("phase_1_frontend", "Frontend"),
-            ("phase_2_backend", "Backend"),
-            ("phase_3_database", "Database")
-        ]
-        
-        for i, (file_key, name) in enumerate(phases, 1):
-            db_phase = POCPhase(
-                poc_id=db_poc.id,
-                phase_number=i,
-                phase_name=name,
-                instructions_file=os.path.join(result["directory"], f"{file_key}.md"),
-                status="pending"
-            )
-            db.add(db_phase)
-        
-        db.commit()
-        
-        return POCResponse(**result)
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"POC generation failed: {str(e)}")
+    job = enqueue_job(db, current_user.id, "generate", request.requirements)
+    return JobResponse(**job_to_dict(job))
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job_status(
+    job_id: str,
+    current_user: CurrentUser = Depends(get_read_only_user),
+    db: Session = Depends(get_db)
+):
+    """Get status, per-file progress and result of a POC generation job."""
+    job = db.query(POCJob).filter(
+        POCJob.job_id == job_id,
+        POCJob.user_id == current_user.id
+    ).first()
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return JobResponse(**job_to_dict(job))
 
 
 @router.get("/list")
 def list_pocs(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    since: Optional[datetime] = Query(None, description="Only POCs created at or after this time"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. id,poc_id,poc_name)"),
+    current_user: CurrentUser = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
-    """List all POCs created by current user."""
-    pocs = db.query(POC).filter(POC.user_id == current_user.id).all()
-    
-    return [
-        {
-            "id": poc.id,
-            "poc_id": poc.poc_id,
-            "poc_name": poc.poc_name,
-            "description": poc.description,
-            "created_at": poc.created_at
-        }
-        for poc in pocs
-    ]
+    """
+    List POCs created by current user, newest first.
+    
+    Paginated by cursor (next page cursor in the X-Next-Cursor header).
+    Leave description out of fields= to skip loading it.
+    Returns 304 when If-None-Match matches the page's ETag.
+    """
+    selected = parse_fields(fields, POC_LIST_FIELDS)
+    columns = {getattr(POC, name) for name in selected} | {POC.id, POC.created_at}
+    query = db.query(*columns).filter(POC.user_id == current_user.id)
+    pocs, next_cursor = keyset_page(query, POC, limit, cursor, since)
+    
+    items = [{name: getattr(poc, name) for name in selected} for poc in pocs]
+    return list_response(request, response, items, next_cursor)
 
 
 @router.get("/{poc_id}/files")
 def get_poc_files(
     poc_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
-    """Get file tree for a POC."""
+    """
+    Get the file manifest for a POC.
+    
+    Served from the cached manifest (see poc_manifest); each entry has
+    path, size, mtime_ns and sha256 so clients can skip unchanged files.
+    """
     poc = db.query(POC).filter(
         POC.poc_id == poc_id,
         POC.user_id == current_user.id
@@ -281,31 +405,31 @@ def get_poc_files(
     if not poc:
         raise HTTPException(status_code=404, detail="POC not found")
     
-    # Get all files in POC directory
-    files = []
-    poc_dir = poc.directory
-    
-    if os.path.exists(poc_dir):
-        for root, dirs, filenames in os.walk(poc_dir):
-            for filename in filenames:
-                full_path = os.path.join(root, filename)
-                rel_path = os.path.relpath(full_path, poc_dir)
-                files.append(rel_path)
+    manifest = get_manifest(poc.directory)
     
     return {
         "poc_id": poc.poc_id,
         "directory": poc.directory,
-        "files": files
+        "hash": manifest["hash"],
+        "files": [entry["path"] for entry in manifest["files"]],
+        "manifest": manifest["files"]
     }
 
 
 @router.get("/{poc_id}/download")
 def download_poc(
     poc_id: str,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    current_user: CurrentUser = Depends(get_read_only_user),
     db: Session = Depends(get_db)
 ):
-    """Download POC as ZIP file."""
+    """
+    Download POC as ZIP file.
+    
+    The archive is streamed as it is compressed. Range requests (resumed
+    downloads) are served from a cached copy keyed by the POC manifest
+    hash, which is also the ETag.
+    """
     poc = db.query(POC).filter(
         POC.poc_id == poc_id,
         POC.user_id == current_user.id
@@ -314,33 +438,51 @@ def download_poc(
     if not poc:
         raise HTTPException(status_code=404, detail="POC not found")
     
-    # Create ZIP file
-    import zipfile
     zip_filename = f"{poc.poc_id}.zip"
-    zip_path = f"/tmp/{zip_filename}"
+    arc_root = os.path.basename(os.path.normpath(poc.directory))
+    key = archive_key(get_manifest(poc.directory)["hash"], arc_root)
+    etag = f'"{key}"'
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    # Ranges/resume are served from a cached artifact with identical bytes
+    zip_path = get_cached_archive(key)
+    if zip_path is None and "range" in request.headers:
+        zip_path = build_cached_archive(poc.directory, key, arc_root)
     
-    with zipfile.ZipFile(zip_path, 'w') as zipf:
-        for root, dirs, files in os.walk(poc.directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, os.path.dirname(poc.directory))
-                zipf.write(file_path, arcname)
+    if zip_path is not None:
+        return FileResponse(
+            zip_path,
+            media_type="application/zip",
+            filename=zip_filename,
+            headers={"ETag": etag}
+        )
     
-    return FileResponse(
-        zip_path,
+    # Compress while sending; nothing is written to disk
+    return StreamingResponse(
+        stream_zip(poc.directory, arc_root),
         media_type="application/zip",
-        filename=zip_filename
+        headers={
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Content-Disposition": f'attachment; filename="{zip_filename}"'
+        }
     )
 
 
-@router.put("/{poc_id}/update")
+@router.put("/{poc_id}/update", response_model=JobResponse, status_code=202)
 def update_poc(
     poc_id: str,
     request: GenerateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Update POC requirements and regenerate phase files."""
+    """
+    Start a background job that updates POC requirements and regenerates phase files.
+    
+    Requirements are saved on the POC once the job finishes.
+    """
     poc = db.query(POC).filter(
         POC.poc_id == poc_id,
         POC.user_id == current_user.id
@@ -349,23 +491,5 @@ def update_poc(
     if not poc:
         raise HTTPException(status_code=404, detail="POC not found")
     
-    # Update requirements
-    poc.requirements = request.requirements
-    poc.description = request.requirements.get("goal", poc.description)
-    
-    # Regenerate phase files
-    try:
-        agent = get_poc_agent()
-        result = agent.generate_poc(
-            requirements=request.requirements,
-            user_id=str(current_user.id)
-        )
-        
-        db.commit()
-        
-        return {"message": "POC updated", "directory": result["directory"]}
-        
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"POC update failed: {str(e)}")
-
+    job = enqueue_job(db, current_user.id, "update", request.requirements, poc=poc)
+    return JobResponse(**job_to_dict(job))
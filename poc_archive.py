@@ -0,0 +1,181 @@
+"""
+ZIP downloads of POC directories.
+
+This module provides:
+- A streaming ZIP generator: files are compressed while the response is
+  sent, through a non-seekable buffer that is drained after every chunk,
+  so memory stays constant and nothing is written to disk
+- Deterministic bytes: entries carry a fixed timestamp, so an archive
+  depends only on file names and contents (what the manifest hash covers)
+- Cached ZIP artifacts keyed by the POC manifest hash (plus archive root
+  and compression level), written atomically (temp file +
+  rename), so Range requests and resumed downloads get identical bytes
+
+Configured via POC_ZIP_* environment variables.
+"""
+
+import os
+import hashlib
+import tempfile
+import zipfile
+from typing import Iterator, List, Optional
+
+from poc_manifest import list_poc_files
+
+# Archive configuration
+POC_ZIP_COMPRESSION_LEVEL = int(os.getenv("POC_ZIP_COMPRESSION_LEVEL", "6"))
+POC_ZIP_CHUNK_SIZE = int(os.getenv("POC_ZIP_CHUNK_SIZE", str(64 * 1024)))
+POC_ZIP_CACHE_DIR = os.getenv(
+    "POC_ZIP_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "boot_lang_poc_archives")
+)
+POC_ZIP_CACHE_MAX_FILES = int(os.getenv("POC_ZIP_CACHE_MAX_FILES", "50"))
+
+
+class _StreamBuffer:
+    """Write-only, non-seekable sink; zipfile falls back to data descriptors."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(
+    directory: str,
+    arc_root: Optional[str] = None,
+    compression_level: int = POC_ZIP_COMPRESSION_LEVEL
+) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of a directory chunk by chunk.
+
+    Args:
+        directory: Directory to archive
+        arc_root: Folder name inside the archive (defaults to the directory's name)
+        compression_level: Deflate level 0-9 (0 stores files uncompressed)
+
+    Yields:
+        bytes: Next part of the archive
+
+    Example:
+        return StreamingResponse(stream_zip(poc.directory), media_type="application/zip")
+    """
+    arc_root = arc_root or os.path.basename(os.path.normpath(directory))
+    compression = zipfile.ZIP_DEFLATED if compression_level > 0 else zipfile.ZIP_STORED
+    buffer = _StreamBuffer()
+
+    with zipfile.ZipFile(buffer, "w", compression=compression, compresslevel=compression_level or None) as archive:
+        for full_path, rel_path in list_poc_files(directory):
+            # Opened by name: the entry takes the archive's compression and
+            # ZipInfo's fixed 1980-01-01 timestamp, never the file's mtime
+            with open(full_path, "rb") as src, archive.open(os.path.join(arc_root, rel_path), "w") as dest:
+                for chunk in iter(lambda: src.read(POC_ZIP_CHUNK_SIZE), b""):
+                    dest.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            data = buffer.drain()
+            if data:
+                yield data
+
+    # Central directory
+    data = buffer.drain()
+    if data:
+        yield data
+
+
+def archive_key(content_hash: str, arc_root: str, compression_level: int = POC_ZIP_COMPRESSION_LEVEL) -> str:
+    """
+    Identify an archive by everything that determines its bytes.
+
+    Args:
+        content_hash: Directory content hash (poc_manifest.get_manifest()["hash"])
+        arc_root: Folder name inside the archive
+        compression_level: Deflate level
+
+    Returns:
+        str: SHA-256 hex digest, used as cache file name and ETag
+    """
+    return hashlib.sha256(f"{content_hash}:{arc_root}:{compression_level}".encode("utf-8")).hexdigest()
+
+
+def get_cached_archive(key: str) -> Optional[str]:
+    """
+    Return the cached archive for a key, if it was built before.
+
+    Args:
+        key: Key from archive_key
+
+    Returns:
+        Optional[str]: Path of the cached ZIP, or None
+    """
+    path = os.path.join(POC_ZIP_CACHE_DIR, f"{key}.zip")
+    if not os.path.exists(path):
+        return None
+    try:
+        os.utime(path)  # keep recently used archives when pruning
+    except OSError:
+        pass
+    return path
+
+
+def build_cached_archive(directory: str, key: str, arc_root: str) -> str:
+    """
+    Write an archive to the cache (atomically) and return its path.
+
+    The bytes are identical to stream_zip's output, so a download started
+    as a stream can be resumed with a Range request against the artifact.
+
+    Args:
+        directory: Directory to archive
+        key: Key from archive_key (the cache file name)
+        arc_root: Folder name inside the archive
+
+    Returns:
+        str: Path of the cached ZIP
+    """
+    cached = get_cached_archive(key)
+    if cached:
+        return cached
+
+    os.makedirs(POC_ZIP_CACHE_DIR, exist_ok=True)
+    path = os.path.join(POC_ZIP_CACHE_DIR, f"{key}.zip")
+    fd, tmp_path = tempfile.mkstemp(dir=POC_ZIP_CACHE_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in stream_zip(directory, arc_root):
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    _prune_cache()
+    return path
+
+
+def _prune_cache():
+    """Remove the oldest cached archives beyond POC_ZIP_CACHE_MAX_FILES."""
+    try:
+        archives = [
+            os.path.join(POC_ZIP_CACHE_DIR, name)
+            for name in os.listdir(POC_ZIP_CACHE_DIR)
+            if name.endswith(".zip")
+        ]
+        archives.sort(key=os.path.getmtime, reverse=True)
+        for path in archives[POC_ZIP_CACHE_MAX_FILES:]:
+            os.remove(path)
+    except OSError as e:
+        print(f"Warning: POC archive cache prune failed: {e}")
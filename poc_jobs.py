@@ -0,0 +1,262 @@
+"""
+Background job queue for POC generation.
+
+This module provides:
+- Persisted generation/update jobs (POCJob table)
+- A bounded worker pool that runs POCAgent.generate_poc off the request
+- Atomic job claims (worker_claims), so a job re-submitted by several
+  worker processes on startup runs once
+- Per-file progress on POCJob.progress and POCPhase.status as files land
+- A refreshed file manifest (poc_manifest) once generation finishes
+"""
+
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, POC, POCPhase, POCJob
+from poc_manifest import write_manifest
+from worker_claims import Heartbeat, claim_row, stale_filter
+
+# Worker pool configuration
+POC_JOB_WORKERS = int(os.getenv("POC_JOB_WORKERS", "2"))
+_job_executor = ThreadPoolExecutor(max_workers=POC_JOB_WORKERS, thread_name_prefix="poc-job")
+
+# Phase records kept for every POC: (instructions file, phase name)
+POC_PHASES = [
+    ("phase_1_frontend.md", "Frontend"),
+    ("phase_2_backend.md", "Backend"),
+    ("phase_3_database.md", "Database")
+]
+
+
+def enqueue_job(
+    db: Session,
+    user_id: int,
+    job_type: str,
+    requirements: Dict[str, Any],
+    poc: Optional[POC] = None
+) -> POCJob:
+    """
+    Persist a new generation job and hand it to the worker pool.
+
+    Args:
+        db: Database session
+        user_id: Owner of the job
+        job_type: "generate" for a new POC, "update" to regenerate an existing one
+        requirements: Requirements to generate from
+        poc: Existing POC (required for "update")
+
+    Returns:
+        POCJob: The queued job
+
+    Raises:
+        ValueError: If job_type is unknown or an update has no POC
+
+    Example:
+        job = enqueue_job(db, current_user.id, "generate", {"goal": "Task tracker"})
+        print(job.job_id, job.status)  # "...", "queued"
+    """
+    if job_type not in ("generate", "update"):
+        raise ValueError(f"Unknown job type: {job_type}")
+    if job_type == "update" and poc is None:
+        raise ValueError("Update jobs require an existing POC")
+
+    job = POCJob(
+        job_id=str(uuid.uuid4()),
+        user_id=user_id,
+        job_type=job_type,
+        poc_id=poc.id if poc else None,
+        status="queued",
+        requirements=requirements,
+        progress={}
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    _job_executor.submit(run_job, job.job_id)
+    return job
+
+
+def resume_pending_jobs() -> int:
+    """
+    Re-submit queued jobs and running jobs whose worker stopped heartbeating.
+
+    Call once on application startup. Every worker process does this;
+    run_job's claim makes sure each job still runs once.
+
+    Returns:
+        int: Number of jobs re-submitted
+    """
+    db = SessionLocal()
+    try:
+        pending = db.query(POCJob.job_id).filter(
+            or_(POCJob.status == "queued", stale_filter(POCJob, "running"))
+        ).all()
+    finally:
+        db.close()
+
+    for (job_id,) in pending:
+        _job_executor.submit(run_job, job_id)
+
+    if pending:
+        print(f"✓ Resumed {len(pending)} POC generation jobs")
+    return len(pending)
+
+
+def job_to_dict(job: POCJob) -> Dict[str, Any]:
+    """
+    Serialize a job for API responses.
+
+    Args:
+        job: Job to serialize
+
+    Returns:
+        dict: Public job fields
+    """
+    result = job.result or {}
+    return {
+        "job_id": job.job_id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "poc_id": result.get("poc_id"),
+        "progress": job.progress or {},
+        "result": result if job.status == "done" else None,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
+
+
+def run_job(job_id: str):
+    """
+    Run a generation job to completion (worker pool entry point).
+
+    The job is claimed first; if another worker holds it (or it already
+    finished) this returns without doing anything.
+
+    Args:
+        job_id: Public identifier of the job to run
+    """
+    # Imported here to avoid a circular import with poc_api
+    from poc_api import get_poc_agent
+
+    db = SessionLocal()
+    try:
+        if not claim_row(db, POCJob, POCJob.job_id, job_id, ["queued"], "running"):
+            return
+
+        job = db.query(POCJob).filter(POCJob.job_id == job_id).first()
+        job.error = None
+        job.progress = {}
+        db.commit()
+
+        try:
+            with Heartbeat(POCJob, POCJob.job_id, job_id):
+                tracker = _JobProgress(db, job)
+                # Updates regenerate in place, so POC.poc_id and directory stay valid
+                existing = {}
+                if job.job_type == "update" and tracker.poc is not None:
+                    existing = {"poc_id": tracker.poc.poc_id, "directory": tracker.poc.directory}
+                result = get_poc_agent().generate_poc(
+                    requirements=job.requirements or {},
+                    user_id=str(job.user_id),
+                    progress_callback=tracker,
+                    **existing
+                )
+
+            if job.job_type == "update":
+                poc = tracker.poc
+                poc.requirements = job.requirements
+                poc.description = (job.requirements or {}).get("goal", poc.description)
+
+            write_manifest(result["directory"])
+            
+            job.result = result
+            job.status = "done"
+            db.commit()
+            print(f"✓ POC job {job_id} finished ({len(result.get('failed', []))} failed files)")
+
+        except Exception as e:
+            db.rollback()
+            job.status = "failed"
+            job.error = str(e)
+            db.commit()
+            print(f"Warning: POC job {job_id} failed: {e}")
+    finally:
+        db.close()
+
+
+class _JobProgress:
+    """Progress callback that mirrors generate_poc events into the database."""
+
+    def __init__(self, db: Session, job: POCJob):
+        self.db = db
+        self.job = job
+        self.poc: Optional[POC] = None
+        if job.poc_id is not None:
+            self.poc = db.query(POC).filter(POC.id == job.poc_id).first()
+
+    def __call__(self, event: str, payload: Dict[str, Any]):
+        if event == "started":
+            self._started(payload)
+        elif event == "file_written":
+            self._set_file_status(payload["file"], "done", "pending")
+        elif event == "file_failed":
+            self._set_file_status(payload["file"], "failed", "failed")
+        self.db.commit()
+
+    def _started(self, payload: Dict[str, Any]):
+        job = self.job
+        job.progress = {filename: "pending" for filename in payload["files"]}
+        job.result = {"poc_id": payload["poc_id"], "directory": payload["directory"]}
+
+        if self.poc is None:
+            self.poc = POC(
+                user_id=job.user_id,
+                poc_id=payload["poc_id"],
+                poc_name=payload["poc_name"],
+                description=(job.requirements or {}).get("goal", ""),
+                requirements=job.requirements,
+                directory=payload["directory"]
+            )
+            self.db.add(self.poc)
+            self.db.flush()
+            job.poc_id = self.poc.id
+
+        # Create or reset phase records
+        existing = {
+            phase.phase_number: phase
+            for phase in self.db.query(POCPhase).filter(POCPhase.poc_id == self.poc.id).all()
+        }
+        for number, (filename, name) in enumerate(POC_PHASES, 1):
+            instructions_file = os.path.join(payload["directory"], filename)
+            phase = existing.get(number)
+            if phase is None:
+                self.db.add(POCPhase(
+                    poc_id=self.poc.id,
+                    phase_number=number,
+                    phase_name=name,
+                    instructions_file=instructions_file,
+                    status="generating"
+                ))
+            else:
+                phase.instructions_file = instructions_file
+                phase.status = "generating"
+
+    def _set_file_status(self, filename: str, file_status: str, phase_status: str):
+        # JSON columns are not mutation-tracked; assign a new dict
+        self.job.progress = {**(self.job.progress or {}), filename: file_status}
+
+        for number, (phase_file, _) in enumerate(POC_PHASES, 1):
+            if phase_file != filename or self.poc is None:
+                continue
+            self.db.query(POCPhase).filter(
+                POCPhase.poc_id == self.poc.id,
+                POCPhase.phase_number == number
+            ).update({"status": phase_status})
@@ -0,0 +1,212 @@
+"""
+Cached, incremental file manifests for POC directories.
+
+A manifest lists every file of a POC with its relative path, size, mtime
+and SHA-256, plus a hash of the whole directory:
+- Written to MANIFEST_FILENAME inside the POC directory when a generation
+  job finishes (see poc_jobs.run_job)
+- Kept in an in-process cache; a request only stats the directories and
+  files the manifest knows about and reuses it when none of their mtimes
+  (or file sizes) changed, so nothing is read or hashed
+- Otherwise (files added, removed, renamed or edited in place) the tree is
+  rescanned and only files whose size or mtime changed are re-hashed
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+MANIFEST_FILENAME = ".poc_manifest.json"
+MANIFEST_VERSION = 1
+_HASH_CHUNK_SIZE = 64 * 1024
+
+# directory -> (manifest, directory mtimes observed when it was validated)
+_manifests: Dict[str, Tuple[Dict[str, Any], Dict[str, int]]] = {}
+_manifests_lock = threading.Lock()
+
+
+def list_poc_files(directory: str) -> List[Tuple[str, str]]:
+    """
+    List the files of a POC directory in a stable order, excluding the manifest.
+
+    Args:
+        directory: POC directory
+
+    Returns:
+        list: (full path, path relative to directory) tuples sorted by relative path
+    """
+    files = []
+    if os.path.isdir(directory):
+        for root, dirs, filenames in os.walk(directory):
+            for filename in filenames:
+                full_path = os.path.join(root, filename)
+                rel_path = os.path.relpath(full_path, directory)
+                # Skip the manifest and its in-flight temp files
+                if not rel_path.startswith(".poc_manifest"):
+                    files.append((full_path, rel_path))
+    return sorted(files, key=lambda item: item[1])
+
+
+def get_manifest(directory: str) -> Dict[str, Any]:
+    """
+    Return the manifest of a POC directory, refreshing it only if needed.
+
+    Args:
+        directory: POC directory
+
+    Returns:
+        dict: {"hash": str, "files": [{"path", "size", "mtime_ns", "sha256"}, ...],
+            "dirs": {relative dir: mtime_ns}}
+
+    Example:
+        manifest = get_manifest(poc.directory)
+        print(manifest["hash"], len(manifest["files"]))
+    """
+    directory = os.path.normpath(directory)
+    with _manifests_lock:
+        cached = _manifests.get(directory)
+
+    if cached is None:
+        manifest = _read_manifest_file(directory)
+        if manifest is not None:
+            cached = (manifest, manifest.get("dirs", {}))
+
+    if cached is not None:
+        manifest, dir_mtimes = cached
+        if _dir_mtimes(directory, dir_mtimes.keys()) == dir_mtimes and _files_unchanged(directory, manifest):
+            _remember(directory, manifest, dir_mtimes)
+            return manifest
+        previous = manifest
+    else:
+        previous = None
+
+    manifest = _build_manifest(directory, previous)
+    if previous is None or manifest["hash"] != previous["hash"]:
+        _write_manifest_file(directory, manifest)
+    # Writing the manifest changes the root directory's mtime; observe after
+    _remember(directory, manifest, _dir_mtimes(directory, manifest["dirs"].keys()))
+    return manifest
+
+
+def write_manifest(directory: str) -> Dict[str, Any]:
+    """
+    Rebuild and write the manifest after a POC directory was (re)generated.
+
+    Unchanged files keep their hashes; changed files are re-hashed.
+
+    Args:
+        directory: POC directory
+
+    Returns:
+        dict: Fresh manifest
+    """
+    directory = os.path.normpath(directory)
+    with _manifests_lock:
+        cached = _manifests.get(directory)
+    previous = cached[0] if cached else _read_manifest_file(directory)
+
+    manifest = _build_manifest(directory, previous)
+    _write_manifest_file(directory, manifest)
+    _remember(directory, manifest, _dir_mtimes(directory, manifest["dirs"].keys()))
+    return manifest
+
+
+def _build_manifest(directory: str, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Scan a directory, reusing hashes of files whose size and mtime are unchanged."""
+    known = {entry["path"]: entry for entry in (previous or {}).get("files", [])}
+    files = []
+    for full_path, rel_path in list_poc_files(directory):
+        stat = os.stat(full_path)
+        entry = known.get(rel_path)
+        if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            entry = {
+                "path": rel_path,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": _hash_file(full_path)
+            }
+        files.append(entry)
+
+    digest = hashlib.sha256()
+    for entry in files:
+        digest.update(f"{entry['path']}\0{entry['sha256']}\0".encode("utf-8"))
+
+    # The root is always tracked so a directory created later is noticed
+    rel_dirs = ["."] + [
+        os.path.relpath(os.path.join(root, name), directory)
+        for root, dirnames, _ in os.walk(directory)
+        for name in dirnames
+    ]
+
+    return {
+        "version": MANIFEST_VERSION,
+        "hash": digest.hexdigest(),
+        "files": files,
+        "dirs": _dir_mtimes(directory, rel_dirs)
+    }
+
+
+def _dir_mtimes(directory: str, rel_dirs) -> Dict[str, int]:
+    """Stat the given directories (relative to directory); -1 marks a missing one."""
+    mtimes = {}
+    for rel_dir in rel_dirs:
+        try:
+            mtimes[rel_dir] = os.stat(os.path.join(directory, rel_dir)).st_mtime_ns
+        except OSError:
+            mtimes[rel_dir] = -1
+    return mtimes
+
+
+def _files_unchanged(directory: str, manifest: Dict[str, Any]) -> bool:
+    """Check that every listed file still has its recorded size and mtime (in-place edits)."""
+    for entry in manifest["files"]:
+        try:
+            stat = os.stat(os.path.join(directory, entry["path"]))
+        except OSError:
+            return False
+        if stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime_ns"]:
+            return False
+    return True
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _remember(directory: str, manifest: Dict[str, Any], dir_mtimes: Dict[str, int]):
+    manifest["dirs"] = dir_mtimes
+    with _manifests_lock:
+        _manifests[directory] = (manifest, dir_mtimes)
+
+
+def _read_manifest_file(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, MANIFEST_FILENAME), "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest_file(directory: str, manifest: Dict[str, Any]):
+    """Write the manifest atomically (temp file + rename)."""
+    if not os.path.isdir(directory):
+        return
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".poc_manifest.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(directory, MANIFEST_FILENAME))
+    except OSError as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        print(f"Warning: Could not write POC manifest for {directory}: {e}")
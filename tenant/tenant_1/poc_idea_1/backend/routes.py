@@ -1,28 +1,30 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from database import get_db
-from auth import get_current_user
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from auth import get_current_user, get_read_only_user
 
 router = APIRouter()
 
 @router.get("/tasks")
 async def get_tasks(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_read_only_user)
 ):
     """
     Get all tasks for the current user
     """
     from .models import TaskModel
-    tasks = db.query(TaskModel).filter(
+    result = await db.execute(select(TaskModel).where(
         TaskModel.user_id == current_user.id
-    ).all()
+    ))
+    tasks = result.scalars().all()
     return {"tasks": tasks}
 
 @router.post("/tasks")
 async def create_task(
     task_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """
@@ -31,25 +33,25 @@ async def create_task(
     from .models import TaskModel
     new_task = TaskModel(user_id=current_user.id, **task_data)
     db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    await db.commit()
+    await db.refresh(new_task)
     return {"task": new_task}
 
 @router.put("/tasks/{task_id}")
 async def update_task(
     task_id: int,
     task_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """
     Update an existing task
     """
     from .models import TaskModel
-    task = db.query(TaskModel).filter(
+    task = await db.scalar(select(TaskModel).where(
         TaskModel.id == task_id,
         TaskModel.user_id == current_user.id
-    ).first()
+    ))
     
     if not task:
         return {"error": "Task not found"}
@@ -57,28 +59,28 @@ async def update_task(
     for key, value in task_data.items():
         setattr(task, key, value)
     
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task)
     return {"task": task}
 
 @router.delete("/tasks/{task_id}")
 async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """
     Delete a task
     """
     from .models import TaskModel
-    task = db.query(TaskModel).filter(
+    task = await db.scalar(select(TaskModel).where(
         TaskModel.id == task_id,
         TaskModel.user_id == current_user.id
-    ).first()
+    ))
     
     if not task:
         return {"error": "Task not found"}
     
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
     return {"message": "Task deleted successfully"}
@@ -0,0 +1,73 @@
+"""
+Verified-token cache tests with a frozen clock.
+
+Run with: python -m pytest -q test_auth_utils.py
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from jose import jwt
+
+import auth_utils
+from auth_utils import create_access_token, decode_access_token, get_token_cache_stats
+
+
+class _AnyDatetime(type):
+    def __instancecheck__(cls, obj):
+        return isinstance(obj, datetime)
+
+
+class FrozenClock(datetime, metaclass=_AnyDatetime):
+    """
+    Wall clock for python-jose and the token cache, moved by hand via `now_ts`.
+
+    Stands in for datetime inside jose; real datetimes still pass isinstance.
+    """
+
+    now_ts = 0.0
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.fromtimestamp(cls.now_ts, tz)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(FrozenClock, "now_ts", datetime.now(timezone.utc).timestamp())
+    monkeypatch.setattr(jwt, "datetime", FrozenClock)
+    monkeypatch.setattr(auth_utils, "time", SimpleNamespace(time=lambda: FrozenClock.now_ts))
+    monkeypatch.setattr(auth_utils, "_token_cache", OrderedDict())
+    monkeypatch.setattr(auth_utils, "_token_cache_stats", {"hits": 0, "misses": 0, "evictions": 0})
+    return FrozenClock
+
+
+def test_cached_token_is_rejected_once_expired(clock):
+    token = create_access_token({"sub": "1", "username": "alice"}, expires_delta=timedelta(seconds=60))
+
+    assert decode_access_token(token)["sub"] == "1"
+    clock.now_ts += 30
+    assert decode_access_token(token)["sub"] == "1"
+    assert get_token_cache_stats()["hits"] == 1
+
+    clock.now_ts += 60
+    assert decode_access_token(token) is None
+    assert get_token_cache_stats()["entries"] == 0
+
+
+def test_tokens_never_share_cache_entries(clock):
+    claims = {"sub": "1", "username": "alice", "is_admin": False}
+    alice = create_access_token(claims)
+    bob = create_access_token({"sub": "2", "username": "bob", "is_admin": False})
+    # Same claims as alice's cached token, signed with another key
+    forged = jwt.encode(jwt.get_unverified_claims(alice), "not-the-secret", algorithm=auth_utils.ALGORITHM)
+
+    for _ in range(2):
+        assert decode_access_token(alice)["username"] == "alice"
+        assert decode_access_token(bob)["username"] == "bob"
+        assert decode_access_token(forged) is None
+
+    stats = get_token_cache_stats()
+    assert (stats["hits"], stats["entries"]) == (2, 2)
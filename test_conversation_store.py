@@ -0,0 +1,172 @@
+"""
+Conversation store and session reload tests against a throwaway SQLite database.
+
+Run with: python -m pytest -q test_conversation_store.py
+"""
+
+import asyncio
+
+import pytest
+
+import conversation_store
+from conversation_store import ConversationStore
+from database import POCConversation
+
+
+def _state(turn, text):
+    return {"turn": turn, "stage": "greeting", "requirements": {},
+            "memory": {"messages": [{"type": "human", "content": text}]}}
+
+
+def test_turn_reads_buffer_then_database(session_factory):
+    store = ConversationStore(session_factory=session_factory)
+    assert store.turn(1, "conv") == 0
+
+    store.save(1, "conv", _state(1, "hello"))
+    assert store.turn(1, "conv") == 1
+    store.flush()
+    assert store.turn(1, "conv") == 1
+    assert store.load(1, "conv")["memory"]["messages"][0]["content"] == "hello"
+
+
+def test_flush_never_overwrites_a_newer_turn(session_factory):
+    worker_a = ConversationStore(session_factory=session_factory)
+    worker_b = ConversationStore(session_factory=session_factory)
+
+    worker_a.save(1, "conv", _state(2, "newer"))
+    worker_a.flush()
+    worker_b.save(1, "conv", _state(1, "older"))
+    worker_b.flush()
+
+    db = session_factory()
+    row = db.query(POCConversation).one()
+    assert (row.turn, row.langchain_memory["memory"]["messages"][0]["content"]) == (2, "newer")
+    db.close()
+
+
+def test_failing_state_does_not_hold_back_the_batch(session_factory, monkeypatch):
+    monkeypatch.setattr(conversation_store, "POC_CONVERSATION_MAX_FLUSH_FAILURES", 2)
+    store = ConversationStore(session_factory=session_factory)
+    bad_state = _state(1, "bad")
+    bad_state["requirements"] = {"deadline": object()}  # not JSON serializable
+
+    store.save(1, "good", _state(1, "hello"))
+    store.save(1, "bad", bad_state)
+    assert store.flush() == 1
+    assert store.load(1, "bad") is bad_state  # re-queued for the next flush
+
+    store.save(1, "good", _state(2, "again"))
+    assert store.flush() == 1
+    assert store.load(1, "bad") is None  # dropped after the second failure
+    assert store.turn(1, "good") == 2
+    assert store.flush() == 0
+
+
+def test_session_reloads_turn_saved_by_another_worker(session_factory, fake_agent):
+    poc_sessions = pytest.importorskip("agents.poc_sessions")
+    store = ConversationStore(session_factory=session_factory)
+    worker_a = poc_sessions.POCSessionManager(base_agent=fake_agent, store=store)
+    worker_b = poc_sessions.POCSessionManager(base_agent=fake_agent.new_session(), store=store)
+
+    async def chat(manager, prompt):
+        session = await manager.aget_session("1", "conv")
+        result = await session.aprocess_request(prompt)
+        store.flush()
+        return result["seen"]
+
+    async def scenario():
+        assert await chat(worker_a, "one") == ["one"]
+        assert await chat(worker_b, "two") == ["one", "two"]
+        # worker_a still holds turn 1 in memory
+        return await chat(worker_a, "three")
+
+    assert asyncio.run(scenario()) == ["one", "two", "three"]
+
+
+def test_persist_snapshots_live_state(session_factory, fake_agent):
+    poc_sessions = pytest.importorskip("agents.poc_sessions")
+    store = ConversationStore(session_factory=session_factory)
+    session = poc_sessions.AgentSession("1", "conv", fake_agent, store=store)
+
+    session.agent.requirements["features"] = ["login"]
+    session.persist()
+    session.agent.requirements["features"].append("export")
+
+    assert store.load(1, "conv")["requirements"] == {"features": ["login"]}
+
+
+def test_finished_contradiction_check_is_saved_and_restored(session_factory, monkeypatch):
+    poc_sessions = pytest.importorskip("agents.poc_sessions")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    base_agent = poc_sessions.POCAgent()
+    analysis = {"has_contradictions": True, "contradictions": ["web only vs. offline mobile"]}
+
+    async def detect(requirements):
+        await asyncio.sleep(0.01)
+        return analysis
+
+    store = ConversationStore(session_factory=session_factory)
+    session = poc_sessions.AgentSession("1", "conv", base_agent.new_session("conv"), store=store)
+    session.agent.adetect_contradictions = detect
+
+    async def turn():
+        session.agent.requirements = {"platform": "web only", "offline": "mobile app"}
+        session.agent.schedule_contradiction_check()
+        session.persist()  # the check is still running
+        await session.agent._contradiction_task
+
+    asyncio.run(turn())
+    store.flush()
+
+    saved_state = store.load(1, "conv")
+    assert base_agent.saved_contradiction_status(saved_state)["analysis"] == analysis
+
+    restored = base_agent.new_session("conv")
+    restored.load_conversation(saved_state)
+    assert restored.get_contradiction_status()["status"] == "ready"
+    assert not restored.schedule_contradiction_check()
+
+
+def test_conversation_id_of_another_user_is_rejected(session_factory, fake_agent, monkeypatch, capsys):
+    poc_api = pytest.importorskip("poc_api")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from auth import get_current_user
+    from user_cache import CurrentUser
+
+    store = ConversationStore(session_factory=session_factory)
+    store.save(1, "conv", _state(1, "mine"))
+    store.flush()
+    monkeypatch.setattr(poc_api, "get_conversation_store", lambda: store)
+    monkeypatch.setattr(poc_api, "_session_manager",
+                        poc_api.POCSessionManager(base_agent=fake_agent, store=store))
+
+    app = FastAPI()
+    app.include_router(poc_api.router)
+    current_user = CurrentUser(id=2, username="mallory")
+    app.dependency_overrides[get_current_user] = lambda: current_user
+    client = TestClient(app)
+
+    response = client.post("/api/poc/chat", json={"prompt": "hi", "conversation_id": "conv"})
+    assert response.status_code == 409
+    assert "owned by user 1" in capsys.readouterr().out
+
+    current_user = CurrentUser(id=1, username="alice")
+    response = client.post("/api/poc/chat", json={"prompt": "again", "conversation_id": "conv"})
+    assert response.status_code == 200, response.text
+    assert response.json()["response"] == "again"
+
+
+def test_flush_logs_a_conversation_id_collision(session_factory, capsys):
+    store = ConversationStore(session_factory=session_factory)
+    store.save(1, "conv", _state(1, "mine"))
+    store.flush()
+    assert store.owner("conv") == 1
+
+    store.save(2, "conv", _state(5, "theirs"))
+    assert store.owner("conv") == 1  # the saved row wins over another user's pending state
+    assert store.flush() == 0
+
+    assert "belongs to user 1" in capsys.readouterr().out
+    assert store.load(1, "conv")["memory"]["messages"][0]["content"] == "mine"
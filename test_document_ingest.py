@@ -0,0 +1,93 @@
+"""
+Document ingestion tests against a throwaway SQLite database and a fake agent.
+
+Run with: python -m pytest -q test_document_ingest.py
+"""
+
+import threading
+
+import pytest
+
+import document_ingest
+from database import Document
+
+
+@pytest.fixture
+def ingest_env(tmp_path, bind_session_local, fake_poc_api, fake_agent):
+    session_factory = bind_session_local(document_ingest)
+    fake_poc_api(fake_agent)
+
+    file_path = tmp_path / "spec.txt"
+    file_path.write_text("requirements")
+    db = session_factory()
+    document = Document(user_id=1, filename="spec.txt", file_path=str(file_path), file_type="txt", status="pending")
+    db.add(document)
+    db.commit()
+    document_id = document.id
+    db.close()
+    return session_factory, fake_agent, document_id
+
+
+def test_concurrent_ingestion_indexes_once(ingest_env):
+    session_factory, agent, document_id = ingest_env
+
+    threads = [threading.Thread(target=document_ingest.run_ingestion, args=(document_id,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert agent.indexed == [("1", 1)]
+    db = session_factory()
+    document = db.get(Document, document_id)
+    assert (document.status, document.content_text) == ("indexed", "requirements")
+    db.close()
+
+
+def _upload_app(max_bytes):
+    from fastapi import FastAPI, File, UploadFile
+
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(document_ingest.UploadSizeLimitMiddleware, limits={"/upload": max_bytes})
+    return app
+
+
+def test_upload_limit_rejects_declared_content_length():
+    from fastapi.testclient import TestClient
+
+    client = TestClient(_upload_app(1024))
+    assert client.post("/upload", files={"file": ("a.txt", b"x" * 100)}).json() == {"size": 100}
+    response = client.post("/upload", files={"file": ("a.txt", b"x" * 4096)})
+    assert response.status_code == 413
+
+
+def test_upload_limit_stops_reading_a_streamed_body():
+    import asyncio
+
+    app = _upload_app(1024)
+    chunks = [b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.txt\"\r\n\r\n"]
+    chunks += [b"x" * 512] * 100
+    consumed = []
+    sent = []
+
+    async def receive():
+        consumed.append(1)
+        return {"type": "http.request", "body": chunks[len(consumed) - 1], "more_body": len(consumed) < len(chunks)}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/upload", "raw_path": b"/upload", "query_string": b"",
+        "headers": [(b"content-type", b"multipart/form-data; boundary=b")],  # no Content-Length (chunked)
+        "http_version": "1.1", "scheme": "http", "server": ("test", 80), "client": ("test", 1), "root_path": ""
+    }
+    asyncio.run(app(scope, receive, send))
+
+    assert sent[0]["status"] == 413
+    assert len(consumed) < 10
@@ -0,0 +1,160 @@
+"""
+Embedding batcher tests against a local fake OpenAI-compatible embeddings server.
+
+Run with: python -m pytest -q test_embedding_batcher.py
+"""
+
+import base64
+import json
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+import pytest
+
+from agents import embedding_batcher
+from agents.embedding_batcher import batch_texts, embed_texts
+
+
+class FakeEmbeddingsServer:
+    """
+    /v1/embeddings returning [n] for the input "chunk-<n>".
+
+    The first `rate_limited` requests get a 429 with Retry-After; inputs
+    containing "bad" get a 400.
+    """
+
+    def __init__(self, rate_limited=0, retry_after="0", delay=0.0):
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+        self.delay = delay
+        self.requests = []  # (time, number of inputs, status)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _respond(self, body):
+        inputs = body["input"]
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            if len([r for r in self.requests if r[2] == 429]) < self.rate_limited:
+                status = 429
+            elif any("bad" in text for text in inputs):
+                status = 400
+            else:
+                status = 200
+            self.requests.append((time.monotonic(), len(inputs), status))
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+
+        if status != 200:
+            return status, {"error": {"message": "rate limited" if status == 429 else "bad input"}}
+        data = []
+        for index, text in enumerate(inputs):
+            vector = [float(text.split("-")[1])]
+            if body.get("encoding_format") == "base64":
+                vector = base64.b64encode(struct.pack(f"{len(vector)}f", *vector)).decode()
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+        return 200, {"object": "list", "data": data, "model": body["model"],
+                     "usage": {"prompt_tokens": 0, "total_tokens": 0}}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                status, payload = server._respond(body)
+                raw = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                if status == 429:
+                    self.send_header("Retry-After", server.retry_after)
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def _client(server):
+    # Same settings as POCAgent.batch_embeddings with EMBEDDINGS_BASE_URL set
+    langchain_openai = pytest.importorskip("langchain_openai")
+    return langchain_openai.OpenAIEmbeddings(
+        api_key="sk-test", base_url=server.base_url, check_embedding_ctx_length=False, max_retries=0
+    )
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(embedding_batcher, "EMBEDDING_BACKOFF_BASE_SECONDS", 0.01)
+
+
+def test_batches_respect_token_and_input_limits(monkeypatch):
+    monkeypatch.setattr(embedding_batcher, "_encoding", False)  # len // 4 + 1 tokens
+    texts = ["x" * 36] * 5 + ["y" * 400] + ["z"]  # 10 tokens each, one 101-token text
+
+    assert [(start, len(batch)) for start, batch in batch_texts(texts, max_tokens=30, max_inputs=2)] == [
+        (0, 2), (2, 2), (4, 1), (5, 1), (6, 1)
+    ]
+
+
+def test_vectors_keep_input_order_across_concurrent_batches():
+    texts = [f"chunk-{n}" for n in range(1500)]
+    progress = []
+
+    with FakeEmbeddingsServer(delay=0.05) as server:
+        vectors = embed_texts(_client(server), texts, lambda done, total: progress.append((done, total)))
+
+    assert vectors == [[float(n)] for n in range(1500)]
+    assert sorted(size for _, size, _ in server.requests) == [476, 512, 512]
+    assert 1 < server.max_in_flight <= embedding_batcher.EMBEDDING_MAX_CONCURRENCY
+    assert progress[-1] == (1500, 1500)
+
+
+def test_rate_limited_batch_waits_for_retry_after():
+    with FakeEmbeddingsServer(rate_limited=2, retry_after="0.3") as server:
+        vectors = embed_texts(_client(server), ["chunk-1", "chunk-2"])
+
+    assert vectors == [[1.0], [2.0]]
+    times = [at for at, _, _ in server.requests]
+    assert [status for _, _, status in server.requests] == [429, 429, 200]
+    assert all(later - earlier >= 0.3 for earlier, later in zip(times, times[1:]))
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(embedding_batcher, "EMBEDDING_MAX_RETRIES", 2)
+
+    with FakeEmbeddingsServer(rate_limited=10) as server:
+        with pytest.raises(openai.RateLimitError):
+            embed_texts(_client(server), ["chunk-1"])
+
+    assert len(server.requests) == 3
+
+
+def test_client_errors_are_not_retried():
+    with FakeEmbeddingsServer() as server:
+        with pytest.raises(openai.BadRequestError):
+            embed_texts(_client(server), ["chunk-1", "bad-2"])
+
+    assert len(server.requests) == 1
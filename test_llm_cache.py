@@ -0,0 +1,75 @@
+"""
+LLM response cache tests against a throwaway SQLite file.
+
+Run with: python -m pytest -q test_llm_cache.py
+"""
+
+import asyncio
+import sqlite3
+import threading
+
+from agents.llm_cache import LLMCache
+
+
+def _cache(tmp_path, **kwargs):
+    return LLMCache(path=str(tmp_path / "cache.db"), **kwargs)
+
+
+def test_disk_hits_survive_a_new_process(tmp_path):
+    _cache(tmp_path).set("k", "response")
+
+    cache = _cache(tmp_path)
+    assert cache.get("k") == "response"
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["misses"], stats["disk_entries"]) == (1, 1, 1)
+
+
+def test_disk_hits_do_not_write_until_batch_is_full(tmp_path):
+    cache = _cache(tmp_path, memory_entries=0, access_batch=3)
+    for key in ["a", "b", "c"]:
+        cache.set(key, key)
+
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    cache.get("a")
+    cache.get("b")
+    assert not [sql for sql in statements if sql.startswith("UPDATE")]
+
+    cache.get("c")
+    assert len([sql for sql in statements if sql.startswith("UPDATE")]) == 3
+
+
+def test_eviction_uses_running_totals_and_keeps_recent_entries(tmp_path):
+    cache = _cache(tmp_path, memory_entries=0, max_entries=3)
+    for key in ["a", "b", "c"]:
+        cache.set(key, key)
+    cache.get("a")  # a is now more recent than b
+
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    cache.set("c", "cc")  # replacing an entry stays within the limit
+    assert not [sql for sql in statements if "COUNT(*)" in sql]
+
+    cache.set("d", "d")
+    conn = sqlite3.connect(tmp_path / "cache.db")
+    keys = {row[0] for row in conn.execute("SELECT key FROM llm_cache")}
+    conn.close()
+    assert keys == {"a", "c", "d"}
+    assert (cache.stats()["disk_entries"], cache.stats()["disk_bytes"]) == (3, 4)
+
+
+def test_async_lookup_reads_disk_off_the_event_loop(tmp_path):
+    cache = _cache(tmp_path, memory_entries=0)
+    cache.set("k", "response")
+
+    threads = []
+    original = cache._get_disk
+    cache._get_disk = lambda key: threads.append(threading.current_thread()) or original(key)
+
+    async def lookup():
+        return await cache.aget("k"), threading.current_thread()
+
+    value, loop_thread = asyncio.run(lookup())
+    assert value == "response"
+    assert threads and threads[0] is not loop_thread
@@ -0,0 +1,155 @@
+"""
+Migration tests against throwaway SQLite databases.
+
+Run with: python -m pytest -q test_migrations.py
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from database import create_db_engine
+from migrations import LATEST_VERSION, get_schema_version, run_migrations
+
+# Schema of databases created by create_all() before versioned migrations
+LEGACY_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL, username VARCHAR(50) NOT NULL, email VARCHAR(100),
+    password_hash VARCHAR(255) NOT NULL, is_admin BOOLEAN NOT NULL,
+    created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, PRIMARY KEY (id)
+);
+CREATE INDEX ix_users_id ON users (id);
+CREATE UNIQUE INDEX ix_users_username ON users (username);
+CREATE TABLE documents (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, filename VARCHAR(255) NOT NULL,
+    file_path VARCHAR(500) NOT NULL, content_text TEXT, file_type VARCHAR(50) NOT NULL,
+    created_at DATETIME NOT NULL, PRIMARY KEY (id)
+);
+CREATE INDEX ix_documents_user_id ON documents (user_id);
+CREATE INDEX ix_documents_id ON documents (id);
+CREATE TABLE pocs (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, poc_id VARCHAR(100) NOT NULL,
+    poc_name VARCHAR(200) NOT NULL, description TEXT, requirements JSON,
+    directory VARCHAR(500) NOT NULL, created_at DATETIME NOT NULL, PRIMARY KEY (id)
+);
+CREATE INDEX ix_pocs_id ON pocs (id);
+CREATE INDEX ix_pocs_user_id ON pocs (user_id);
+CREATE UNIQUE INDEX ix_pocs_poc_id ON pocs (poc_id);
+CREATE TABLE poc_conversations (
+    id INTEGER NOT NULL, poc_id INTEGER, user_id INTEGER NOT NULL,
+    conversation_history JSON NOT NULL, created_at DATETIME NOT NULL, PRIMARY KEY (id)
+);
+CREATE INDEX ix_poc_conversations_user_id ON poc_conversations (user_id);
+CREATE INDEX ix_poc_conversations_id ON poc_conversations (id);
+CREATE INDEX ix_poc_conversations_poc_id ON poc_conversations (poc_id);
+CREATE TABLE poc_phases (
+    id INTEGER NOT NULL, poc_id INTEGER NOT NULL, phase_number INTEGER NOT NULL,
+    phase_name VARCHAR(100) NOT NULL, instructions_file VARCHAR(500) NOT NULL,
+    status VARCHAR(50) NOT NULL, created_at DATETIME NOT NULL, PRIMARY KEY (id)
+);
+CREATE INDEX ix_poc_phases_poc_id ON poc_phases (poc_id);
+CREATE INDEX ix_poc_phases_id ON poc_phases (id);
+CREATE TABLE tenant_1_poc1_tasks (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, title VARCHAR(200) NOT NULL,
+    description TEXT, status VARCHAR(20) NOT NULL, created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL, PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE INDEX ix_tenant_1_poc1_tasks_user_id ON tenant_1_poc1_tasks (user_id);
+CREATE INDEX ix_tenant_1_poc1_tasks_id ON tenant_1_poc1_tasks (id);
+"""
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """Pre-migration database with a few rows (built fresh; never the repo's boot_lang.db)."""
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executescript("""
+        INSERT INTO documents (user_id, filename, file_path, file_type, created_at)
+            VALUES (1, 'spec.txt', 'uploads/1/spec.txt', 'txt', '2025-01-01 00:00:00');
+        INSERT INTO poc_conversations (user_id, conversation_history, created_at)
+            VALUES (1, '[]', '2025-01-01 00:00:00');
+        INSERT INTO tenant_1_poc1_tasks (user_id, title, status, created_at, updated_at)
+            VALUES (1, 'First task', 'todo', '2025-01-01 00:00:00', '2025-01-01 00:00:00');
+    """)
+    conn.commit()
+    conn.close()
+    _add_user(path, "amy", "")
+    _add_user(path, "testuser", "test@example.com")
+    return path
+
+
+def _add_user(path, username, email):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO users (username, email, password_hash, is_admin, created_at, updated_at)"
+        " VALUES (?, ?, 'x', 0, '2025-01-01 00:00:00', '2025-01-01 00:00:00')",
+        (username, email)
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_legacy_database_migrates_to_latest(legacy_db):
+    engine = create_db_engine(f"sqlite:///{legacy_db}")
+    assert get_schema_version(engine) is None
+
+    applied = run_migrations(engine)
+
+    assert applied == list(range(1, LATEST_VERSION + 1))
+    assert get_schema_version(engine) == LATEST_VERSION
+    assert run_migrations(engine) == []
+
+    conn = sqlite3.connect(legacy_db)
+    assert conn.execute("SELECT status FROM documents").fetchall() == [("indexed",)]
+    assert conn.execute("SELECT conversation_history, turn FROM poc_conversations").fetchall() == [("[]", 0)]
+    conn.close()
+
+
+def test_duplicate_emails_stop_at_unique_email_migration(legacy_db):
+    _add_user(legacy_db, "alice", "same@example.com")
+    _add_user(legacy_db, "bob", "same@example.com")
+    engine = create_db_engine(f"sqlite:///{legacy_db}")
+
+    with pytest.raises(RuntimeError, match="duplicates found: same@example.com"):
+        run_migrations(engine)
+
+    # Everything before the unique email migration was applied
+    assert get_schema_version(engine) == 3
+
+
+def test_fresh_database_matches_models(tmp_path):
+    from database import Base
+    from tenant.tenant_1.poc_idea_1.backend.models import TaskModel  # noqa: F401
+    from sqlalchemy import inspect
+
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    run_migrations(engine)
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        columns = {col["name"] for col in inspector.get_columns(table.name)}
+        assert columns == {col.name for col in table.columns}, table.name
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        assert {index.name for index in table.indexes} <= indexes, table.name
+
+
+def test_concurrent_workers_apply_each_migration_once(tmp_path):
+    import subprocess
+    import sys
+
+    url = f"sqlite:///{tmp_path / 'shared.db'}"
+    script = (
+        "from database import create_db_engine; from migrations import run_migrations; "
+        f"run_migrations(create_db_engine({url!r}))"
+    )
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    workers = [subprocess.Popen([sys.executable, "-c", script], cwd=cwd) for _ in range(4)]
+    assert [worker.wait(timeout=120) for worker in workers] == [0, 0, 0, 0]
+
+    conn = sqlite3.connect(tmp_path / "shared.db")
+    versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+    conn.close()
+    assert versions == list(range(1, LATEST_VERSION + 1))
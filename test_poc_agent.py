@@ -0,0 +1,176 @@
+"""
+POCAgent tests that need no LLM calls.
+
+Run with: python -m pytest -q test_poc_agent.py
+"""
+
+import asyncio
+import threading
+from concurrent.futures import FIRST_COMPLETED, TimeoutError as FuturesTimeoutError, wait
+
+import pytest
+
+pytest.importorskip("langchain")
+
+from langchain_core.language_models.fake import FakeListLLM  # noqa: E402
+from langchain_core.language_models.fake_chat_models import FakeListChatModel  # noqa: E402
+
+from agents import embedding_batcher  # noqa: E402
+from agents.poc_memory import TokenBudgetMemory  # noqa: E402
+
+
+class RecordingChatModel(FakeListChatModel):
+    """Fake chat model that also records the prompts it was sent."""
+
+    prompts: list = []
+    model_name: str = "fake-chat"
+    temperature: float = 0.0
+
+    def _call(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append(messages[-1].content)
+        return super()._call(messages, stop, run_manager, **kwargs)
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    from agents.poc_agent import POCAgent
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    # As when the tiktoken encoding cannot be downloaded
+    monkeypatch.setattr(embedding_batcher, "_encoding", False)
+    return POCAgent()
+
+
+def _fake_llm(agent, *responses):
+    agent.llm = RecordingChatModel(responses=list(responses), prompts=[])
+    return agent.llm
+
+
+def _chat(agent, *turns):
+    for turn in turns:
+        agent.memory.save_context({"input": turn}, {"response": f"Noted: {turn}"})
+
+
+def test_task_finished_at_the_deadline_is_kept(agent, monkeypatch):
+    from agents import poc_agent
+
+    release = threading.Event()
+
+    def late_deadline(futures, timeout=None):
+        # The fast call finishes after as_completed gave up but before the handler runs
+        wait(futures, return_when=FIRST_COMPLETED)
+        raise FuturesTimeoutError()
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(poc_agent, "as_completed", late_deadline)
+    written = {}
+    tasks = {
+        "fast.md": (lambda: "fast content", ()),
+        "slow.md": (lambda: release.wait(5) and "slow content", ())
+    }
+    try:
+        failed, timings = agent._run_generation_tasks(tasks, 0.1, written.__setitem__)
+    finally:
+        release.set()
+
+    assert written == {"fast.md": "fast content"}
+    assert set(timings) == {"fast.md"}
+    assert failed == [{"file": "slow.md", "error": "Timed out after 0.1s"}]
+
+
+def test_slow_task_times_out_without_losing_fast_results(agent):
+    release = threading.Event()
+    written = {}
+    tasks = {
+        "fast.md": (lambda: "fast content", ()),
+        "slow.md": (lambda: release.wait(5) and "slow content", ())
+    }
+    try:
+        failed, _ = agent._run_generation_tasks(tasks, 0.2, written.__setitem__)
+    finally:
+        release.set()
+
+    assert written == {"fast.md": "fast content"}
+    assert failed == [{"file": "slow.md", "error": "Timed out after 0.2s"}]
+
+
+def test_error_result_has_the_turn_result_shape(agent):
+    error = agent._error_result(RuntimeError("boom"))
+
+    assert error["agent_state"].keys() == agent._turn_result("ok")["agent_state"].keys()
+    assert error["agent_state"]["contradictions"] == agent.get_contradiction_status()
+
+
+def test_stream_ends_with_done_when_retrieval_fails(agent):
+    async def broken_retrieval(prompt, user_id):
+        raise RuntimeError("vector store unavailable")
+
+    session = agent.new_session("conv")
+    session.aretrieve_context = broken_retrieval
+
+    async def events():
+        return [event async for event in session.astream_request("Hi", user_id="1")]
+
+    streamed = asyncio.run(events())
+
+    assert [event["event"] for event in streamed] == ["start", "done"]
+    assert streamed[-1]["data"]["next_action"] == "retry"
+    assert "vector store unavailable" in streamed[-1]["data"]["response"]
+
+
+def test_watermark_advances_only_after_a_successful_patch(agent):
+    llm = _fake_llm(agent, "not json", '{"goal": "Track tasks"}')
+    _chat(agent, "I want to track tasks")
+
+    assert agent.extract_requirements_patch(use_cache=False) == {}
+    assert agent.extraction_watermark == 0
+
+    assert agent.extract_requirements_patch(use_cache=False) == {"goal": "Track tasks"}
+    assert agent.extraction_watermark == 2
+    # Nothing new since the last extraction: no LLM call
+    assert agent.extract_requirements_patch(use_cache=False) == {}
+    assert len(llm.prompts) == 2
+    assert "I want to track tasks" in llm.prompts[1]
+
+
+def test_pruned_messages_are_sent_as_the_summary(agent):
+    llm = _fake_llm(agent, '{"goal": "Track tasks"}', '{"users": "Sales teams"}')
+    agent.memory = TokenBudgetMemory(
+        llm=FakeListLLM(responses=["they want a task tracker"] * 5), return_messages=True, max_turns=1
+    )
+    _chat(agent, "question 0", "question 1", "question 2")
+    assert agent.memory.pruned_message_count == 4
+
+    agent.extract_requirements_patch(use_cache=False)
+    assert "Summary of earlier conversation: they want a task tracker" in llm.prompts[0]
+    assert "question 2" in llm.prompts[0]
+    assert "question 1" not in llm.prompts[0]
+
+    # Only already-extracted messages were pruned since: no summary this time
+    _chat(agent, "question 3")
+    agent.extract_requirements_patch(use_cache=False)
+    assert "Summary of earlier conversation" not in llm.prompts[1]
+    assert "question 3" in llm.prompts[1]
+
+
+def test_patch_merges_without_clobbering_untouched_keys(agent):
+    llm = _fake_llm(agent, '{"users": "Small sales teams", "goal": null}')
+    agent.requirements = {
+        "goal": "Track tasks",
+        "users": "Sales teams",
+        "frontend": {"pages": ["board"]},
+        "_contradictions": {"has_contradictions": False}
+    }
+    _chat(agent, "Users are small sales teams")
+
+    agent.update_requirements_from_conversation(use_cache=False)
+
+    assert agent.requirements == {
+        "goal": "Track tasks",
+        "users": "Small sales teams",
+        "frontend": {"pages": ["board"]},
+        "_contradictions": {"has_contradictions": False}
+    }
+    # The current requirements are sent, without internal keys
+    assert '"goal": "Track tasks"' in llm.prompts[0]
+    assert "_contradictions" not in llm.prompts[0]
@@ -0,0 +1,67 @@
+"""
+POC job tests against a throwaway SQLite database, with the LLM calls stubbed.
+
+Run with: python -m pytest -q test_poc_jobs.py
+"""
+
+import os
+
+import pytest
+
+import poc_jobs
+from database import POC, POCJob, POCPhase
+
+pytest.importorskip("langchain")
+
+
+@pytest.fixture
+def jobs_env(tmp_path, monkeypatch, bind_session_local, fake_poc_api):
+    from agents.poc_agent import POCAgent
+
+    session_factory = bind_session_local(poc_jobs)
+    monkeypatch.chdir(tmp_path)  # POCs are written under ./pocs
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    agent = POCAgent()
+    names = iter(["task-tracker", "renamed-tracker"])
+    agent.generate_friendly_name = lambda description, use_cache=True: next(names)
+    agent._generate_poc_description = lambda requirements, name, use_cache=True: requirements["goal"]
+    agent._generate_phase_document = lambda phase, requirements, name, use_cache=True: phase
+    fake_poc_api(agent)
+    return session_factory
+
+
+def _run(session_factory, job_type, requirements, poc=None):
+    job_id = f"{job_type}-job"
+    db = session_factory()
+    db.add(POCJob(job_id=job_id, user_id=1, job_type=job_type, status="queued",
+                  requirements=requirements, poc_id=poc.id if poc else None))
+    db.commit()
+    db.close()
+    poc_jobs.run_job(job_id)
+
+
+def test_update_regenerates_into_the_existing_poc(jobs_env):
+    session_factory = jobs_env
+    _run(session_factory, "generate", {"goal": "Track tasks"})
+
+    db = session_factory()
+    poc = db.query(POC).one()
+    assert (poc.poc_id, poc.directory) == ("task-tracker", os.path.join("pocs", "1", "task-tracker"))
+    db.close()
+
+    _run(session_factory, "update", {"goal": "Track tasks and deadlines"}, poc=poc)
+
+    db = session_factory()
+    job = db.query(POCJob).filter(POCJob.job_id == "update-job").one()
+    assert job.status == "done", job.error
+    assert job.result["directory"] == poc.directory
+    poc = db.query(POC).one()
+    assert poc.poc_id == "task-tracker"
+    assert poc.requirements == {"goal": "Track tasks and deadlines"}
+    assert os.listdir("pocs/1") == ["task-tracker"]
+    with open(os.path.join(poc.directory, "poc_desc.md")) as f:
+        assert f.read() == "Track tasks and deadlines"
+    phase_files = {phase.instructions_file for phase in db.query(POCPhase).all()}
+    assert all(path.startswith(poc.directory) for path in phase_files)
+    db.close()
@@ -0,0 +1,98 @@
+"""
+POC manifest and archive cache tests.
+
+Run with: python -m pytest -q test_poc_manifest.py
+"""
+
+import io
+import os
+import zipfile
+
+import pytest
+
+import poc_archive
+import poc_manifest
+from poc_archive import archive_key, build_cached_archive, stream_zip
+from poc_manifest import MANIFEST_FILENAME, get_manifest, write_manifest
+
+
+@pytest.fixture
+def poc_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(poc_archive, "POC_ZIP_CACHE_DIR", str(tmp_path / "archives"))
+    poc_manifest._manifests.clear()
+    directory = tmp_path / "my_poc"
+    (directory / "docs").mkdir(parents=True)
+    (directory / "a.md").write_text("hello\n")
+    (directory / "docs" / "b.md").write_text("world\n")
+    return str(directory)
+
+
+def _bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_manifest_lists_files_and_excludes_itself(poc_dir):
+    manifest = write_manifest(poc_dir)
+
+    assert [entry["path"] for entry in manifest["files"]] == ["a.md", os.path.join("docs", "b.md")]
+    assert os.path.exists(os.path.join(poc_dir, MANIFEST_FILENAME))
+    names = zipfile.ZipFile(io.BytesIO(b"".join(stream_zip(poc_dir)))).namelist()
+    assert MANIFEST_FILENAME not in " ".join(names)
+
+
+def test_unchanged_files_are_not_rehashed(poc_dir, monkeypatch):
+    write_manifest(poc_dir)
+    poc_manifest._manifests.clear()  # as in a fresh process
+
+    hashed = []
+    original = poc_manifest._hash_file
+    monkeypatch.setattr(poc_manifest, "_hash_file", lambda path: hashed.append(path) or original(path))
+
+    get_manifest(poc_dir)
+    open(os.path.join(poc_dir, "docs", "c.md"), "w").close()
+    manifest = get_manifest(poc_dir)
+
+    assert len(manifest["files"]) == 3
+    assert hashed == [os.path.join(poc_dir, "docs", "c.md")]
+
+
+def test_in_place_edit_changes_hash_and_archive(poc_dir):
+    arc_root = "my_poc"
+    before = get_manifest(poc_dir)["hash"]
+    old_archive = build_cached_archive(poc_dir, archive_key(before, arc_root), arc_root)
+
+    path = os.path.join(poc_dir, "a.md")
+    with open(path, "w") as f:  # same size, directory mtime unchanged
+        f.write("HELLO\n")
+    _bump_mtime(path)
+
+    after = get_manifest(poc_dir)["hash"]
+    assert after != before
+
+    new_archive = build_cached_archive(poc_dir, archive_key(after, arc_root), arc_root)
+    assert new_archive != old_archive
+    with zipfile.ZipFile(new_archive) as archive:
+        assert archive.read("my_poc/a.md") == b"HELLO\n"
+
+
+def test_rewrite_with_same_content_keeps_archive_bytes(poc_dir):
+    before = b"".join(stream_zip(poc_dir))
+
+    path = os.path.join(poc_dir, "a.md")
+    with open(path, "w") as f:  # regenerated from the LLM cache: same text, new mtime
+        f.write("hello\n")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))  # ZIP timestamps have 2 s resolution
+
+    assert b"".join(stream_zip(poc_dir)) == before
+
+
+def test_compression_level_is_applied(poc_dir):
+    with open(os.path.join(poc_dir, "a.md"), "w") as f:
+        f.write("repeat " * 1000)
+
+    stored = zipfile.ZipFile(io.BytesIO(b"".join(stream_zip(poc_dir, compression_level=0))))
+    deflated = zipfile.ZipFile(io.BytesIO(b"".join(stream_zip(poc_dir, compression_level=9))))
+    assert stored.getinfo("my_poc/a.md").compress_type == zipfile.ZIP_STORED
+    assert deflated.getinfo("my_poc/a.md").compress_size < stored.getinfo("my_poc/a.md").compress_size
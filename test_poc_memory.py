@@ -0,0 +1,43 @@
+"""
+Token-budgeted POC memory tests with a fake summarizing LLM.
+
+Run with: python -m pytest -q test_poc_memory.py
+"""
+
+import pytest
+
+pytest.importorskip("langchain")
+
+from langchain_core.language_models.fake import FakeListLLM  # noqa: E402
+
+from agents import embedding_batcher  # noqa: E402
+from agents.poc_memory import TokenBudgetMemory, count_message_tokens  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def offline_tokens(monkeypatch):
+    # As when the tiktoken encoding cannot be downloaded
+    monkeypatch.setattr(embedding_batcher, "_encoding", False)
+
+
+def _memory(**kwargs):
+    return TokenBudgetMemory(llm=FakeListLLM(responses=["summary"] * 20), return_messages=True, **kwargs)
+
+
+def test_counts_tokens_without_tiktoken_encoding():
+    memory = _memory()
+    memory.chat_memory.add_user_message("x" * 400)
+    assert count_message_tokens(memory.chat_memory.messages) == 101 + 4
+
+
+def test_system_message_is_pinned_through_pruning():
+    memory = _memory(max_turns=2, system_message="You are a TPM.")
+    for turn in range(5):
+        memory.save_context({"input": f"question {turn}"}, {"response": f"answer {turn}"})
+
+    history = memory.load_memory_variables({})["history"]
+    assert memory.pruned_message_count == 6
+    assert [message.type for message in history] == ["system", "system", "human", "ai", "human", "ai"]
+    assert history[0].content == "You are a TPM."
+    assert history[1].content == "summary"
+    assert all("TPM" not in message.content for message in memory.chat_memory.messages)
@@ -0,0 +1,58 @@
+"""
+Session manager eviction tests with a stand-in agent.
+
+Run with: python -m pytest -q test_poc_sessions.py
+"""
+
+import asyncio
+
+import pytest
+
+poc_sessions = pytest.importorskip("agents.poc_sessions")
+
+
+@pytest.fixture
+def make_manager(fake_agent):
+    def create(**kwargs):
+        return poc_sessions.POCSessionManager(base_agent=fake_agent, **kwargs)
+
+    return create
+
+
+def test_session_handed_out_is_not_evicted_before_its_turn_starts(make_manager):
+    manager = make_manager(max_sessions=1)
+
+    first = manager.get_session("1", "a")
+    # Another request fills the LRU before the first one acquires its lock
+    manager.get_session("1", "b")
+    assert manager.get_existing("1", "a") is first
+
+    assert asyncio.run(first.aprocess_request("hi"))["seen"] == ["hi"]
+    assert first.in_use == 0
+
+
+def test_released_sessions_are_trimmed(make_manager):
+    manager = make_manager(max_sessions=1)
+
+    asyncio.run(manager.get_session("1", "a").aprocess_request("hi"))
+    session_b = manager.get_session("1", "b")
+
+    assert manager.get_existing("1", "a") is None
+    assert manager.get_existing("1", "b") is session_b
+    assert session_b.in_use == 1
+
+
+def test_idle_eviction_keeps_running_turns_and_drops_stale_pins(make_manager):
+    manager = make_manager()
+    running = manager.get_session("1", "a")
+    abandoned = manager.get_session("1", "b")  # pinned, but its turn never starts
+    manager.idle_seconds = 0
+
+    async def scenario():
+        async with running.lock:
+            return manager.evict_idle()
+
+    assert asyncio.run(scenario()) == 1
+    assert manager.get_existing("1", "a") is running
+    assert manager.get_existing("1", "b") is None
+    assert abandoned.in_use == 1
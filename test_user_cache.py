@@ -0,0 +1,132 @@
+"""
+User cache tests through the auth, profile and admin endpoints, against a
+throwaway SQLite database.
+
+Run with: python -m pytest -q test_user_cache.py
+"""
+
+import sqlite3
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import auth
+import auth_utils
+import user_cache
+from admin import router as admin_router
+from auth import router as auth_router
+from auth_utils import create_access_token, hash_password
+from database import create_async_db_engine, create_db_engine, get_async_db
+from migrations import run_migrations
+from user_cache import UserCache
+from user_management import router as user_router
+
+
+class Clock:
+    """Monotonic clock the test moves by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    path = tmp_path / "users.db"
+    run_migrations(create_db_engine(f"sqlite:///{path}"))
+    with sqlite3.connect(path) as conn:
+        for username, is_admin in [("admin", 1), ("alice", 0)]:
+            conn.execute(
+                "INSERT INTO users (username, email, password_hash, is_admin, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, datetime('now'), datetime('now'))",
+                (username, f"{username}@example.com", hash_password("pass-1234", rounds=4), is_admin)
+            )
+
+    engine = create_async_db_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_test_db():
+        async with session_factory() as db:
+            yield db
+
+    clock = Clock()
+    monkeypatch.setattr(user_cache.time, "monotonic", clock)
+    monkeypatch.setattr(user_cache, "_user_cache", UserCache(ttl_seconds=30))
+    monkeypatch.setattr(auth, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(auth_utils, "BCRYPT_ROUNDS", 4)
+
+    app = FastAPI()
+    for router in (auth_router, user_router, admin_router):
+        app.include_router(router)
+    app.dependency_overrides[get_async_db] = get_test_db
+
+    with TestClient(app) as client:
+        yield client, path, clock
+
+
+def _headers(user_id, username, is_admin=False):
+    token = create_access_token({"sub": str(user_id), "username": username, "is_admin": is_admin})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _rename_behind_the_cache(path, user_id, username):
+    # As another worker would: the change does not touch this process's cache
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE users SET username = ? WHERE id = ?", (username, user_id))
+
+
+ALICE = _headers(2, "alice")
+ADMIN = _headers(1, "admin", is_admin=True)
+
+
+def test_entry_expires_after_the_ttl(api):
+    client, path, clock = api
+    assert client.get("/api/auth/me", headers=ALICE).json()["username"] == "alice"
+
+    _rename_behind_the_cache(path, 2, "alice-renamed")
+    clock.now += 29
+    assert client.get("/api/auth/me", headers=ALICE).json()["username"] == "alice"
+
+    clock.now += 2
+    assert client.get("/api/auth/me", headers=ALICE).json()["username"] == "alice-renamed"
+
+
+def test_deleted_user_is_rejected_on_the_next_request(api):
+    client, _, _ = api
+    assert client.get("/api/auth/me", headers=ALICE).status_code == 200
+
+    assert client.delete("/api/admin/users/2", headers=ADMIN).status_code == 200
+
+    response = client.get("/api/auth/me", headers=ALICE)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "User not found"
+
+
+def test_profile_update_is_seen_on_the_next_request(api):
+    client, _, _ = api
+    assert client.get("/api/auth/me", headers=ALICE).json()["email"] == "alice@example.com"
+
+    response = client.put("/api/user/profile", headers=ALICE, json={"email": "alice@new.example.com"})
+    assert response.status_code == 200
+
+    assert client.get("/api/auth/me", headers=ALICE).json()["email"] == "alice@new.example.com"
+
+
+def test_password_change_reloads_the_user_on_the_next_request(api):
+    client, path, _ = api
+    assert client.get("/api/auth/me", headers=ALICE).json()["username"] == "alice"
+    _rename_behind_the_cache(path, 2, "alice-renamed")
+
+    response = client.put(
+        "/api/user/password", headers=ALICE,
+        json={"current_password": "pass-1234", "new_password": "pass-5678"}
+    )
+    assert response.status_code == 200
+
+    # Served from the row again, not the snapshot cached before the change
+    assert client.get("/api/auth/me", headers=ALICE).json()["username"] == "alice-renamed"
+    assert user_cache.get_user_cache().stats()["invalidations"] == 1
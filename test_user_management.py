@@ -0,0 +1,87 @@
+"""
+Password change tests against a throwaway SQLite database.
+
+Run with: python -m pytest -q test_user_management.py
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import user_management
+from auth_utils import hash_password, verify_password
+from database import User, create_async_db_engine, create_db_engine
+from migrations import run_migrations
+from user_cache import CurrentUser
+from user_management import ChangePasswordRequest, change_password
+
+
+@pytest.fixture
+def user_db(tmp_path, monkeypatch):
+    path = tmp_path / "users.db"
+    run_migrations(create_db_engine(f"sqlite:///{path}"))
+    engine = create_async_db_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def add_user():
+        async with session_factory() as db:
+            user = User(username="alice", email="alice@example.com", password_hash=hash_password("old-pass-1", rounds=4))
+            db.add(user)
+            await db.commit()
+            return CurrentUser(id=user.id, username="alice")
+
+    current_user = asyncio.run(add_user())
+
+    verified = []
+    original = user_management.verify_password_async
+
+    async def counting_verify(plain, hashed):
+        verified.append(plain)
+        return await original(plain, hashed)
+
+    monkeypatch.setattr(user_management, "verify_password_async", counting_verify)
+    return session_factory, current_user, verified
+
+
+def _change(session_factory, current_user, current_password, new_password):
+    async def run():
+        async with session_factory() as db:
+            request = ChangePasswordRequest(current_password=current_password, new_password=new_password)
+            return await change_password(request, current_user, db)
+
+    return asyncio.run(run())
+
+
+def test_wrong_current_password_costs_one_check(user_db):
+    session_factory, current_user, verified = user_db
+
+    with pytest.raises(HTTPException) as error:
+        _change(session_factory, current_user, "wrong-pass", "new-pass-1")
+
+    assert error.value.status_code == 401
+    assert verified == ["wrong-pass"]
+
+
+def test_same_password_is_rejected_after_verifying(user_db):
+    session_factory, current_user, verified = user_db
+
+    with pytest.raises(HTTPException) as error:
+        _change(session_factory, current_user, "old-pass-1", "old-pass-1")
+
+    assert error.value.status_code == 400
+    assert "different" in error.value.detail
+    assert verified == ["old-pass-1"]
+
+
+def test_password_is_changed(user_db):
+    session_factory, current_user, _ = user_db
+
+    assert _change(session_factory, current_user, "old-pass-1", "new-pass-1").success
+
+    async def stored_hash():
+        async with session_factory() as db:
+            return (await db.get(User, current_user.id)).password_hash
+
+    assert verify_password("new-pass-1", asyncio.run(stored_hash()))
@@ -0,0 +1,70 @@
+"""
+Atomic worker claim tests against a throwaway SQLite database.
+
+Run with: python -m pytest -q test_worker_claims.py
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from database import POCJob, create_db_engine
+from migrations import run_migrations
+from worker_claims import CLAIM_STALE_SECONDS, WORKER_ID, claim_row
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'claims.db'}")
+    run_migrations(engine)
+    return sessionmaker(bind=engine)
+
+
+def _add_job(session_factory, **values):
+    db = session_factory()
+    db.add(POCJob(job_id="job-1", user_id=1, job_type="generate", **values))
+    db.commit()
+    db.close()
+
+
+def _claim(session_factory) -> bool:
+    db = session_factory()
+    try:
+        return claim_row(db, POCJob, POCJob.job_id, "job-1", ["queued"], "running")
+    finally:
+        db.close()
+
+
+def test_only_one_concurrent_claim_wins(session_factory):
+    _add_job(session_factory, status="queued")
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(_claim(session_factory))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+    db = session_factory()
+    job = db.query(POCJob).one()
+    assert (job.status, job.claimed_by) == ("running", WORKER_ID)
+    db.close()
+
+
+def test_running_job_is_reclaimed_only_when_heartbeat_is_stale(session_factory):
+    _add_job(session_factory, status="running", claimed_by="other", heartbeat_at=datetime.utcnow())
+    assert not _claim(session_factory)
+
+    db = session_factory()
+    db.query(POCJob).update({"heartbeat_at": datetime.utcnow() - timedelta(seconds=CLAIM_STALE_SECONDS + 1)})
+    db.commit()
+    db.close()
+    assert _claim(session_factory)
+
+
+def test_finished_job_is_not_claimed(session_factory):
+    _add_job(session_factory, status="done")
+    assert not _claim(session_factory)
@@ -0,0 +1,277 @@
+"""
+In-process cache of authenticated users.
+
+This module provides:
+- CurrentUser, an immutable snapshot of a user row (no ORM state, no password hash)
+- A short-TTL LRU of snapshots keyed by user id, so protected requests skip
+  the users table lookup
+- Explicit invalidation for endpoints that change or delete users
+- A cached total user count for paginated admin listings
+
+The cache is per process; with several workers a change made through another
+worker is picked up once the entry expires (USER_CACHE_TTL_SECONDS).
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+# Cache configuration
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+USER_COUNT_TTL_SECONDS = float(os.getenv("USER_COUNT_TTL_SECONDS", "60"))
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """
+    Read-only view of an authenticated user.
+
+    Attributes:
+        id: User ID
+        username: Username
+        email: Email address (None when built from JWT claims)
+        is_admin: Admin privileges flag
+        created_at: Account creation time (None when built from JWT claims)
+        updated_at: Last update time (None when built from JWT claims)
+    """
+    id: int
+    username: str
+    email: Optional[str] = None
+    is_admin: bool = False
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_orm_user(cls, user) -> "CurrentUser":
+        """
+        Snapshot a User row.
+
+        Args:
+            user: database.User instance
+
+        Returns:
+            CurrentUser: Detached, immutable copy of the public fields
+        """
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_admin=bool(user.is_admin),
+            created_at=user.created_at,
+            updated_at=user.updated_at
+        )
+
+    @classmethod
+    def from_token_payload(cls, payload: Dict[str, Any]) -> "CurrentUser":
+        """
+        Build a user from JWT claims without touching the database.
+
+        Args:
+            payload: Decoded token payload ("sub", "username", "is_admin")
+
+        Returns:
+            CurrentUser: User with the fields carried by the token
+        """
+        return cls(
+            id=int(payload["sub"]),
+            username=payload.get("username", ""),
+            is_admin=bool(payload.get("is_admin", False))
+        )
+
+
+class UserCache:
+    """
+    Short-TTL LRU of CurrentUser snapshots keyed by user id.
+
+    Example:
+        cache = UserCache(ttl_seconds=30)
+        cache.set(CurrentUser.from_orm_user(user))
+        cache.get(user.id)          # CurrentUser until the TTL runs out
+        cache.invalidate(user.id)   # after changing or deleting the user
+    """
+
+    def __init__(self, ttl_seconds: float = USER_CACHE_TTL_SECONDS, max_entries: int = USER_CACHE_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds (float): Entry lifetime in seconds (0 disables the cache)
+            max_entries (int): Maximum number of users kept
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, user_id: int) -> Optional[CurrentUser]:
+        """
+        Look up a cached user.
+
+        Args:
+            user_id (int): User ID
+
+        Returns:
+            Optional[CurrentUser]: Snapshot, or None on a miss or expiry
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                expires_at, user = entry
+                if expires_at > now:
+                    self._entries.move_to_end(user_id)
+                    self._counters["hits"] += 1
+                    return user
+                del self._entries[user_id]
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, user: CurrentUser):
+        """
+        Cache a user snapshot.
+
+        Args:
+            user (CurrentUser): Snapshot to store
+        """
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        """
+        Drop a user from the cache.
+
+        Args:
+            user_id (int): User ID
+        """
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report hit/miss counters and size.
+
+        Returns:
+            dict: Counters, hit rate and entry count
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+            stats["entries"] = len(self._entries)
+            stats["ttl_seconds"] = self.ttl_seconds
+            return stats
+
+
+_user_cache: Optional[UserCache] = None
+_user_cache_lock = threading.Lock()
+
+
+def get_user_cache() -> UserCache:
+    """
+    Return the process-wide user cache, creating it on first use.
+
+    Returns:
+        UserCache: Shared cache instance
+    """
+    global _user_cache
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                _user_cache = UserCache()
+    return _user_cache
+
+
+class CachedCounter:
+    """
+    Row count kept in memory and refreshed from the database at most every ttl_seconds.
+
+    Writers call adjust() so the count stays accurate between refreshes.
+
+    Example:
+        counter = CachedCounter()
+        total = await counter.aget(lambda: db.scalar(select(func.count(User.id))))
+        counter.adjust(+1)  # after inserting a user
+    """
+
+    def __init__(self, ttl_seconds: float = USER_COUNT_TTL_SECONDS):
+        """
+        Initialize the counter.
+
+        Args:
+            ttl_seconds (float): Seconds before the count is reloaded
+        """
+        self.ttl_seconds = ttl_seconds
+        self._value: Optional[int] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    async def aget(self, load: Callable[[], Awaitable[int]]) -> int:
+        """
+        Return the count, loading it when missing or expired.
+
+        Args:
+            load (callable): Coroutine function that counts the rows
+
+        Returns:
+            int: Row count
+        """
+        with self._lock:
+            if self._value is not None and self._expires_at > time.monotonic():
+                return self._value
+
+        value = int(await load())
+        with self._lock:
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl_seconds
+        return value
+
+    def adjust(self, delta: int):
+        """
+        Apply a known change to the cached count.
+
+        Args:
+            delta (int): Rows added (positive) or removed (negative)
+        """
+        with self._lock:
+            if self._value is not None:
+                self._value = max(self._value + delta, 0)
+
+    def invalidate(self):
+        """Force a reload on the next read."""
+        with self._lock:
+            self._value = None
+
+
+_user_counter: Optional[CachedCounter] = None
+
+
+def get_user_counter() -> CachedCounter:
+    """
+    Return the process-wide cached count of users.
+
+    Returns:
+        CachedCounter: Shared counter
+    """
+    global _user_counter
+    if _user_counter is None:
+        with _user_cache_lock:
+            if _user_counter is None:
+                _user_counter = CachedCounter()
+    return _user_counter
@@ -8,16 +8,28 @@ This module provides authenticated users the ability to:
 
 from fastapi import APIRouter, HTTPException, Depends, status
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from database import get_db, User
-from auth_utils import hash_password, verify_password, validate_password_strength
-from auth import get_current_user
+from database import get_async_db, User
+from auth_utils import hash_password_async, verify_password_async, validate_password_strength
+from auth import get_current_user, commit_user
+from user_cache import CurrentUser, get_user_cache
 
 router = APIRouter(prefix="/api/user", tags=["user-management"])
 
 
+async def _load_user(db: AsyncSession, current_user: CurrentUser) -> User:
+    """Load the database row behind the authenticated user for updates."""
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    return user
+
+
 # Pydantic models
 class ChangePasswordRequest(BaseModel):
     """Request model for changing user password."""
@@ -41,8 +53,8 @@ class UserResponse(BaseModel):
 @router.put("/password", response_model=UserResponse)
 async def change_password(
     request: ChangePasswordRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Change user's password.
@@ -60,8 +72,10 @@ async def change_password(
     Raises:
         HTTPException: If current password is incorrect or new password is invalid
     """
-    # Verify current password
-    if not verify_password(request.current_password, current_user.password_hash):
+    user = await _load_user(db, current_user)
+    
+    # Verify current password (one bcrypt check; a wrong password costs no more)
+    if not await verify_password_async(request.current_password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect"
@@ -75,16 +89,17 @@ async def change_password(
             detail=error
         )
     
-    # Check if new password is same as current
-    if verify_password(request.new_password, current_user.password_hash):
+    # Check if new password is same as current (just verified, so compare directly)
+    if request.new_password == request.current_password:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="New password must be different from current password"
         )
     
     # Update password
-    current_user.password_hash = hash_password(request.new_password)
-    db.commit()
+    user.password_hash = await hash_password_async(request.new_password)
+    await db.commit()
+    get_user_cache().invalidate(user.id)
     
     return UserResponse(
         success=True,
@@ -95,8 +110,8 @@ async def change_password(
 @router.put("/profile", response_model=UserResponse)
 async def update_profile(
     request: UpdateProfileRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update user profile information.
@@ -121,64 +136,42 @@ async def update_profile(
             detail="At least one field (username or email) must be provided"
         )
     
+    user = await _load_user(db, current_user)
+    
     # Update username if provided
     if request.username:
         # Check if username is different
-        if request.username == current_user.username:
+        if request.username == user.username:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="New username is the same as current username"
             )
         
-        # Check if username already exists
-        existing_user = db.query(User).filter(
-            User.username == request.username,
-            User.id != current_user.id
-        ).first()
-        
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already exists"
-            )
-        
-        current_user.username = request.username
+        user.username = request.username
     
     # Update email if provided
     if request.email:
         # Check if email is different
-        if request.email == current_user.email:
+        if request.email == user.email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="New email is the same as current email"
             )
         
-        # Check if email already exists
-        existing_email = db.query(User).filter(
-            User.email == request.email,
-            User.id != current_user.id
-        ).first()
-        
-        if existing_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        
-        current_user.email = request.email
+        user.email = request.email
     
-    # Commit changes
-    db.commit()
-    db.refresh(current_user)
+    # Commit changes (taken usernames/emails are rejected by the unique indexes)
+    await commit_user(db, user, exclude_user_id=user.id)
+    get_user_cache().invalidate(user.id)
     
     return UserResponse(
         success=True,
         message="Profile updated successfully",
         user={
-            "id": current_user.id,
-            "username": current_user.username,
-            "email": current_user.email,
-            "is_admin": current_user.is_admin
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "is_admin": user.is_admin
         }
     )
 
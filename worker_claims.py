@@ -0,0 +1,144 @@
+"""
+Atomic claims on queued rows for background workers.
+
+With several worker processes (gunicorn -w 4) each one re-submits queued
+work on startup, so a row must be claimed before it is processed:
+- claim_row flips a row to its running state with one conditional UPDATE
+  and reports whether this process won (rowcount == 1)
+- A claimed row records claimed_by and heartbeat_at; a Heartbeat thread
+  refreshes heartbeat_at while the work runs
+- Rows whose heartbeat is older than CLAIM_STALE_SECONDS (their worker
+  died) can be claimed again
+
+Models using this need claimed_by and heartbeat_at columns.
+"""
+
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, or_, update
+
+from database import SessionLocal
+
+CLAIM_HEARTBEAT_SECONDS = float(os.getenv("CLAIM_HEARTBEAT_SECONDS", "30"))
+CLAIM_STALE_SECONDS = float(os.getenv("CLAIM_STALE_SECONDS", "120"))
+
+# Identifies this process in claimed_by
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def stale_cutoff() -> datetime:
+    """
+    Heartbeats older than this belong to dead workers.
+
+    Returns:
+        datetime: UTC cutoff
+    """
+    return datetime.utcnow() - timedelta(seconds=CLAIM_STALE_SECONDS)
+
+
+def stale_filter(model, running_status: str):
+    """
+    SQL condition matching rows claimed by a worker that stopped heartbeating.
+
+    Args:
+        model: Mapped class with status, heartbeat_at columns
+        running_status: Status of claimed rows
+
+    Returns:
+        Filter expression
+    """
+    return and_(
+        model.status == running_status,
+        or_(model.heartbeat_at.is_(None), model.heartbeat_at < stale_cutoff())
+    )
+
+
+def claim_row(db, model, key_column, key, claimable_statuses: Iterable[str], running_status: str) -> bool:
+    """
+    Atomically move a row to running_status for this process.
+
+    Succeeds if the row is in one of claimable_statuses, or is already in
+    running_status with a stale heartbeat.
+
+    Args:
+        db: Database session (committed by this call)
+        model: Mapped class with status, claimed_by, heartbeat_at columns
+        key_column: Column identifying the row
+        key: Value of key_column
+        claimable_statuses: Statuses that can be claimed directly
+        running_status: Status set on the claimed row
+
+    Returns:
+        bool: True if this process now owns the row
+
+    Example:
+        if claim_row(db, POCJob, POCJob.job_id, job_id, ["queued"], "running"):
+            ...  # run the job
+    """
+    now = datetime.utcnow()
+    result = db.execute(
+        update(model)
+        .where(key_column == key)
+        .where(or_(model.status.in_(list(claimable_statuses)), stale_filter(model, running_status)))
+        .values(status=running_status, claimed_by=WORKER_ID, heartbeat_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+class Heartbeat:
+    """
+    Background thread refreshing heartbeat_at on a claimed row.
+
+    Example:
+        with Heartbeat(POCJob, POCJob.job_id, job_id):
+            run_the_job()
+    """
+
+    def __init__(self, model, key_column, key, interval: float = CLAIM_HEARTBEAT_SECONDS):
+        """
+        Initialize the heartbeat.
+
+        Args:
+            model: Mapped class with claimed_by, heartbeat_at columns
+            key_column: Column identifying the row
+            key: Value of key_column
+            interval (float): Seconds between refreshes
+        """
+        self.model = model
+        self.key_column = key_column
+        self.key = key
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{self.key}", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            db = SessionLocal()
+            try:
+                db.execute(
+                    update(self.model)
+                    .where(self.key_column == self.key, self.model.claimed_by == WORKER_ID)
+                    .values(heartbeat_at=datetime.utcnow())
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+            except Exception as e:
+                print(f"Warning: Heartbeat for {self.key} failed: {e}")
+            finally:
+                db.close()